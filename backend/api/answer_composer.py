@@ -0,0 +1,422 @@
+"""
+Structured answers for chat questions, built from the RAG index alone.
+
+``AnswerComposer.compose`` turns a question and its retrieved chunks into
+the detected intent (e.g. "month:April 2025", "leadership") and the answer
+blocks rendered by answer_blocks.py. It needs nothing but a ``RagSystem``,
+so process-pool workers build one around their own index (``worker_rag()``)
+and receive only chunk ids, instead of a whole ChatHandler and its caches.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+try:
+    from backend.llm.answer_blocks import Block
+    from backend.rag.partitions import MONTH_NAMES, mentioned_months
+except ImportError:
+    from llm.answer_blocks import Block
+    from rag.partitions import MONTH_NAMES, mentioned_months
+
+LEADERSHIP_CANONICAL = {
+    "director": {"name": "Prof. Dinesh Prasad Saklani", "title": "Director, NCERT"},
+    "joint_director": {"name": "Prof. Amarendra Behera", "title": "Joint Director, CIET-NCERT"},
+    "head_dict": {"name": "Prof. Indu Kumar", "title": "Head, DICT & TD, CIET-NCERT"},
+    "national_coordinator": {"name": "Dr. Rajesh D.", "title": "Associate Professor, CIET-NCERT, National Coordinator VSK"},
+}
+
+
+NOT_AVAILABLE: Block = {"type": "paragraph", "label": "not_available"}
+
+
+def _table(columns: list, rows: list[list[str]], styles: list[dict]) -> Block:
+    return {"type": "table", "columns": columns, "rows": rows, "styles": styles}
+
+
+class AnswerComposer:
+    def __init__(self, rag_system) -> None:
+        self.rag = rag_system
+
+    @staticmethod
+    def _detect_month_in_query(query: str) -> str | None:
+        months = mentioned_months(query)
+        for m in MONTH_NAMES:
+            if m in months:
+                year_match = re.search(r'(202[4-9]|2030)', query)
+                year = year_match.group(1) if year_match else "2025"
+                if m == "january" and "2026" not in query:
+                    year = "2026"
+                return f"{m.capitalize()} {year}"
+        return None
+
+    def _format_monthly_data(self, md: dict[str, Any], lang: str = "en") -> list[Block]:
+        blocks: list[Block] = [{"type": "heading", "label": "education_report", "prefix": md.get("month", "Unknown")}]
+
+        rows = [
+            [{"label": "schools"}, f"{md.get('schools', 0):,}"],
+            [{"label": "teachers"}, f"{md.get('teachers', 0):,}"],
+            [{"label": "students"}, f"{md.get('students', 0):,}"],
+            [{"label": "apaar_ids"}, f"{md.get('apaar_ids', 0):,}"],
+            [{"label": "attendance_rate"}, f"{md.get('attendance_rate', 0)}%"],
+        ]
+        blocks.append({"type": "section", "label": "key_statistics"})
+        blocks.append(_table(["metric", "value"], rows,
+                             [{"bold": True, "color": "#003d82"}, {"bold": True}]))
+
+        highlights = md.get("highlights", [])
+        if highlights:
+            blocks.append({"type": "section", "label": "key_highlights"})
+            blocks.append({"type": "list", "items": list(highlights)})
+
+        activities = md.get("activities", [])
+        if activities:
+            blocks.append({"type": "section", "label": "major_activities"})
+            blocks.append(_table(["rank", "activity"], [[str(i + 1), a] for i, a in enumerate(activities)],
+                                 [{"bold": True, "color": "#003d82"}, {}]))
+
+        events = md.get("events", [])
+        if events:
+            blocks.append({"type": "section", "label": "notable_events"})
+            rows = []
+            for e in events:
+                rows.append([
+                    e.get("name", ""),
+                    e.get("date", ""),
+                    e.get("description", ""),
+                    f'{e.get("participants", 0):,}',
+                ])
+            blocks.append(_table(
+                ["event", "date", "description", "participants"],
+                rows,
+                [
+                    {"bold": True, "color": "#003d82"},
+                    {"color": "#FF6600"},
+                    {},
+                    {"bold": True, "color": "#28a745"},
+                ],
+            ))
+
+        states = md.get("states", {})
+        if states:
+            blocks.append({"type": "section", "label": "state_performance"})
+            state_rows = []
+            for state, data in states.items():
+                att = data.get("attendance", "N/A")
+                state_rows.append([
+                    state,
+                    f'{att}%',
+                    f'{data.get("apaar_coverage", "N/A")}%',
+                    f'{data.get("schools", 0):,}',
+                ])
+            blocks.append(_table(
+                ["state_ut", "attendance", "apaar_coverage", "schools"],
+                state_rows,
+                [
+                    {"bold": True, "color": "#003d82"},
+                    {"bold": True, "color": "#28a745"},
+                    {"bold": True},
+                    {},
+                ],
+            ))
+
+        return blocks
+
+    def _format_technical_data(self, tech_data: dict[str, Any], lang: str = "en") -> list[Block]:
+        if not isinstance(tech_data, dict):
+            return [NOT_AVAILABLE]
+
+        blocks: list[Block] = [{"type": "heading", "label": "technical_title"}]
+
+        features = tech_data.get("dashboard_features", [])
+        if features:
+            blocks.append({"type": "section", "label": "dashboard_features"})
+            blocks.append(_table(["rank", "feature"], [[str(i + 1), f] for i, f in enumerate(features)],
+                                 [{"bold": True, "color": "#003d82"}, {}]))
+
+        upgrades = tech_data.get("infrastructure_upgrades", [])
+        if upgrades:
+            blocks.append({"type": "section", "label": "infrastructure_upgrades"})
+            blocks.append(_table(["rank", "upgrade"], [[str(i + 1), u] for i, u in enumerate(upgrades)],
+                                 [{"bold": True, "color": "#003d82"}, {}]))
+
+        milestones = tech_data.get("apaar_milestones", [])
+        if milestones:
+            blocks.append({"type": "section", "label": "apaar_milestones"})
+            rows = []
+            prev_reg = 0
+            for m in milestones:
+                reg = m.get("registrations", 0)
+                growth = ""
+                if prev_reg > 0:
+                    pct = ((reg - prev_reg) / prev_reg) * 100
+                    growth = f"+{pct:.1f}%"
+                prev_reg = reg
+                rows.append([
+                    m.get("month", "N/A"),
+                    f'{reg:,}',
+                    str(m.get("states_active", 0)),
+                    growth,
+                ])
+            blocks.append(_table(
+                ["month", "registrations", "states_active", "growth"],
+                rows,
+                [
+                    {"bold": True, "color": "#003d82"},
+                    {"bold": True},
+                    {},
+                    {"bold": True, "color": "#28a745"},
+                ],
+            ))
+
+        return blocks
+
+    def _format_kpi_data(self, kpi_data: dict[str, Any], category: str, lang: str = "en") -> list[Block]:
+        category_name = category.replace("_", " ").title()
+        if not isinstance(kpi_data, dict) or not kpi_data:
+            return [NOT_AVAILABLE]
+
+        rows = [[key.replace("_", " ").title(), str(value)] for key, value in kpi_data.items()]
+        return [
+            {"type": "heading", "label": "kpi_title", "suffix": category_name},
+            _table(["indicator", "value"], rows, [{"bold": True, "color": "#003d82"}, {"bold": True}]),
+        ]
+
+    def _format_director_message(self, msg: dict[str, Any], lang: str = "en") -> list[Block]:
+        name = msg.get("name", "Director")
+        position = msg.get("position", "Director, Dept. of School Education & Literacy")
+        message = msg.get("message", "")
+        return [
+            {"type": "heading", "label": "director_message"},
+            {"type": "byline", "name": name, "position": position},
+            *({"type": "paragraph", "text": p.strip()} for p in message.split("\n\n") if p.strip()),
+        ]
+
+    def _format_state_engagement(self, eng: dict[str, Any], lang: str = "en") -> list[Block]:
+        if not isinstance(eng, dict):
+            return [NOT_AVAILABLE]
+
+        blocks: list[Block] = [{"type": "heading", "label": "state_engagement_title"}]
+
+        summary = eng.get("correspondence_summary", {})
+        if summary:
+            rows = [
+                [{"label": "total_states_uts"}, str(summary.get("total_states_uts", 0))],
+                [{"label": "active_participants"}, str(summary.get("active_participants", 0))],
+                [{"label": "mous_signed"}, str(summary.get("mou_signed", 0))],
+                [{"label": "advanced_implementation"}, str(summary.get("implementation_advanced", 0))],
+                [{"label": "pilot_phase"}, str(summary.get("pilot_phase", 0))],
+            ]
+            blocks.append(_table(["parameter", "value"], rows, [{"bold": True, "color": "#003d82"}, {"bold": True}]))
+
+        top = eng.get("top_performing_states", [])
+        if top:
+            blocks.append({"type": "section", "label": "top_performing"})
+            rows = [
+                [s["name"], f'{s["apaar_coverage"]}%', f'{s["attendance"]}%', f'{s["digital_readiness"]}%']
+                for s in top[:5]
+            ]
+            blocks.append(_table(
+                ["state_ut", "apaar_coverage", "attendance", "digital_readiness"], rows,
+                [{"bold": True, "color": "#003d82"}, {"bold": True}, {"bold": True}, {}],
+            ))
+
+        consent = eng.get("consent_framework", {})
+        if consent:
+            blocks.append({"type": "section", "label": "consent_framework"})
+            rows = [
+                [{"label": "total_consents"}, f'{consent.get("total_consents_collected", 0):,}'],
+                [{"label": "digital_consent_rate"}, f'{consent.get("digital_consent_rate", 0)}%'],
+                [{"label": "parent_awareness_programs"}, f'{consent.get("parent_awareness_programs", 0):,}'],
+                [{"label": "data_privacy_compliance"}, str(consent.get("data_privacy_compliance", "N/A"))],
+            ]
+            blocks.append(_table(["parameter", "value"], rows, [{"bold": True, "color": "#003d82"}, {"bold": True}]))
+
+        return blocks
+
+    def _format_rvsk_data(self, rvsk: dict[str, Any], lang: str = "en") -> list[Block]:
+        blocks: list[Block] = [{"type": "heading", "label": "rvsk_title"}]
+
+        progress = rvsk.get("current_progress", {})
+        if progress:
+            rows = [
+                [{"label": "states_uts_operationalized"}, str(progress.get("states_uts_operationalized", ""))],
+                [{"label": "cabs_operational"}, str(progress.get("cabs_operational", ""))],
+                [{"label": "total_operational_vsks"}, str(progress.get("total_operational_vsks", ""))],
+                [{"label": "schools_connected"}, str(progress.get("schools_connected", ""))],
+                [{"label": "teachers_linked"}, str(progress.get("teachers_linked", ""))],
+                [{"label": "students_tracked"}, str(progress.get("students_tracked", ""))],
+                [{"label": "schools_integrated_rvsk"}, str(progress.get("schools_integrated_rvsk", ""))],
+                [{"label": "total_apaar_ids"}, str(progress.get("total_apaar_ids", ""))],
+                [{"label": "attendance_integration"}, {"label": "states_uts_unit", "count": str(progress.get("states_attendance_integrated", ""))}],
+                [{"label": "assessment_integration"}, {"label": "states_uts_unit", "count": str(progress.get("states_assessment_integrated", ""))}],
+            ]
+            blocks.append({"type": "section", "label": "current_progress"})
+            blocks.append(_table(["parameter", "value"], rows, [{"bold": True, "color": "#003d82"}, {"bold": True}]))
+
+        six_a = rvsk.get("six_a_framework", {})
+        if six_a:
+            rows = [[k.replace("_", " ").title(), v.get("status", ""), v.get("coverage", "—")]
+                    for k, v in six_a.items()]
+            blocks.append({"type": "section", "label": "six_a_framework"})
+            blocks.append(_table(["pillar", "integration_status", "coverage"], rows,
+                                 [{"bold": True, "color": "#003d82"}, {}, {"bold": True}]))
+
+        highlights = rvsk.get("key_highlights", [])
+        if highlights:
+            blocks.append({"type": "section", "label": "key_highlights"})
+            blocks.append({"type": "list", "items": list(highlights)})
+
+        programs = rvsk.get("national_programs", [])
+        if programs:
+            blocks.append({"type": "section", "label": "national_programs"})
+            blocks.append({"type": "paragraph", "text": ", ".join(programs)})
+
+        leaders = rvsk.get("leadership", {})
+        if leaders:
+            blocks.append({"type": "section", "label": "leadership"})
+            blocks.append(self._leadership_table(leaders))
+
+        return blocks
+
+    @staticmethod
+    def _leadership_table(leaders: dict[str, Any]) -> Block:
+        rows = [[LEADERSHIP_CANONICAL.get(k, {}).get("name", v.get("name", "")),
+                 LEADERSHIP_CANONICAL.get(k, {}).get("title", v.get("title", ""))]
+                for k, v in leaders.items()]
+        return _table(["name", "designation"], rows, [{"bold": True, "color": "#003d82"}, {}])
+
+    def _format_leadership_answer(self, lang: str = "en") -> list[Block]:
+        rvsk = self.rag.data.get("rvsk_data", {})
+        leaders = rvsk.get("leadership", {})
+        if not leaders:
+            return [NOT_AVAILABLE]
+        return [{"type": "heading", "label": "leadership"}, self._leadership_table(leaders)]
+
+    def _format_dpdp_answer(self, lang: str = "en") -> list[Block]:
+        principles = ["minimization", "purpose", "access", "consent", "security", "audit", "quality"]
+        return [
+            {"type": "heading", "label": "dpdp_title"},
+            {"type": "paragraph", "label": "dpdp_intro"},
+            _table(
+                ["dpdp_principle", "dpdp_implementation"],
+                [[{"label": f"dpdp_{p}"}, {"label": f"dpdp_{p}_text"}] for p in principles],
+                [{"bold": True, "color": "#003d82"}, {}],
+            ),
+            {"type": "paragraph", "label": "dpdp_scope_text", "lead": {"label": "dpdp_scope"}},
+        ]
+
+    def _format_six_a_answer(self, lang: str = "en") -> list[Block]:
+        rvsk = self.rag.data.get("rvsk_data", {})
+        six_a = rvsk.get("six_a_framework", {})
+        if not six_a:
+            return [NOT_AVAILABLE]
+
+        rows = [[k.replace("_", " ").title(), v.get("status", ""), v.get("coverage", "—")]
+                for k, v in six_a.items()]
+
+        return [
+            {"type": "heading", "label": "six_a_framework"},
+            {"type": "paragraph", "label": "six_a_intro"},
+            _table(["pillar", "integration_status", "coverage"], rows,
+                   [{"bold": True, "color": "#003d82"}, {}, {"bold": True}]),
+        ]
+
+    def _lookup(self, query: str, **filters: str) -> dict[str, Any] | None:
+        """Metadata of the best chunk for ``query`` among those matching ``filters`` (partition posting lists)"""
+        found = self.rag.search(query, top_k=1, filters=filters)
+        return found[0]["metadata"] if found else None
+
+    def _format_chunk(self, metadata: dict[str, Any], lang: str) -> tuple[str, list[Block]] | None:
+        chunk_type = metadata.get("type", "")
+        data = metadata.get("data", {})
+        if chunk_type == "month":
+            return f"month:{data.get('month', '')}", self._format_monthly_data(data, lang)
+        elif chunk_type == "rvsk":
+            return "rvsk", self._format_rvsk_data(data, lang)
+        elif chunk_type == "technical":
+            return "technical", self._format_technical_data(data, lang)
+        elif chunk_type == "kpi":
+            category = metadata.get("category", "general")
+            return f"kpi:{category}", self._format_kpi_data(data, category, lang)
+        elif chunk_type == "director_message":
+            return "director_message", self._format_director_message(data, lang)
+        elif chunk_type == "state_engagement":
+            return "state_engagement", self._format_state_engagement(data, lang)
+        return None
+
+    def _try_structured_format(self, results: list[dict], query: str, lang: str = "en") -> tuple[str, list[Block]] | None:
+        """The detected intent (e.g. "month:April 2025", "leadership") and its structured answer"""
+        target_month = self._detect_month_in_query(query)
+        if target_month:
+            month_chunk = self._lookup(query, type="month", month=target_month)
+            if month_chunk:
+                return self._format_chunk(month_chunk, lang)
+
+        q_lower = query.lower()
+
+        leadership_keywords_en = ["leadership", "leader", "director", "joint director", "head dict",
+                                  "who leads", "who is the director", "who runs", "saklani", "behera", "indu kumar"]
+        leadership_keywords_hi = ["नेतृत्व", "निदेशक", "संयुक्त निदेशक", "कौन है", "प्रमुख"]
+        if any(kw in q_lower for kw in leadership_keywords_en) or any(kw in query for kw in leadership_keywords_hi):
+            if not any(kw in q_lower for kw in ["message", "vision", "संदेश"]):
+                return "leadership", self._format_leadership_answer(lang)
+
+        dpdp_keywords = ["dpdp", "data protection", "digital personal data", "dpdp act", "dpdp 2023",
+                         "privacy", "data privacy", "डेटा संरक्षण", "गोपनीयता", "डीपीडीपी"]
+        if any(kw in q_lower for kw in dpdp_keywords) or any(kw in query for kw in dpdp_keywords):
+            return "dpdp", self._format_dpdp_answer(lang)
+
+        six_a_keywords_en = ["6a framework", "6a", "six a", "attendance assessment administration",
+                             "accreditation adaptive artificial"]
+        six_a_keywords_hi = ["6a फ्रेमवर्क", "6a", "छह स्तंभ"]
+        if any(kw in q_lower for kw in six_a_keywords_en) or any(kw in query for kw in six_a_keywords_hi):
+            return "six_a", self._format_six_a_answer(lang)
+
+        # A question naming a topic gets the best chunk of that type, searched in its shard
+        rvsk_keywords = ["rvsk", "rashtriya vidya samiksha", "capacity building workshop",
+                         "dpdp", "data protection", "best practice", "early warning system",
+                         "facial recognition", "apaar for teacher", "institutionaliz",
+                         "राष्ट्रीय विद्या समीक्षा", "विद्या समीक्षा केंद्र"]
+        tech_keywords = ["technical", "dashboard", "infrastructure", "upgrade", "feature", "system", "platform",
+                         "तकनीकी", "डैशबोर्ड", "अवसंरचना"]
+        kpi_keywords = ["kpi", "performance indicator", "learning outcome", "equity", "growth metric",
+                        "प्रदर्शन संकेतक", "सीखने के परिणाम"]
+        state_keywords = ["state engagement", "state performance", "top state", "top performing",
+                          "राज्य प्रदर्शन", "शीर्ष राज्य"]
+        director_keywords = ["director's message", "director message", "vision", "निदेशक का संदेश", "संदेश"]
+        for chunk_type, keywords in (("rvsk", rvsk_keywords), ("technical", tech_keywords), ("kpi", kpi_keywords),
+                                     ("state_engagement", state_keywords), ("director_message", director_keywords)):
+            if not (any(kw in q_lower for kw in keywords) or any(kw in query for kw in keywords)):
+                continue
+            if chunk_type == "kpi":
+                # Every KPI category, not one chunk
+                kpis = self.rag.data.get("key_performance_indicators", {})
+                if kpis:
+                    return "kpi", [block for cat, data in kpis.items() for block in self._format_kpi_data(data, cat, lang)]
+                continue
+            chunk = self._lookup(query, type=chunk_type)
+            if chunk:
+                return self._format_chunk(chunk, lang)
+
+        # Otherwise the top result; the ranker already prefers structured chunk types
+        # (type_boost in rag_system.py)
+        return self._format_chunk(results[0]["metadata"], lang) if results else None
+
+    def compose(self, results: list[dict], query: str, lang: str) -> tuple[str, list[Block]]:
+        """Intent and answer blocks: the structured answer, or the top retrieved chunks"""
+        structured = self._try_structured_format(results, query, lang)
+        if structured and structured[1]:
+            return structured
+
+        items = []
+        seen_texts = set()
+        for r in results[:3]:
+            txt = r.get("text", "").replace("\n", " ").strip()
+            if txt and txt not in seen_texts:
+                seen_texts.add(txt)
+                if len(txt) > 350:
+                    txt = txt[:347] + "..."
+                items.append(txt)
+        return "retrieval", [{"type": "section", "label": "based_on"}, {"type": "list", "items": items}]
@@ -0,0 +1,140 @@
+"""
+Executor layer for CPU-bound chat stages.
+
+``ChatHandler.chat`` hands retrieval, HTML answer building and output cleanup
+to a ``StageExecutor`` so long corpora or long LLM outputs do not stall the
+event loop. The mode is chosen with ``CHAT_EXECUTOR``:
+
+    inline   run every stage on the event loop (previous behaviour)
+    thread   run stages in a dedicated thread pool (default)
+    process  run stages in a process pool; each worker holds its own
+             pre-warmed RagSystem (attached to the shared snapshot when
+             RAG_INDEX_DIR is set, so workers do not multiply RAM)
+
+``CHAT_EXECUTOR_WORKERS`` sets the pool size. Blocking I/O such as the Ollama
+call always goes to the server's I/O thread pool, except in inline mode.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from fastapi.concurrency import run_in_threadpool
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+# Per-process state for process-pool workers
+_worker_rag = None
+# prewarm: each call holds its worker this long, so the other workers take the remaining calls
+WARM_HOLD = 0.2
+PREWARM_ROUNDS = 5
+
+
+def _init_worker(data_path: str, index_dir: str | None) -> None:
+    global _worker_rag
+    try:
+        from backend.rag.rag_system import RagSystem
+    except ImportError:
+        from rag.rag_system import RagSystem
+
+    _worker_rag = RagSystem(data_path, index_dir=index_dir)
+    _worker_rag.ensure_initialized()
+
+
+def _warm_worker(hold: float = 0.0) -> int:
+    time.sleep(hold)
+    return os.getpid()
+
+
+def worker_rag():
+    """The RagSystem owned by the current process-pool worker"""
+    if _worker_rag is None:
+        raise RuntimeError("worker_rag() called outside a chat process-pool worker")
+    return _worker_rag
+
+
+class StageExecutor:
+    def __init__(self, mode: str | None = None, workers: int | None = None,
+                 data_path: str | None = None, index_dir: str | None = None) -> None:
+        mode = (mode or os.getenv("CHAT_EXECUTOR", "thread")).strip().lower()
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"CHAT_EXECUTOR must be one of {', '.join(EXECUTOR_MODES)}, got {mode!r}")
+        if mode == "process" and not data_path:
+            raise ValueError("process executor needs data_path to warm worker indexes")
+
+        self.mode = mode
+        self.workers = workers or int(os.getenv("CHAT_EXECUTOR_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+        self.data_path = data_path
+        self.index_dir = index_dir
+        self.warm_workers = 0
+        self._pool: Executor | None = None
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.data_path, self.index_dir),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="chat-stage")
+        return self._pool
+
+    async def run(self, fn: Callable, *args: Any, worker_fn: Callable | None = None) -> Any:
+        """
+        Run a CPU-bound stage. In process mode ``worker_fn`` (a module-level
+        function resolving state through ``worker_rag()``) replaces ``fn``,
+        since bound methods would pickle the whole index on every call.
+        """
+        if self.mode == "inline":
+            return fn(*args)
+        target = worker_fn if self.mode == "process" and worker_fn is not None else fn
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_pool(), partial(target, *args))
+
+    def call(self, fn: Callable, *args: Any) -> Any:
+        """Blocking ``run`` for threads other than the event loop, such as background insight jobs"""
+        if self.mode == "inline":
+            return fn(*args)
+        return self._get_pool().submit(fn, *args).result()
+
+    async def run_io(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run blocking I/O (e.g. the Ollama HTTP call) off the event loop"""
+        if self.mode == "inline":
+            return fn(*args, **kwargs)
+        return await run_in_threadpool(fn, *args, **kwargs)
+
+    async def prewarm(self) -> None:
+        """Start every process worker so each builds/attaches its index before traffic"""
+        if self.mode != "process":
+            return
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        # A free worker can take several calls of one round; repeat until every worker has answered
+        pids: set[int] = set()
+        for _ in range(PREWARM_ROUNDS):
+            pids.update(await asyncio.gather(
+                *(loop.run_in_executor(pool, _warm_worker, WARM_HOLD) for _ in range(self.workers))))
+            if len(pids) >= self.workers:
+                break
+        self.warm_workers = len(pids)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "workers": self.workers if self.mode != "inline" else 0,
+            "warm_workers": self.warm_workers,
+        }
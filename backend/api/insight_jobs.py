@@ -0,0 +1,187 @@
+"""
+Background queue for LLM insights that the chat answer does not wait for.
+
+``ChatHandler.chat`` sends the structured answer at once and submits the
+insight here; the response carries the job id and the client polls
+``GET /api/chat/insight/{id}`` until the job is done. Memory stays bounded:
+
+- ``INSIGHT_QUEUE_SIZE`` (default 32) jobs can wait for a worker. Beyond
+  that ``submit`` refuses the job, and the answer goes out without an insight;
+- ``INSIGHT_JOB_WORKERS`` (default 2) threads run the jobs, so at most that
+  many requests reach Ollama at a time;
+- finished jobs are kept for ``INSIGHT_JOB_TTL`` seconds (default 300) and
+  at most ``INSIGHT_JOBS_MAX`` of them (default 256), oldest dropped first.
+  Queued jobs older than the TTL are dropped without calling the LLM; the
+  client has stopped polling for them.
+
+A question asked again while its insight is still being generated gets the
+same job id, so the LLM writes each insight once.
+
+With several uvicorn workers (``WEB_CONCURRENCY``), a poll can reach a
+process other than the one running the job. Every status change is then
+also written to the persistent cache (``CACHE_DB``, namespace ``jobs``),
+and ``get`` falls back to it. Without ``CACHE_DB`` the jobs cannot be
+shared: ``shared`` is False and ChatHandler waits for insights instead.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable
+
+try:
+    from backend.cache.disk_cache import DiskCache
+except ImportError:
+    from cache.disk_cache import DiskCache
+
+NAMESPACE = "jobs"
+FINISHED = ("done", "unavailable", "failed", "expired")
+
+
+class InsightJobs:
+    def __init__(self, workers: int | None = None, max_pending: int | None = None,
+                 max_jobs: int | None = None, ttl: float | None = None, store: DiskCache | None = None) -> None:
+        self.workers = workers or int(os.getenv("INSIGHT_JOB_WORKERS", "2"))
+        self.max_pending = max_pending or int(os.getenv("INSIGHT_QUEUE_SIZE", "32"))
+        self.max_jobs = max_jobs or int(os.getenv("INSIGHT_JOBS_MAX", "256"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("INSIGHT_JOB_TTL", "300"))
+        self.store = store
+        self._jobs: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._running_keys: dict[str, str] = {}  # evidence key -> id of its unfinished job
+        self._queue: queue.Queue[tuple[str, Callable[[], str | None]] | None] = queue.Queue(self.max_pending)
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._pruned = 0.0  # last time expired jobs were deleted from the store
+        self.counts = {"submitted": 0, "coalesced": 0, "rejected": 0,
+                       "done": 0, "unavailable": 0, "failed": 0, "expired": 0}
+
+    @property
+    def shared(self) -> bool:
+        """Whether every uvicorn worker can answer a poll for any job"""
+        return self.store is not None or int(os.getenv("WEB_CONCURRENCY", "1")) <= 1
+
+    def submit(self, key: str, generate: Callable[[], str | None], language: str = "en") -> str | None:
+        """Queue ``generate`` for the insight under ``key``; returns the job id, or None when the queue is full"""
+        with self._lock:
+            self._purge(time.time())
+            job_id = self._running_keys.get(key)
+            if job_id is not None:
+                self.counts["coalesced"] += 1
+                return job_id
+            job_id = uuid.uuid4().hex
+            try:
+                self._queue.put_nowait((job_id, generate))
+            except queue.Full:
+                self.counts["rejected"] += 1
+                return None
+            job = {"id": job_id, "key": key, "language": language, "status": "pending",
+                   "created": time.time(), "finished": None, "insight": None}
+            self._jobs[job_id] = job
+            self._running_keys[key] = job_id
+            self.counts["submitted"] += 1
+            self._start()
+            record = dict(job)
+        self._save(record)
+        now = time.time()
+        if self.store is not None and now - self._pruned > self.ttl:
+            self._pruned = now
+            self.store.prune(NAMESPACE, self.ttl)
+        return job_id
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        """A copy of the job, or None when it is unknown or has expired"""
+        with self._lock:
+            self._purge(time.time())
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        return self._load(job_id)
+
+    def _save(self, job: dict[str, Any]) -> None:
+        if self.store is not None:
+            self.store.put(NAMESPACE, job["id"], json.dumps(job, ensure_ascii=False))
+
+    def _load(self, job_id: str) -> dict[str, Any] | None:
+        """A job run by another worker; its record is rewritten on every status change"""
+        if self.store is None:
+            return None
+        value = self.store.get(NAMESPACE, job_id, max_age=self.ttl)
+        return json.loads(value) if value is not None else None
+
+    def _start(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"insight-job-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job_id, generate = item
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                expired = time.time() - job["created"] > self.ttl
+                if expired:
+                    record = self._finish(job, "expired")
+                else:
+                    job["status"] = "running"
+                    record = dict(job)
+            self._save(record)
+            if expired:
+                continue
+            try:
+                insight = generate()
+            except Exception as e:
+                print(f"⚠️  Insight job {job_id} failed: {e}")
+                with self._lock:
+                    record = self._finish(job, "failed")
+                self._save(record)
+                continue
+            with self._lock:
+                job["insight"] = insight
+                record = self._finish(job, "done" if insight is not None else "unavailable")
+            self._save(record)
+
+    def _finish(self, job: dict[str, Any], status: str) -> dict[str, Any]:
+        """Mark ``job`` finished (lock held); returns a copy to save once the lock is released"""
+        job["status"], job["finished"] = status, time.time()
+        self.counts[status] += 1
+        if self._running_keys.get(job["key"]) == job["id"]:
+            del self._running_keys[job["key"]]
+        self._trim()
+        return dict(job)
+
+    def _purge(self, now: float) -> None:
+        for job_id in [j["id"] for j in self._jobs.values() if j["finished"] and now - j["finished"] > self.ttl]:
+            del self._jobs[job_id]
+
+    def _trim(self) -> None:
+        finished = [j["id"] for j in self._jobs.values() if j["status"] in FINISHED]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            statuses: dict[str, int] = {}
+            for job in self._jobs.values():
+                statuses[job["status"]] = statuses.get(job["status"], 0) + 1
+            return {"workers": self.workers, "queued": self._queue.qsize(), "max_pending": self.max_pending,
+                    "shared": self.shared, "jobs": statuses, **self.counts}
+
+    def shutdown(self) -> None:
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break  # daemon threads end with the process
+        self._threads = []
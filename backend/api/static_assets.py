@@ -0,0 +1,208 @@
+"""
+Fingerprinted, pre-compressed frontend assets.
+
+``StaticAssets.build`` reads every file under ``frontend/css``, ``frontend/js``
+and ``frontend/assets`` once. Each file gets a content-hashed name
+(``css/style.css`` -> ``css/style.3f9a1c0b7e.css``), and text files are
+compressed ahead of time with gzip and, when the ``brotli`` package is
+installed, brotli. ``index.html`` is served with its ``href``/``src``
+references rewritten to the hashed names.
+
+Hashed URLs never change content, so they are served with
+``Cache-Control: immutable`` and a one-year max-age; a browser (or CDN in
+front of the app) fetches each asset once per deploy. The plain names keep
+working with ``no-cache`` and an ETag. The encoding is negotiated from
+``Accept-Encoding`` (br, then gzip, then identity) without compressing
+anything per request.
+
+``python -m backend.api.static_assets`` prints the manifest with raw and
+compressed sizes.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response
+
+try:
+    from backend.lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+brotli = lazy_import("brotli", optional=True)
+
+ASSET_DIRS = ("css", "js", "assets")
+COMPRESSIBLE_SUFFIXES = (".css", ".js", ".svg", ".html", ".json", ".txt")
+HASH_LENGTH = 10
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+REF_RE = re.compile(r'(?P<attr>href|src)="(?P<path>(?:css|js|assets)/[^"?#]+)"')
+
+
+@dataclass
+class Asset:
+    path: Path
+    name: str  # e.g. "css/style.css"
+    hashed: str  # e.g. "css/style.3f9a1c0b7e.css"
+    digest: str
+    media_type: str
+    # Encoded bodies of compressible files: "identity", "gzip" and, if smaller, "br"
+    bodies: dict[str, bytes] = field(default_factory=dict)
+
+
+def hashed_name(name: str, digest: str) -> str:
+    path = Path(name)
+    return path.with_name(f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Codings in an Accept-Encoding header, minus those refused with q=0"""
+    accepted = set()
+    for part in header.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        if coding and not re.fullmatch(r"q=0(\.0{0,3})?", params):
+            accepted.add(coding.strip())
+    return accepted
+
+
+class StaticAssets:
+    def __init__(self, root: str | Path, dirs: tuple[str, ...] = ASSET_DIRS) -> None:
+        self.root = Path(root)
+        self.dirs = dirs
+        self.assets: dict[str, Asset] = {}  # keyed by plain and by hashed name
+        self.manifest: dict[str, str] = {}
+        self.build_seconds: float | None = None
+        self._index_html: str | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self.build_seconds is not None
+
+    def build(self) -> StaticAssets:
+        """Hash and pre-compress every asset; safe to call more than once"""
+        with self._lock:
+            if self.built:
+                return self
+            started = time.perf_counter()
+            for directory in self.dirs:
+                base = self.root / directory
+                if not base.is_dir():
+                    continue
+                for path in sorted(p for p in base.rglob("*") if p.is_file() and not p.name.startswith(".")):
+                    asset = self._load(path)
+                    self.assets[asset.name] = self.assets[asset.hashed] = asset
+                    self.manifest[asset.name] = asset.hashed
+            self.build_seconds = time.perf_counter() - started
+        return self
+
+    def _load(self, path: Path) -> Asset:
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        name = path.relative_to(self.root).as_posix()
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        asset = Asset(path, name, hashed_name(name, digest), digest, media_type)
+        if path.suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            asset.bodies["identity"] = data
+            encoded = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                encoded["br"] = brotli.compress(data, quality=11)
+            asset.bodies.update((k, v) for k, v in encoded.items() if len(v) < len(data))
+        return asset
+
+    def rewrite(self, html: str) -> str:
+        """Point css/js/assets references in ``html`` at their hashed names"""
+        def replace(match: re.Match) -> str:
+            hashed = self.manifest.get(match.group("path"))
+            return f'{match.group("attr")}="{hashed}"' if hashed else match.group(0)
+
+        return REF_RE.sub(replace, html)
+
+    def index_html(self) -> str | None:
+        if self._index_html is None:
+            index_path = self.root / "index.html"
+            if not index_path.exists():
+                return None
+            self.build()
+            self._index_html = self.rewrite(index_path.read_text(encoding="utf-8"))
+        return self._index_html
+
+    def response(self, name: str, accept_encoding: str = "", if_none_match: str = "") -> Response:
+        self.build()
+        asset = self.assets.get(name)
+        if asset is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+
+        coding = "identity"
+        if asset.bodies:
+            accepted = accepted_encodings(accept_encoding)
+            coding = next((c for c in ("br", "gzip") if c in asset.bodies and c in accepted), "identity")
+        etag = f'"{asset.digest}"' if coding == "identity" else f'"{asset.digest}-{coding}"'
+        headers = {
+            "Cache-Control": IMMUTABLE if name == asset.hashed else REVALIDATE,
+            "ETag": etag,
+        }
+        if asset.bodies:
+            headers["Vary"] = "Accept-Encoding"
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+        if not asset.bodies:
+            return FileResponse(asset.path, media_type=asset.media_type, headers=headers)
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return Response(asset.bodies[coding], media_type=asset.media_type, headers=headers)
+
+    def _handler(self, directory: str):
+        async def serve(request: Request, path: str) -> Response:
+            if not self.built:
+                await run_in_threadpool(self.build)
+            return self.response(f"{directory}/{path}", request.headers.get("accept-encoding", ""),
+                                 request.headers.get("if-none-match", ""))
+
+        return serve
+
+    def router(self) -> APIRouter:
+        """Routes for every asset directory plus the rewritten ``/`` page"""
+        router = APIRouter()
+        for directory in self.dirs:
+            router.add_api_route(f"/{directory}/{{path:path}}", self._handler(directory),
+                                 methods=["GET", "HEAD"], include_in_schema=False)
+
+        async def index() -> Response:
+            if not self.built:
+                await run_in_threadpool(self.build)
+            html = self.index_html()
+            if html is None:
+                return JSONResponse({"message": "Frontend not found. API is running at /api/*"})
+            return HTMLResponse(html, headers={"Cache-Control": REVALIDATE})
+
+        router.add_api_route("/", index, methods=["GET"], include_in_schema=False)
+        return router
+
+
+def main() -> None:
+    frontend = Path(__file__).resolve().parents[2] / "frontend"
+    assets = StaticAssets(frontend).build()
+    print(f"{len(assets.manifest)} assets in {assets.build_seconds * 1000:.0f} ms"
+          f" (brotli {'on' if brotli is not None else 'not installed'})")
+    print(f"{'asset':<48} {'raw':>9} {'gzip':>9} {'br':>9}")
+    for name, hashed in assets.manifest.items():
+        asset = assets.assets[name]
+        raw = asset.path.stat().st_size
+        sizes = [str(len(asset.bodies[c])) if c in asset.bodies else "-" for c in ("gzip", "br")]
+        print(f"{hashed:<48} {raw:>9} {sizes[0]:>9} {sizes[1]:>9}")
+
+
+if __name__ == "__main__":
+    main()
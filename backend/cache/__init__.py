@@ -0,0 +1 @@
+"""Caches for generated answers and LLM insights."""
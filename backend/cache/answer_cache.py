@@ -0,0 +1,125 @@
+"""
+Answer-level cache for LLM insights, keyed by retrieval evidence.
+
+Different wordings of one question ("Jan 2026 stats", "January 2026
+statistics", "What happened in January 2026?") retrieve the same top chunks
+and are answered with the same structured intent. The insight the LLM writes
+for them only depends on that evidence, so ``ChatHandler.chat`` looks it up
+under an ``evidence_key``, a hash of:
+
+- the ids of the chunks sent to the LLM as context (order-insensitive),
+- the intent detected by ``AnswerComposer._try_structured_format``
+  (e.g. ``"month:January 2026"``, ``"leadership"``, ``"retrieval"``),
+- the answer language,
+- ``RagSystem.data_version``, so edited data never serves an old insight.
+
+Entries live in a bounded in-memory LRU. ``ANSWER_CACHE_SIZE`` sets the
+number of entries (default 512, ``0`` disables the cache) and
+``ANSWER_CACHE_TTL`` their lifetime in seconds (default 3600, ``0`` keeps
+them until evicted). With ``CACHE_DB`` set, the persistent tier in
+disk_cache.py sits behind it: misses are looked up there (and promoted),
+and every insight is written through, so a restarted server or another
+worker answers warm. ``ANSWER_CACHE_TTL`` only applies to the memory tier;
+disk entries stay until the data changes or the size bound evicts them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable
+
+try:
+    from backend.cache.disk_cache import DiskCache
+except ImportError:
+    from cache.disk_cache import DiskCache
+
+NAMESPACE = "answers"
+
+
+def evidence_key(chunk_ids: Iterable[int], intent: str, language: str, data_version: str | None = None) -> str:
+    ids = ",".join(str(i) for i in sorted(set(chunk_ids)))
+    return hashlib.sha1(f"{data_version or ''}|{intent}|{language}|{ids}".encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    def __init__(self, max_entries: int | None = None, ttl: float | None = None,
+                 store: DiskCache | None = None) -> None:
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()  # key -> (stored at, insight)
+        self.store = store
+        self._store_version: str | None = None  # data version the store was last invalidated for
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    @classmethod
+    def from_env(cls) -> AnswerCache:
+        return cls(store=DiskCache.from_env())
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str) -> str | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl > 0 and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        # No age limit on disk: the key holds the data version, and a restart after a
+        # night's spin-down should still answer warm
+        insight = self.store.get(NAMESPACE, key) if self.store is not None else None
+        with self._lock:
+            if insight is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, insight)
+        return insight
+
+    def put(self, key: str, insight: str, data_version: str | None = None) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._remember(key, insight)
+        if self.store is not None:
+            if data_version is not None and data_version != self._store_version:
+                dropped = self.store.invalidate(NAMESPACE, data_version)
+                if dropped:
+                    print(f"🧹 Dropped {dropped} cached answers for older data")
+                self._store_version = data_version
+            self.store.put(NAMESPACE, key, insight, data_version or "")
+
+    def _remember(self, key: str, insight: str) -> None:
+        self._entries[key] = (time.monotonic(), insight)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "disk": self.store.stats() if self.store is not None else None,
+        }
@@ -0,0 +1,172 @@
+"""
+Persistent SQLite cache tier shared by uvicorn workers and restarts.
+
+The host restarts often (see keep_alive.py), and each restart used to lose
+every cached LLM output. With ``CACHE_DB`` set to a file path, two layers
+keep theirs in one SQLite database:
+
+- ``answers``: insights by evidence key, behind ``AnswerCache`` (chat)
+- ``llm``: post-processed Ollama responses by model, prompt and options,
+  behind ``LLMHandler.summarize``
+
+The database runs in WAL mode, so any number of worker processes read while
+one writes, and each thread has its own connection. Every entry records the
+data version it was produced for; ``invalidate`` drops a namespace's entries
+for other versions. Once the database passes ``CACHE_DB_MAX_MB`` (default
+64), the least recently used entries are deleted until it is back under 90%
+of the bound. The size is checked every few writes rather than on each one,
+so the database can briefly run over the bound by about 5%.
+
+``/tmp`` is fine for sharing the cache between workers and surviving worker
+restarts. Keeping it across host spin-downs and redeploys needs ``CACHE_DB``
+on a persistent disk.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data_version TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+BUSY_TIMEOUT_MS = 5000
+# Hits refresh the access time at most this often, to keep reads read-only
+TOUCH_INTERVAL = 60.0
+# The size bound is checked every EVICT_EVERY writes, or sooner after a
+# twentieth of the bound has been written, instead of summing on every put
+EVICT_EVERY = 32
+
+
+class DiskCache:
+    def __init__(self, path: str | Path, max_bytes: int | None = None) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes if max_bytes is not None else int(float(os.getenv("CACHE_DB_MAX_MB", "64")) * 2**20)
+        self._local = threading.local()
+        self._writes = 0
+        self._unchecked_bytes = 0  # written since the last size check
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> DiskCache | None:
+        path = os.getenv("CACHE_DB", "")
+        if not path:
+            return None
+        try:
+            return cls(path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  Persistent cache {path} unavailable: {e}")
+            return None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str, max_age: float = 0) -> str | None:
+        """Cached value, or None; ``max_age`` (seconds, 0 for any) ignores older entries"""
+        try:
+            conn = self._connect()
+            oldest = time.time() - max_age if max_age > 0 else 0.0
+            row = conn.execute("SELECT value, accessed FROM entries WHERE namespace = ? AND key = ? AND created >= ?",
+                               (namespace, key, oldest)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[1] > TOUCH_INTERVAL:
+                conn.execute("UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?", (now, namespace, key))
+            return row[0]
+        except sqlite3.Error as e:
+            print(f"⚠️  Persistent cache read failed: {e}")
+            return None
+
+    def put(self, namespace: str, key: str, value: str, data_version: str = "") -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (namespace, key, data_version, value, size, now, now),
+            )
+            self._writes += 1
+            self._unchecked_bytes += size
+            if self._writes % EVICT_EVERY == 0 or self._unchecked_bytes >= self.max_bytes // 20:
+                self._unchecked_bytes = 0
+                self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"⚠️  Persistent cache write failed: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # One statement, so other workers never see a half-evicted cache
+        conn.execute(
+            """
+            DELETE FROM entries WHERE rowid IN (
+                SELECT rowid FROM (
+                    SELECT rowid, size, SUM(size) OVER (ORDER BY accessed, rowid) AS freed FROM entries
+                ) WHERE freed - size < ?
+            )
+            """,
+            (total - int(self.max_bytes * 0.9),),
+        )
+
+    def invalidate(self, namespace: str, data_version: str) -> int:
+        """Drop ``namespace`` entries produced for any other data version"""
+        try:
+            cursor = self._connect().execute("DELETE FROM entries WHERE namespace = ? AND data_version != ?",
+                                             (namespace, data_version))
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"⚠️  Persistent cache invalidation failed: {e}")
+            return 0
+
+    def prune(self, namespace: str, max_age: float) -> int:
+        """Drop ``namespace`` entries written more than ``max_age`` seconds ago"""
+        try:
+            cursor = self._connect().execute("DELETE FROM entries WHERE namespace = ? AND created < ?",
+                                             (namespace, time.time() - max_age))
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"⚠️  Persistent cache prune failed: {e}")
+            return 0
+
+    def stats(self) -> dict[str, Any]:
+        try:
+            rows = self._connect().execute(
+                "SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY namespace").fetchall()
+        except sqlite3.Error:
+            rows = []
+        return {
+            "path": str(self.path),
+            "max_bytes": self.max_bytes,
+            "namespaces": {ns: {"entries": count, "bytes": size} for ns, count, size in rows},
+        }
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,84 @@
+"""
+LLM insights generated offline by ``python -m backend.pregenerate``.
+
+The file holds one cleaned insight per evidence key (see answer_cache.py)
+together with the ``RagSystem.data_version`` it was generated against::
+
+    {"data_version": "3f9a...", "model": "llama3.1", "generated_at": ...,
+     "insights": {"<evidence key>": {"question": ..., "language": "en",
+                                     "intent": "month:April 2025", "insight": "<p>..."}}}
+
+``ChatHandler.chat`` serves these before calling the LLM. A file generated
+for other data is ignored, so editing the newsletter never serves stale
+insights. ``PREGENERATED_INSIGHTS`` overrides the default location,
+``backend/data/pregenerated_insights.json``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "data" / "pregenerated_insights.json"
+
+
+def default_path() -> Path:
+    return Path(os.getenv("PREGENERATED_INSIGHTS", "") or DEFAULT_PATH)
+
+
+def write_insights(path: str | Path, data_version: str, model: str | None,
+                   insights: dict[str, dict[str, Any]]) -> None:
+    """Write atomically, so a running server never reads a partial file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body = {"data_version": data_version, "model": model, "generated_at": time.time(), "insights": insights}
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(body, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class PregeneratedInsights:
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path) if path is not None else default_path()
+        self.insights: dict[str, dict[str, Any]] = {}
+        self.data_version: str | None = None  # version the loaded insights belong to
+        self._loaded_for: str | None = None
+        self._lock = threading.Lock()
+
+    def load(self, data_version: str) -> int:
+        """(Re)read the file for ``data_version``; returns the number of usable insights"""
+        with self._lock:
+            self._loaded_for, self.insights, self.data_version = data_version, {}, None
+            if not self.path.exists():
+                return 0
+            try:
+                body = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Could not read pre-generated insights {self.path}: {e}")
+                return 0
+            if body.get("data_version") != data_version:
+                print(f"⚠️  Pre-generated insights are for data version {body.get('data_version')}, "
+                      f"not {data_version}; ignoring them")
+                return 0
+            self.insights, self.data_version = body.get("insights", {}), data_version
+            print(f"✅ Loaded {len(self.insights)} pre-generated insights")
+            return len(self.insights)
+
+    def entries(self, data_version: str | None) -> dict[str, dict[str, Any]]:
+        """Insights usable for ``data_version``, by key; loads them on first use"""
+        if data_version is None:
+            return {}
+        if data_version != self._loaded_for:
+            self.load(data_version)
+        return self.insights
+
+    def get(self, key: str, data_version: str | None) -> str | None:
+        entry = self.entries(data_version).get(key)
+        return entry["insight"] if entry else None
+
+    def stats(self) -> dict[str, Any]:
+        return {"path": str(self.path), "data_version": self.data_version, "entries": len(self.insights)}
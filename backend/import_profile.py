@@ -0,0 +1,83 @@
+"""
+Import-time profile report for the backend entry point.
+
+Usage:
+    python -m backend.import_profile [module] [--top N]
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter and
+prints the slowest imports by cumulative time. Heavy dependencies (numpy,
+scikit-learn, faiss, requests) must not appear: they are loaded lazily so the
+server binds its port and answers /api/health right after a cold start.
+The exit code is 1 when any heavy module is imported eagerly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("numpy", "sklearn", "scipy", "faiss", "requests", "pandas")
+
+
+def profile_imports(module: str = "backend.main") -> list[dict]:
+    """
+    Return one entry per imported module with self and cumulative time in
+    microseconds, in the order the interpreter reported them.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=str(REPO_ROOT),
+        check=True,
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return entries
+
+
+def heavy_imports(entries: list[dict]) -> list[str]:
+    """Names of heavy top-level packages that were imported eagerly"""
+    found = {e["module"].split(".")[0] for e in entries}
+    return sorted(m for m in HEAVY_MODULES if m in found)
+
+
+def format_report(entries: list[dict], top: int = 20) -> str:
+    total_us = sum(e["self_us"] for e in entries)
+    lines = [
+        f"{len(entries)} modules imported in {total_us / 1000:.1f} ms",
+        f"{'cumulative ms':>14}  {'self ms':>8}  module",
+    ]
+    for e in sorted(entries, key=lambda e: e["cumulative_us"], reverse=True)[:top]:
+        lines.append(f"{e['cumulative_us'] / 1000:>14.1f}  {e['self_us'] / 1000:>8.1f}  {e['module']}")
+    heavy = heavy_imports(entries)
+    if heavy:
+        lines.append(f"WARNING: heavy modules imported eagerly: {', '.join(heavy)}")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import-time profile report")
+    parser.add_argument("module", nargs="?", default="backend.main")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    entries = profile_imports(args.module)
+    print(format_report(entries, args.top))
+    return 1 if heavy_imports(entries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+"""
+Deferred module loading for heavy dependencies.
+
+Modules returned by ``lazy_import`` are registered in ``sys.modules`` but only
+executed on first attribute access, so importing ``backend.main`` does not pay
+for numpy, scikit-learn, faiss or requests before the server binds its port.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str, *, optional: bool = False) -> ModuleType | None:
+    """
+    Return a module object for ``name`` whose body runs on first use.
+    With ``optional=True`` a missing module yields None instead of raising.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        if optional:
+            return None
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,344 @@
+"""
+Chat answers as structured blocks.
+
+The structured formatters in chat_handler.py describe an answer as a list of
+JSON-serialisable blocks instead of HTML. Text that comes from the language
+tables is referenced by its ``BILINGUAL_LABELS`` key, so a client that has
+the labels (``GET /api/chat/labels``) only needs the data:
+
+    {"type": "heading", "label": "education_report", "prefix": "April 2025"}
+    {"type": "heading", "label": "kpi_title", "suffix": "Learning Outcomes"}
+    {"type": "section", "label": "key_statistics"}
+    {"type": "table", "columns": ["metric", "value"],
+     "rows": [[{"label": "schools"}, "14,72,000"],
+              [{"label": "attendance_integration"}, {"label": "states_uts_unit", "count": "28"}]],
+     "styles": [{"bold": true}, {}]}
+    {"type": "list", "items": ["..."]}
+    {"type": "paragraph", "label": "dpdp_scope_text", "lead": {"label": "dpdp_scope"}}
+    {"type": "paragraph", "label": "not_available"}
+    {"type": "byline", "name": "...", "position": "..."}
+    {"type": "no_data"}
+    {"type": "insight", "html": "..."}       # cleaned LLM output
+    {"type": "html", "html": "..."}          # LLM answer that replaces the tables
+    {"type": "attribution", "text": "..."}   # markdown footer
+
+Headings, sections, paragraphs and table columns carry either ``label`` (a
+key) or ``text`` (literal). Table cells are literal strings (data) or
+``{"label": key}``, with an optional ``count`` placed before the label. All
+fixed wording goes through labels, so a structured answer's blocks are the
+same in every language and only the rendering differs. ``render_blocks`` turns
+blocks into the HTML /api/chat has always returned; frontend/js/answer-blocks.js
+is its client-side counterpart and must produce the same markup.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+try:
+    from backend.llm.table_renderer import render_table
+except ImportError:
+    from llm.table_renderer import render_table
+
+Block = dict[str, Any]
+
+BILINGUAL_LABELS = {
+    "en": {
+        "education_report": "Education Intelligence Report",
+        "key_statistics": "Key Statistics",
+        "key_highlights": "Key Highlights",
+        "major_activities": "Major Activities & Initiatives",
+        "notable_events": "Notable Events",
+        "state_performance": "State-wise Performance",
+        "metric": "Metric",
+        "value": "Value",
+        "event": "Event",
+        "date": "Date",
+        "description": "Description",
+        "participants": "Participants",
+        "state_ut": "State / UT",
+        "attendance": "Attendance",
+        "apaar_coverage": "APAAR Coverage",
+        "schools": "Schools",
+        "teachers": "Teachers",
+        "students": "Students",
+        "apaar_ids": "APAAR IDs Generated",
+        "attendance_rate": "Attendance Rate",
+        "rvsk_title": "Rashtriya Vidya Samiksha Kendra (RVSK)",
+        "current_progress": "Current Progress (As of January 31, 2026)",
+        "six_a_framework": "6A Educational Data Framework",
+        "pillar": "Pillar",
+        "integration_status": "Integration Status",
+        "coverage": "Coverage",
+        "national_programs": "13 National Programs Supported",
+        "leadership": "RVSK Leadership",
+        "name": "Name",
+        "designation": "Designation",
+        "technical_title": "Technical Developments & Infrastructure",
+        "dashboard_features": "Dashboard Features",
+        "infrastructure_upgrades": "Infrastructure Upgrades",
+        "apaar_milestones": "APAAR Registration Milestones",
+        "month": "Month",
+        "registrations": "Registrations",
+        "states_active": "States Active",
+        "growth": "Growth",
+        "kpi_title": "Key Performance Indicators",
+        "indicator": "Indicator",
+        "parameter": "Parameter",
+        "state_engagement_title": "State Engagement Overview",
+        "top_performing": "Top Performing States",
+        "consent_framework": "Consent Framework",
+        "director_message": "Director's Message",
+        "no_data_title": "No relevant information found in the official newsletter data.",
+        "no_data_suggest": "Please try asking about:",
+        "no_data_items": [
+            "Monthly statistics and activities (April 2025 - January 2026)",
+            "APAAR ID generation progress and milestones",
+            "State performance and attendance rates",
+            "Technical developments and infrastructure",
+            "Learning outcomes and key performance indicators",
+            "RVSK leadership and 6A Framework",
+        ],
+        "based_on": "Based on official newsletter data",
+        "analysis_insights": "Analysis & Insights",
+        "not_available": "This information is not available in the current RVSK newsletters.",
+        "activity": "Activity / Initiative",
+        "rank": "#",
+        "feature": "Feature",
+        "upgrade": "Upgrade",
+        "total_states_uts": "Total States / UTs",
+        "active_participants": "Active Participants",
+        "mous_signed": "MOUs Signed",
+        "advanced_implementation": "Advanced Implementation",
+        "pilot_phase": "Pilot Phase",
+        "digital_readiness": "Digital Readiness",
+        "total_consents": "Total Consents Collected",
+        "digital_consent_rate": "Digital Consent Rate",
+        "parent_awareness_programs": "Parent Awareness Programs",
+        "data_privacy_compliance": "Data Privacy Compliance",
+        "states_uts_operationalized": "States/UTs Operationalized",
+        "cabs_operational": "CABs Operational",
+        "total_operational_vsks": "Total Operational VSKs",
+        "schools_connected": "Schools Connected",
+        "teachers_linked": "Teachers Linked",
+        "students_tracked": "Students Tracked",
+        "schools_integrated_rvsk": "Schools Integrated (RVSK)",
+        "total_apaar_ids": "Total APAAR IDs Generated",
+        "attendance_integration": "Attendance Integration",
+        "assessment_integration": "Assessment Integration",
+        "states_uts_unit": "States/UTs",
+        "six_a_intro": "The 6A Framework is the core educational data architecture of RVSK, covering six pillars of school education monitoring:",
+        "dpdp_title": "DPDP Act 2023 — Compliance in RVSK/VSK",
+        "dpdp_intro": "The Digital Personal Data Protection (DPDP) Act, 2023 is India's comprehensive data privacy legislation. "
+                      "The RVSK/VSK platform manages educational data in alignment with the Act's principles:",
+        "dpdp_principle": "DPDP Principle",
+        "dpdp_implementation": "Implementation in RVSK/VSK",
+        "dpdp_minimization": "Data Minimization",
+        "dpdp_minimization_text": "Only essential educational data (attendance, assessment, APAAR ID) is collected. The 6A Framework defines specific data domains to prevent excessive data collection.",
+        "dpdp_purpose": "Purpose Limitation",
+        "dpdp_purpose_text": "Data is used exclusively for educational monitoring, policy formulation, and improving learning outcomes — not for unrelated purposes.",
+        "dpdp_access": "Access Control",
+        "dpdp_access_text": "Role-based dashboards at State, District, and Block levels. Officials can only view data within their jurisdictional scope.",
+        "dpdp_consent": "Consent Framework",
+        "dpdp_consent_text": "Parental/guardian consent is required for APAAR ID generation. Digital consent rates are tracked across States/UTs.",
+        "dpdp_security": "Data Security",
+        "dpdp_security_text": "UDISE+ and LGD nomenclature alignment across 28 States/UTs. Privacy-by-design principles applied to all 6A Framework data handling.",
+        "dpdp_audit": "Audit Trails",
+        "dpdp_audit_text": "Data access and modifications are logged. Multi-level escalation systems (e.g., Odisha model: 7 days → Headmaster, 15 → BEO, 30 → DEO) ensure transparency.",
+        "dpdp_quality": "Data Quality",
+        "dpdp_quality_text": "91.7% data quality achieved in the Assessment module. Internal RVSK portal completed UAT with all States/UTs for data validation.",
+        "dpdp_scope": "Scope Limitations",
+        "dpdp_scope_text": "Specific DPDP Act 2023 compliance certifications are not explicitly documented in the current newsletter data. "
+                           "The above mapping is based on the platform's existing practices that align with DPDP principles.",
+    },
+    "hi": {
+        "education_report": "शिक्षा गुप्तचर रिपोर्ट",
+        "key_statistics": "मुख्य सांख्यिकी",
+        "key_highlights": "मुख्य विशेषताएं",
+        "major_activities": "प्रमुख गतिविधियां एवं पहल",
+        "notable_events": "उल्लेखनीय कार्यक्रम",
+        "state_performance": "राज्य-वार प्रदर्शन",
+        "metric": "मापदंड",
+        "value": "मान",
+        "event": "कार्यक्रम",
+        "date": "तिथि",
+        "description": "विवरण",
+        "participants": "प्रतिभागी",
+        "state_ut": "राज्य / केंद्र शासित प्रदेश",
+        "attendance": "उपस्थिति",
+        "apaar_coverage": "APAAR कवरेज",
+        "schools": "स्कूल",
+        "teachers": "शिक्षक",
+        "students": "छात्र",
+        "apaar_ids": "APAAR IDs जनित",
+        "attendance_rate": "उपस्थिति दर",
+        "rvsk_title": "राष्ट्रीय विद्या समीक्षा केंद्र (RVSK)",
+        "current_progress": "वर्तमान प्रगति (31 जनवरी 2026 तक)",
+        "six_a_framework": "6A शैक्षिक डेटा फ्रेमवर्क",
+        "pillar": "स्तंभ",
+        "integration_status": "एकीकरण स्थिति",
+        "coverage": "कवरेज",
+        "national_programs": "13 राष्ट्रीय कार्यक्रम समर्थित",
+        "leadership": "RVSK नेतृत्व",
+        "name": "नाम",
+        "designation": "पदनाम",
+        "technical_title": "तकनीकी विकास एवं अवसंरचना",
+        "dashboard_features": "डैशबोर्ड सुविधाएं",
+        "infrastructure_upgrades": "अवसंरचना उन्नयन",
+        "apaar_milestones": "APAAR पंजीकरण मील के पत्थर",
+        "month": "माह",
+        "registrations": "पंजीकरण",
+        "states_active": "सक्रिय राज्य",
+        "growth": "वृद्धि",
+        "kpi_title": "मुख्य प्रदर्शन संकेतक",
+        "indicator": "संकेतक",
+        "parameter": "पैरामीटर",
+        "state_engagement_title": "राज्य जुड़ाव अवलोकन",
+        "top_performing": "शीर्ष प्रदर्शन करने वाले राज्य",
+        "consent_framework": "सहमति ढांचा",
+        "director_message": "निदेशक का संदेश",
+        "no_data_title": "आधिकारिक न्यूज़लेटर डेटा में कोई प्रासंगिक जानकारी नहीं मिली।",
+        "no_data_suggest": "कृपया इनके बारे में पूछने का प्रयास करें:",
+        "no_data_items": [
+            "मासिक सांख्यिकी और गतिविधियां (अप्रैल 2025 - जनवरी 2026)",
+            "APAAR ID निर्माण प्रगति और मील के पत्थर",
+            "राज्य प्रदर्शन और उपस्थिति दर",
+            "तकनीकी विकास और अवसंरचना",
+            "सीखने के परिणाम और प्रमुख प्रदर्शन संकेतक",
+            "RVSK नेतृत्व और 6A Framework",
+        ],
+        "based_on": "आधिकारिक न्यूज़लेटर डेटा पर आधारित",
+        "analysis_insights": "विश्लेषण एवं अंतर्दृष्टि",
+        "not_available": "यह जानकारी वर्तमान RVSK न्यूज़लेटर में उपलब्ध नहीं है।",
+        "activity": "गतिविधि / पहल",
+        "rank": "क्र.",
+        "feature": "सुविधा",
+        "upgrade": "उन्नयन",
+        "total_states_uts": "कुल राज्य / केंद्र शासित प्रदेश",
+        "active_participants": "सक्रिय प्रतिभागी",
+        "mous_signed": "हस्ताक्षरित MOU",
+        "advanced_implementation": "उन्नत कार्यान्वयन",
+        "pilot_phase": "पायलट चरण",
+        "digital_readiness": "डिजिटल तत्परता",
+        "total_consents": "कुल एकत्रित सहमतियां",
+        "digital_consent_rate": "डिजिटल सहमति दर",
+        "parent_awareness_programs": "अभिभावक जागरूकता कार्यक्रम",
+        "data_privacy_compliance": "डेटा गोपनीयता अनुपालन",
+        "states_uts_operationalized": "संचालित राज्य/केंद्र शासित प्रदेश",
+        "cabs_operational": "संचालित CAB",
+        "total_operational_vsks": "कुल संचालित VSK",
+        "schools_connected": "जुड़े हुए स्कूल",
+        "teachers_linked": "जुड़े हुए शिक्षक",
+        "students_tracked": "ट्रैक किए गए छात्र",
+        "schools_integrated_rvsk": "एकीकृत स्कूल (RVSK)",
+        "total_apaar_ids": "कुल जनित APAAR IDs",
+        "attendance_integration": "उपस्थिति एकीकरण",
+        "assessment_integration": "मूल्यांकन एकीकरण",
+        "states_uts_unit": "राज्य/केंद्र शासित प्रदेश",
+        "six_a_intro": "6A Framework, RVSK का मूल शैक्षिक डेटा ढांचा है, जो स्कूली शिक्षा निगरानी के छह स्तंभों को कवर करता है:",
+        "dpdp_title": "DPDP अधिनियम 2023 — RVSK/VSK में अनुपालन",
+        "dpdp_intro": "डिजिटल व्यक्तिगत डेटा संरक्षण (DPDP) अधिनियम, 2023 भारत का व्यापक डेटा गोपनीयता कानून है। "
+                      "RVSK/VSK प्लेटफ़ॉर्म इस अधिनियम के सिद्धांतों का पालन करते हुए शैक्षिक डेटा का प्रबंधन करता है:",
+        "dpdp_principle": "DPDP सिद्धांत",
+        "dpdp_implementation": "RVSK/VSK में कार्यान्वयन",
+        "dpdp_minimization": "डेटा न्यूनीकरण",
+        "dpdp_minimization_text": "केवल आवश्यक शैक्षिक डेटा (उपस्थिति, मूल्यांकन, APAAR ID) एकत्र किया जाता है। 6A Framework के अंतर्गत विशिष्ट डेटा क्षेत्र परिभाषित हैं।",
+        "dpdp_purpose": "उद्देश्य सीमा",
+        "dpdp_purpose_text": "डेटा केवल शैक्षिक निगरानी, नीति निर्माण और सीखने के परिणामों में सुधार के लिए उपयोग किया जाता है।",
+        "dpdp_access": "पहुँच नियंत्रण",
+        "dpdp_access_text": "भूमिका-आधारित डैशबोर्ड: राज्य, जिला और ब्लॉक स्तर पर विभिन्न पहुँच स्तर। अधिकारी केवल अपने क्षेत्र का डेटा देख सकते हैं।",
+        "dpdp_consent": "सहमति ढांचा",
+        "dpdp_consent_text": "APAAR ID निर्माण के लिए अभिभावक/अभिभावक की सहमति आवश्यक। डिजिटल सहमति दर ट्रैक की जाती है।",
+        "dpdp_security": "डेटा सुरक्षा",
+        "dpdp_security_text": "UDISE+ और LGD नामावली का 28 राज्यों/केंद्र शासित प्रदेशों में संरेखण। Privacy-by-design सिद्धांत लागू।",
+        "dpdp_audit": "ऑडिट ट्रेल",
+        "dpdp_audit_text": "डेटा पहुँच और संशोधनों की लॉगिंग। बहु-स्तरीय एस्केलेशन प्रणाली (जैसे ओडिशा मॉडल) पारदर्शिता सुनिश्चित करती है।",
+        "dpdp_quality": "डेटा गुणवत्ता",
+        "dpdp_quality_text": "मूल्यांकन मॉड्यूल में 91.7% डेटा गुणवत्ता। RVSK आंतरिक पोर्टल सभी राज्यों/केंद्र शासित प्रदेशों के साथ UAT पूर्ण।",
+        "dpdp_scope": "कार्यक्षेत्र सीमाएं",
+        "dpdp_scope_text": "DPDP अधिनियम 2023 के विशिष्ट अनुपालन प्रमाणन की जानकारी वर्तमान न्यूज़लेटर डेटा में स्पष्ट रूप से प्रलेखित नहीं है। "
+                           "उपरोक्त मैपिंग प्लेटफ़ॉर्म की मौजूदा प्रथाओं पर आधारित है जो DPDP सिद्धांतों के अनुरूप हैं।",
+    },
+}
+
+HEADING_STYLE = "color:#003d82;margin:0 0 16px 0;"
+SECTION_FIRST_STYLE = "margin:8px 0;"
+SECTION_STYLE = "margin:20px 0 8px;"
+PARAGRAPH_STYLE = "margin:8px 0 12px;line-height:1.7;"
+LEAD_PARAGRAPH_STYLE = "margin:16px 0 4px;line-height:1.7;"
+LIST_STYLE = "margin:0;padding-left:24px;"
+ITEM_STYLE = "margin:6px 0;line-height:1.7;"
+RULE_STYLE = "border:none;border-top:1px solid #e0e0e0;margin:24px 0;"
+INSIGHT_STYLE = "padding:12px 16px;background:#f8f9fa;border-left:4px solid #003d82;border-radius:4px;line-height:1.7;"
+
+
+def labels(lang: str) -> dict[str, Any]:
+    """Label table for ``lang``, English for unknown languages"""
+    return BILINGUAL_LABELS.get(lang, BILINGUAL_LABELS["en"])
+
+
+def _text(item: Any, table: dict[str, Any]) -> str:
+    # A label key, or {"label": key} / {"text": literal}
+    if isinstance(item, str):
+        return table.get(item, item)
+    if "label" in item:
+        return table.get(item["label"], item["label"])
+    return item.get("text", "")
+
+
+def _cell(cell: Any, table: dict[str, Any]) -> str:
+    # Data cells are literal strings; only {"label": key} cells are translated
+    if isinstance(cell, str):
+        return cell
+    text = _text(cell, table)
+    return f'{cell["count"]} {text}' if "count" in cell else text
+
+
+def render_block(block: Block, table: dict[str, Any], after_heading: bool = False) -> str:
+    kind = block["type"]
+    if kind == "heading":
+        title = _text(block, table)
+        if block.get("prefix"):
+            title = f'{block["prefix"]} — {title}'
+        if block.get("suffix"):
+            title = f'{title}: {block["suffix"]}'
+        return f'<h3 style="{HEADING_STYLE}">{title}</h3>'
+    if kind == "section":
+        style = SECTION_FIRST_STYLE if after_heading else SECTION_STYLE
+        return f'<p style="{style}"><strong>{_text(block, table)}:</strong></p>'
+    if kind == "table":
+        rows = [[_cell(cell, table) for cell in row] for row in block["rows"]]
+        return render_table([_text(c, table) for c in block["columns"]], rows, col_styles=block.get("styles"))
+    if kind == "list":
+        items = "".join(f'<li style="{ITEM_STYLE}">{item}</li>' for item in block["items"])
+        return f'<ul style="{LIST_STYLE}">{items}</ul>'
+    if kind == "paragraph":
+        if block.get("lead"):
+            return f'<p style="{LEAD_PARAGRAPH_STYLE}"><strong>{_text(block["lead"], table)}:</strong> {_text(block, table)}</p>'
+        return f'<p style="{PARAGRAPH_STYLE}">{_text(block, table)}</p>'
+    if kind == "byline":
+        return f'<p><strong>{block["name"]}</strong><br><em>{block["position"]}</em></p>'
+    if kind == "no_data":
+        items = "".join(f"<li>{item}</li>" for item in table["no_data_items"])
+        return (f'<p><strong>{table["no_data_title"]}</strong></p>'
+                f'<p>{table["no_data_suggest"]}</p><ul>{items}</ul>')
+    if kind == "insight":
+        return (f'<hr style="{RULE_STYLE}">\n'
+                f'<p style="margin:12px 0 8px;"><strong>{table["analysis_insights"]}:</strong></p>\n'
+                f'<div style="{INSIGHT_STYLE}">{block["html"]}</div>')
+    if kind == "html":
+        return block["html"]
+    if kind == "attribution":
+        return f'\n{block["text"]}'
+    raise ValueError(f"Unknown answer block type: {kind!r}")
+
+
+def render_blocks(blocks: list[Block], lang: str = "en") -> str:
+    """HTML for an answer given as blocks"""
+    table = labels(lang)
+    parts = []
+    previous = None
+    for block in blocks:
+        parts.append(render_block(block, table, after_heading=previous in (None, "heading")))
+        previous = block["type"]
+    return "\n".join(parts)
@@ -0,0 +1,112 @@
+"""
+Generation options per kind of question.
+
+``summarize`` used to send ``num_predict: 1024`` and the same options for
+every question, so a one-line fact cost as much as a state-wise table, and
+the context window was left at Ollama's default even though the structured
+prompt alone is over 4,000 tokens. The options now come from three inputs:
+
+- brevity: ``wants_brief``, e.g. "briefly", "in short", "संक्षेप में";
+- the query type: ``detect_query_type``. With brevity, it selects the profile;
+- the chapter: ``detect_chapter``. State questions get room for longer tables.
+
+==========  ===========  =============================================
+profile     num_predict  stops at
+==========  ===========  =============================================
+brief       256          Data Source, Related Questions, prompt echo
+fact        384          Data Source, Related Questions, prompt echo
+highlights  640          Data Source, Related Questions, prompt echo
+analysis    1024         prompt echo (statistical / temporal questions)
+default     1024         prompt echo
+==========  ===========  =============================================
+
+The shorter profiles stop before the source and follow-up sections. The
+response formatter adds those afterwards, without generating them.
+``num_ctx`` is sized to the prompt plus ``num_predict``, rounded up to 512
+and capped by ``OLLAMA_MAX_CTX`` (default 8192). ``ProfileStats`` counts
+requests, generated tokens, generation time and length cut-offs per profile
+for ``/api/llm/status``.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+# Keep the model from continuing into a new turn of the prompt template
+PROMPT_ECHO_STOPS = ("USER QUERY:", "NEWSLETTER CONTEXT:")
+# Boilerplate the response formatter adds itself when the model stops early
+SECTION_STOPS = ("**Data Source:**", "**Related Questions")
+# Characters per token for the size estimate; on the low side so the window is not too small
+CHARS_PER_TOKEN = 3.0
+CTX_STEP = 512
+MIN_CTX = 2048
+WIDE_CHAPTERS = frozenset({"state"})
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    name: str
+    num_predict: int
+    stop: tuple[str, ...] = PROMPT_ECHO_STOPS
+
+    def options(self, prompt: str, chapter: str = "general") -> dict[str, Any]:
+        num_predict = self.num_predict
+        if chapter in WIDE_CHAPTERS and self.name in ("analysis", "default"):
+            num_predict += num_predict // 2  # one row per State/UT
+        max_ctx = int(os.getenv("OLLAMA_MAX_CTX", "8192"))
+        needed = len(prompt) / CHARS_PER_TOKEN + num_predict
+        num_ctx = min(max_ctx, max(MIN_CTX, math.ceil(needed / CTX_STEP) * CTX_STEP))
+        return {"num_predict": num_predict, "num_ctx": num_ctx, "stop": list(self.stop)}
+
+
+PROFILES = {
+    "brief": GenerationProfile("brief", 256, PROMPT_ECHO_STOPS + SECTION_STOPS),
+    "fact": GenerationProfile("fact", 384, PROMPT_ECHO_STOPS + SECTION_STOPS),
+    "highlights": GenerationProfile("highlights", 640, PROMPT_ECHO_STOPS + SECTION_STOPS),
+    "analysis": GenerationProfile("analysis", 1024),
+    "default": GenerationProfile("default", 1024),
+}
+QUERY_TYPE_PROFILES = {
+    "specific_fact": "fact",
+    "highlights": "highlights",
+    "statistical": "analysis",
+    "temporal": "analysis",
+}
+
+
+def select_profile(query_type: str, brief: bool) -> GenerationProfile:
+    """Profile for a question; the chapter is applied later, in ``options``"""
+    if brief:
+        return PROFILES["brief"]
+    return PROFILES[QUERY_TYPE_PROFILES.get(query_type, "default")]
+
+
+class ProfileStats:
+    def __init__(self) -> None:
+        self._stats: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, profile: str, payload: dict[str, Any]) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(profile, {"requests": 0, "tokens": 0, "eval_ms": 0.0, "cut_off": 0})
+            stats["requests"] += 1
+            stats["tokens"] += payload.get("eval_count", 0)
+            stats["eval_ms"] += payload.get("eval_duration", 0) / 1e6
+            if payload.get("done_reason") == "length":
+                stats["cut_off"] += 1
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                name: {
+                    "requests": s["requests"],
+                    "avg_tokens": round(s["tokens"] / s["requests"], 1),
+                    "avg_eval_ms": round(s["eval_ms"] / s["requests"], 1),
+                    "cut_off": s["cut_off"],
+                }
+                for name, s in self._stats.items()
+            }
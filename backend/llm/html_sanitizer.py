@@ -0,0 +1,209 @@
+"""
+Streaming allow-list HTML sanitizer for LLM output.
+
+``HtmlSanitizer`` is a small state machine fed one chunk at a time (for
+example tokens as they stream from the model). Text passes through as soon
+as it arrives; only a partially received tag, comment opener or closing
+marker is held back, so memory per stream is bounded by MAX_TAG_LENGTH
+however long the output is, and every character is examined a constant
+number of times.
+
+- Tags in ALLOWED_TAGS are kept with only ALLOWED_ATTRIBUTES; ``on*``
+  handlers and anything else are dropped, and ``href`` values with a
+  ``javascript:``/``vbscript:``/``data:`` scheme become ``"#"``.
+- Tags in DROP_CONTENT_TAGS (``script``, ``iframe``, ``object``, ...) are
+  removed together with their content. When the closing tag never arrives
+  the rest of the stream is dropped.
+- Any other tag, comments and declarations are removed; their text stays.
+- A ``<`` that does not start a tag (``attendance < 90%``) is text and is
+  emitted as ``&lt;``, so it can never pair with text that follows a
+  removed tag to form a new one.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+ALLOWED_TAGS = frozenset({
+    "table", "thead", "tbody", "tfoot", "tr", "th", "td", "caption", "colgroup", "col",
+    "p", "br", "hr", "div", "span", "strong", "b", "em", "i", "u", "small", "sup", "sub",
+    "ul", "ol", "li", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "code", "pre", "a",
+})
+DROP_CONTENT_TAGS = frozenset({
+    "script", "style", "iframe", "object", "embed", "noscript", "template", "textarea",
+    "svg", "math", "title",
+})
+ALLOWED_ATTRIBUTES = frozenset({"class", "style", "colspan", "rowspan", "align", "scope", "title", "href"})
+URL_ATTRIBUTES = frozenset({"href"})
+MAX_TAG_LENGTH = 2048
+
+UNSAFE_URL_RE = re.compile(r"(?:javascript|vbscript|data):", re.IGNORECASE)
+TAG_NAME_RE = re.compile(r"<(/?)([A-Za-z][A-Za-z0-9]*)")
+ATTR_RE = re.compile(r"""(\s+)([^\s"'<>/=]+)(?:(\s*=\s*)("[^"]*"|'[^']*'|[^\s"'<>`=]+))?""")
+_URL_NOISE = re.compile(r"[\s\x00-\x1f]+")
+
+# Tokenizer states
+TEXT, OPEN, TAG, RAW, COMMENT, SKIP = range(6)
+
+
+@lru_cache(maxsize=None)
+def _marker(text: str) -> tuple[re.Pattern, int]:
+    # Case-insensitive search for a closing marker, and its length
+    return re.compile(re.escape(text), re.IGNORECASE), len(text)
+
+
+def _attribute(match: re.Match) -> str:
+    space, name, _, value = match.groups()
+    lowered = name.lower()
+    if lowered not in ALLOWED_ATTRIBUTES:
+        return ""
+    if lowered in URL_ATTRIBUTES and value:
+        url = _URL_NOISE.sub("", html.unescape(value.strip("\"'")))
+        if UNSAFE_URL_RE.match(url):
+            return f'{space}href="#"'
+    return match.group(0)
+
+
+def _clean_attributes(rest: str) -> str:
+    kept = "".join(_attribute(m) for m in ATTR_RE.finditer(rest))
+    stripped = rest.rstrip()
+    trailing = rest[len(stripped):]
+    if stripped.endswith("/"):
+        before = stripped[:-1]
+        trailing = before[len(before.rstrip()):] + "/" + trailing
+    return kept + trailing
+
+
+class HtmlSanitizer:
+    def __init__(self) -> None:
+        self._state = TEXT
+        self._buf = ""  # partial "<", "</", "<!", "<!-" or tag text
+        self._quote = ""
+        self._close: tuple[re.Pattern, int] | None = None
+        self._tail = ""  # end of dropped content that may begin a closing marker
+
+    def feed(self, chunk: str) -> str:
+        """Sanitize the next chunk; returns the output that is final so far"""
+        out: list[str] = []
+        i, n = 0, len(chunk)
+        while i < n:
+            state = self._state
+            if state == TEXT:
+                j = chunk.find("<", i)
+                if j < 0:
+                    out.append(chunk[i:])
+                    break
+                out.append(chunk[i:j])
+                self._state, self._buf = OPEN, "<"
+                i = j + 1
+            elif state == OPEN:
+                i = self._open(chunk[i], i, out)
+            elif state == TAG:
+                i = self._tag_chars(chunk, i, out)
+            elif state in (RAW, COMMENT):
+                i = self._skip_to_marker(chunk, i)
+            else:  # SKIP: discard up to the next '>'
+                j = chunk.find(">", i)
+                if j < 0:
+                    break
+                self._state = TEXT
+                i = j + 1
+        return "".join(out)
+
+    def close(self) -> str:
+        """Flush at end of stream; unfinished tags and dropped content are discarded"""
+        out = self._buf.replace("<", "&lt;") if self._state == OPEN and self._buf in ("<", "</") else ""
+        self.__init__()
+        return out
+
+    def _open(self, ch: str, i: int, out: list[str]) -> int:
+        buf = self._buf
+        if buf in ("<", "</"):
+            if ch.isascii() and ch.isalpha():
+                self._state, self._buf, self._quote = TAG, buf + ch, ""
+                return i + 1
+            if buf == "<" and ch in "/!":
+                self._buf = buf + ch
+                return i + 1
+            out.append(buf.replace("<", "&lt;"))  # not a tag: a literal '<'
+            self._state, self._buf = TEXT, ""
+            return i
+        if buf == "<!" and ch == "-":
+            self._buf = "<!-"
+            return i + 1
+        if buf == "<!-" and ch == "-":
+            self._state, self._close, self._tail, self._buf = COMMENT, _marker("-->"), "", ""
+            return i + 1
+        self._state, self._buf = SKIP, ""  # <!DOCTYPE ...>, <![CDATA[ ...
+        return i
+
+    def _tag_chars(self, chunk: str, i: int, out: list[str]) -> int:
+        n = len(chunk)
+        limit = min(n, i + MAX_TAG_LENGTH - len(self._buf) + 1)
+        j, quote = i, self._quote
+        while j < limit:
+            ch = chunk[j]
+            if quote:
+                if ch == quote:
+                    quote = ""
+            elif ch == '"' or ch == "'":
+                quote = ch
+            elif ch == ">":
+                tag = self._buf + chunk[i:j + 1]
+                self._state, self._buf = TEXT, ""
+                out.append(self._emit(tag))
+                return j + 1
+            j += 1
+        self._quote = quote
+        self._buf += chunk[i:j]
+        if len(self._buf) > MAX_TAG_LENGTH:
+            self._state, self._buf = SKIP, ""
+        return j
+
+    def _emit(self, tag: str) -> str:
+        m = TAG_NAME_RE.match(tag)
+        closing, name = bool(m.group(1)), m.group(2)
+        lowered = name.lower()
+        if lowered in DROP_CONTENT_TAGS:
+            if not closing:
+                self._state, self._close, self._tail = RAW, _marker(f"</{lowered}"), ""
+            return ""
+        if lowered not in ALLOWED_TAGS:
+            return ""
+        if closing:
+            return f"</{name}>"
+        return f"<{name}{_clean_attributes(tag[m.end():-1])}>"
+
+    def _skip_to_marker(self, chunk: str, i: int) -> int:
+        pattern, length = self._close
+        data = self._tail + chunk[i:]
+        m = pattern.search(data)
+        if m is None:
+            self._tail = data[-(length - 1):]
+            return len(chunk)
+        end = i + m.end() - len(self._tail)
+        self._tail = ""
+        # A closing tag still runs to its '>'; a comment ends at '-->'
+        self._state = TEXT if self._state == COMMENT else SKIP
+        return end
+
+
+def sanitize_html(text: str) -> str:
+    """Sanitize a complete string"""
+    sanitizer = HtmlSanitizer()
+    return sanitizer.feed(text) + sanitizer.close()
+
+
+def sanitize_stream(chunks: Iterable[str]) -> Iterator[str]:
+    """Sanitize a stream of chunks, yielding output as soon as it is safe"""
+    sanitizer = HtmlSanitizer()
+    for chunk in chunks:
+        out = sanitizer.feed(chunk)
+        if out:
+            yield out
+    tail = sanitizer.close()
+    if tail:
+        yield tail
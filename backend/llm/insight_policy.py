@@ -0,0 +1,110 @@
+"""
+Decides whether a chat answer needs an LLM insight.
+
+For most questions the structured answer from
+``AnswerComposer._try_structured_format`` is already complete: a month's
+figures, the leadership table, the DPDP and 6A summaries. ``chat`` still
+waited up to 30 s for an "Analysis & Insights" box on top of them.
+``InsightPolicy.decide`` scores how completely the structured answer covers
+the question, from 0 to 1:
+
+- the intent sets the base score: fixed answers (leadership, DPDP, 6A) 1.0,
+  tables built from the data 0.85-0.9, the plain list of retrieved chunks 0.2;
+- answers without a table or list lose 0.2;
+- analytical questions ("why", "compare", "trend", "क्यों", ...) lose 0.4,
+  since the tables show figures but do not explain them;
+- questions naming two or more months lose 0.3: the structured answer covers
+  only one of them.
+
+At or above ``CHAT_INSIGHT_THRESHOLD`` (default 0.75) the answer goes out
+without the LLM. Below it, ``CHAT_INSIGHT_POLICY`` says what happens:
+
+- ``auto`` (default): answer at once and generate the insight in the
+  background (insight_jobs.py); the client fetches it by job id;
+- ``wait``: call the LLM and wait for it;
+- ``always``: call the LLM for every answer and wait, as before;
+- ``never``: never call the LLM from the chat.
+
+Insights that are pre-generated or cached cost nothing and are always added.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+from typing import Any
+
+try:
+    from backend.rag.partitions import mentioned_months
+except ImportError:
+    from rag.partitions import mentioned_months
+
+MODES = ("auto", "wait", "always", "never")
+
+# Base coverage by intent kind (the part of the intent before ":")
+INTENT_COVERAGE = {
+    "leadership": 1.0,
+    "dpdp": 1.0,
+    "six_a": 1.0,
+    "month": 0.9,
+    "kpi": 0.9,
+    "director_message": 0.9,
+    "state_engagement": 0.85,
+    "technical": 0.85,
+    "rvsk": 0.8,
+    "retrieval": 0.2,
+}
+NO_TABLE_PENALTY = 0.2
+ANALYTIC_PENALTY = 0.4
+MULTI_MONTH_PENALTY = 0.3
+
+ANALYTIC_RE = re.compile(
+    r"\b(?:why|how did|how has|compare|comparison|versus|vs|trends?|explain|impact|analy[sz]e|analysis"
+    r"|insights?|reasons?|differences?|changed?|growth)\b"
+    r"|क्यों|तुलना|विश्लेषण|प्रभाव|रुझान|अंतर"
+)
+class InsightPolicy:
+    def __init__(self, mode: str | None = None, threshold: float | None = None) -> None:
+        self.mode = (mode or os.getenv("CHAT_INSIGHT_POLICY", "auto")).lower()
+        if self.mode not in MODES:
+            raise ValueError(f"CHAT_INSIGHT_POLICY must be one of {', '.join(MODES)}, got {self.mode!r}")
+        self.threshold = threshold if threshold is not None else float(os.getenv("CHAT_INSIGHT_THRESHOLD", "0.75"))
+        self.decisions = {"call": 0, "skip": 0, "defer": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def coverage(intent: str, blocks: list[dict[str, Any]], query: str) -> tuple[float, str]:
+        """Score from 0 to 1 of how completely ``blocks`` answer ``query``, and the main reason"""
+        kind = intent.partition(":")[0]
+        score = INTENT_COVERAGE.get(kind, 0.5)
+        reason = f"intent {kind}"
+        if not any(block["type"] in ("table", "list") for block in blocks):
+            score -= NO_TABLE_PENALTY
+            reason = "no table in the answer"
+        if ANALYTIC_RE.search(query.lower()):
+            score -= ANALYTIC_PENALTY
+            reason = "analytical question"
+        if len(mentioned_months(query)) > 1:
+            score -= MULTI_MONTH_PENALTY
+            reason = "several months named"
+        return round(max(score, 0.0), 2), reason
+
+    def decide(self, intent: str, blocks: list[dict[str, Any]], query: str) -> tuple[str, float, str]:
+        """("call" | "skip" | "defer", coverage score, reason)"""
+        score, reason = self.coverage(intent, blocks, query)
+        if self.mode == "always":
+            action = "call"
+        elif self.mode == "never":
+            action = "skip"
+        elif score >= self.threshold:
+            action = "skip"
+        else:
+            action = "call" if self.mode == "wait" else "defer"
+        with self._lock:
+            self.decisions[action] += 1
+        return action, score, reason
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"mode": self.mode, "threshold": self.threshold, "decisions": dict(self.decisions)}
@@ -1,26 +1,57 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import os
 from typing import Any
 
-import requests
-
 # Import enhanced system prompt and formatter
 try:
-    from backend.llm.system_prompt import get_enhanced_system_prompt, get_structured_prompt, detect_query_type, detect_chapter
+    from backend.cache.disk_cache import DiskCache
+    from backend.lazy_imports import lazy_import
+    from backend.llm.model_residency import ModelResidency
+    from backend.llm.generation_profiles import ProfileStats, select_profile
+    from backend.llm.system_prompt import get_enhanced_system_prompt, get_structured_prompt, detect_query_type, detect_chapter, wants_brief
     from backend.llm.response_formatter import ensure_structured_format, add_source_urls
 except ImportError:
     # Fallback if module structure is different
-    from llm.system_prompt import get_enhanced_system_prompt, get_structured_prompt, detect_query_type, detect_chapter
+    from cache.disk_cache import DiskCache
+    from lazy_imports import lazy_import
+    from llm.model_residency import ModelResidency
+    from llm.generation_profiles import ProfileStats, select_profile
+    from llm.system_prompt import get_enhanced_system_prompt, get_structured_prompt, detect_query_type, detect_chapter, wants_brief
     from llm.response_formatter import ensure_structured_format, add_source_urls
 
+# Loaded on the first Ollama call rather than at server start
+requests = lazy_import("requests")
+
 
 class LLMHandler:
     def __init__(self) -> None:
         self.ollama_url = os.getenv("OLLAMA_URL", "")
         self.ollama_model = os.getenv("OLLAMA_MODEL", "llama3.1")
         self.enabled = bool(self.ollama_url)
+        # keep_alive sent with every request, scheduled pings and Ollama timings
+        self.residency = ModelResidency()
+        self.keep_alive = self.residency.keep_alive
+        # Tokens generated and time taken per generation profile
+        self.profile_stats = ProfileStats()
         self.system_prompt = get_enhanced_system_prompt()
+        # Responses by request body in the persistent cache (CACHE_DB), so
+        # repeated prompts survive restarts and are shared across workers
+        self.cache = DiskCache.from_env() if self.enabled else None
+        # RagSystem.data_version the cached responses belong to (set_data_version)
+        self.data_version: str | None = None
+
+    def set_data_version(self, data_version: str | None) -> None:
+        """Key cached responses by ``data_version`` and drop those cached for other data"""
+        if data_version == self.data_version:
+            return
+        self.data_version = data_version
+        if self.cache is not None and data_version is not None:
+            dropped = self.cache.invalidate("llm", data_version)
+            if dropped:
+                print(f"🧹 Dropped {dropped} cached LLM responses for older data")
 
     def status(self) -> dict[str, Any]:
         return {
@@ -30,8 +61,32 @@ class LLMHandler:
             "enhanced_prompt": True,
             "query_type_detection": True,
             "structured_responses": True,
+            "persistent_cache": self.cache.stats() if self.cache is not None else None,
+            "residency": self.residency.status() if self.enabled else None,
+            "generation_profiles": self.profile_stats.snapshot(),
         }
 
+    def preload(self) -> dict[str, float] | None:
+        """
+        Load the model into Ollama's memory ahead of the first question. A
+        generate request without a prompt only loads the model and sets
+        ``keep_alive``; the durations (ms) show whether it was resident.
+        Also the residency manager's scheduled ping.
+        """
+        if not self.enabled:
+            return None
+        try:
+            response = requests.post(
+                f"{self.ollama_url.rstrip('/')}/api/generate",
+                json={"model": self.ollama_model, "keep_alive": self.keep_alive},
+                timeout=120,  # a cold load of a large model can take a while
+            )
+            response.raise_for_status()
+            return self.residency.record(response.json(), kind="ping")
+        except Exception as e:
+            print(f"LLM preload error: {e}")
+            return None
+
     def summarize(self, question: str, context: str, language: str = "en") -> str | None:
         """
         Enhanced summarization with structured responses and contextual questions
@@ -46,31 +101,48 @@ class LLMHandler:
 
         # Use structured prompt for better responses with language specification
         prompt = get_structured_prompt(question, context, language=language)
-
+        # Output length, context window and stop sequences for this kind of question
+        profile = select_profile(query_type, wants_brief(question))
+
+        body = {
+            "model": self.ollama_model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "temperature": 0.3,  # Low temperature for factual accuracy
+                "top_p": 0.9,
+                "top_k": 40,
+                "repeat_penalty": 1.1,
+                **profile.options(prompt, chapter),
+            }
+        }
+        cache_key = hashlib.sha256(
+            json.dumps({**body, "data_version": self.data_version}, sort_keys=True).encode("utf-8")).hexdigest()
+        body["keep_alive"] = self.keep_alive  # not part of the cache key: it does not change the output
+        if self.cache is not None:
+            cached = self.cache.get("llm", cache_key)
+            if cached is not None:
+                return cached
+
+        self.residency.note_request()
         try:
             response = requests.post(
                 f"{self.ollama_url.rstrip('/')}/api/generate",
-                json={
-                    "model": self.ollama_model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,  # Low temperature for factual accuracy
-                        "top_p": 0.9,
-                        "top_k": 40,
-                        "repeat_penalty": 1.1,
-                        "num_predict": 1024,  # Allow longer responses for structured format
-                    }
-                },
+                json=body,
                 timeout=30,  # Increased timeout for longer responses
             )
             response.raise_for_status()
             payload = response.json()
+            self.residency.record(payload)
+            self.profile_stats.record(profile.name, payload)
             llm_response = payload.get("response", "").strip()
 
             # Post-process to ensure structure with source URLs
             if llm_response:
-                return self._ensure_structured_response(llm_response, query_type, question, chapter)
+                structured = self._ensure_structured_response(llm_response, query_type, question, chapter)
+                if self.cache is not None:
+                    self.cache.put("llm", cache_key, structured, self.data_version or "")
+                return structured
 
             return None
 
@@ -0,0 +1,116 @@
+"""
+Single-pass extraction of statistics from LLM answers.
+
+One compiled scanner walks the answer once and classifies every match:
+
+- metric:  "Schools 14,72,000", "APAAR IDs 235000000", "Attendance 94.2%"
+- month:   "April 2025: 120M registrations"
+- percent: "<Capitalised Name> 94.2%", usually a State/UT, plus every
+  metric whose value is a percentage
+
+Values are kept as the answer wrote them, so Indian digit grouping
+("14,72,000") reaches the table unchanged.
+
+Metrics that follow a bullet character (``•``, ``-``, ``*``) on the same
+line are also collected per bullet. The table builders in data_formatter.py
+and production_cleaner.py read everything from the resulting
+``Extraction``. Before, each of them ran its own ``re.search`` per metric,
+per bullet and per pattern over the same text.
+
+``python -m benchmarks.extraction`` compares the scanner with those loops.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+try:
+    from backend.llm.table_renderer import render_metrics_table
+except ImportError:
+    from llm.table_renderer import render_metrics_table
+
+MONTHS = "January|February|March|April|May|June|July|August|September|October|November|December"
+
+# Canonical metric name by lowercase keyword (plural or singular)
+METRIC_NAMES = {
+    "school": "Schools", "teacher": "Teachers", "student": "Students",
+    "apaar id": "APAAR IDs", "attendance": "Attendance", "enrollment": "Enrollment",
+}
+PERCENT_ONLY = frozenset({"Attendance"})
+
+SCAN_RE = re.compile(
+    rf"""
+    \b(?=[A-Za-z])  # every alternative starts a word; rejects other positions early
+    (?:
+      (?P<month>(?i:{MONTHS})\s+\d{{4}}):\s*(?P<month_value>\d+M?)
+        (?:\s*(?i:registrations?|students?|schools?))?(?:\s*\([^)]+\))?
+    | (?P<metric>(?i:schools?|teachers?|students?|apaar\s+ids?|attendance|enrollment))
+        \s+(?P<metric_value>\d+(?:,\d+)*(?:\.\d+)?%?)
+    | (?P<name>[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s+(?P<percent>\d+(?:\.\d+)?%)
+    )
+    """,
+    re.VERBOSE,
+)
+BULLET_RE = re.compile(r"[•*-]")
+
+
+@dataclass
+class Extraction:
+    metrics: dict[str, str] = field(default_factory=dict)  # first value of each metric
+    metric_values: list[str] = field(default_factory=list)  # every metric value, raw
+    months: list[tuple[str, str]] = field(default_factory=list)  # (month, value)
+    percentages: list[tuple[str, str]] = field(default_factory=list)  # (name, value)
+    bullet_metrics: dict[str, str] = field(default_factory=dict)  # metric -> value from its last bullet
+    bullets_with_metrics: int = 0
+
+    def metrics_table(self, title: str = "Key Metrics", *, bullets: bool = False) -> str:
+        return render_metrics_table(self.bullet_metrics if bullets else self.metrics, title)
+
+
+@lru_cache(maxsize=256)
+def _metric_name(keyword: str) -> str:
+    key = " ".join(keyword.lower().split())
+    return METRIC_NAMES.get(key) or METRIC_NAMES[key[:-1]]
+
+
+def scan(text: str) -> Extraction:
+    """Collect every metric, month and percentage match in one pass over ``text``"""
+    result = Extraction()
+    last_end = 0
+    in_bullet = False  # a bullet character precedes us on the current line
+    bullet_seen: set[str] = set()  # metrics already taken from the current bullet
+
+    for m in SCAN_RE.finditer(text):
+        # Text between matches is looked at once, so bullet tracking stays linear
+        start = m.start()
+        newline = text.rfind("\n", last_end, start)
+        if newline >= 0:
+            in_bullet, bullet_seen, last_end = False, set(), newline + 1
+        if not in_bullet and BULLET_RE.search(text, last_end, start):
+            in_bullet = True
+        last_end = m.end()
+
+        kind = m.lastgroup
+        if kind == "month_value":
+            result.months.append((m.group("month"), m.group("month_value")))
+        elif kind == "metric_value":
+            keyword, value = m.group("metric", "metric_value")
+            name = _metric_name(keyword)
+            result.metric_values.append(value)
+            if value.endswith("%"):
+                result.percentages.append((keyword, value))
+            if value.endswith("%") or name not in PERCENT_ONLY:
+                result.metrics.setdefault(name, value)
+                if in_bullet and name not in bullet_seen:
+                    if not bullet_seen:
+                        result.bullets_with_metrics += 1
+                    bullet_seen.add(name)
+                    result.bullet_metrics[name] = value
+        else:
+            result.percentages.append(m.group("name", "percent"))
+
+        if text.find("\n", start, last_end) >= 0:
+            in_bullet, bullet_seen = False, set()
+    return result
@@ -0,0 +1,142 @@
+"""
+Keeps the Ollama model loaded while people are using the chat.
+
+Ollama unloads a model once its ``keep_alive`` runs out, and the next
+question then pays the full load time inside its 30 s timeout.
+``ModelResidency`` does three things:
+
+- sends ``keep_alive`` (``OLLAMA_KEEP_ALIVE``, default ``30m``) on every
+  request to the model;
+- pings the model shortly before that window ends, during working hours
+  (``OLLAMA_ACTIVE_HOURS``, default ``8-20`` in ``OLLAMA_TIMEZONE``,
+  default ``Asia/Kolkata``) and for ``OLLAMA_IDLE_GRACE`` seconds (default
+  3600) after the last question. Outside both, the model is left to unload;
+- records the load, prompt-eval, eval and total durations that Ollama
+  returns with each response. ``LLMHandler.status()`` reports them.
+
+``run`` is the scheduling loop; backend/main.py starts it as a lifespan
+task when the LLM is enabled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable
+
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# A resident model reports a load_duration of a few ms
+COLD_LOAD_MS = 500.0
+# Ping when this fraction of the keep_alive window has passed since the model was last used
+PING_AT = 0.8
+CHECK_INTERVAL = 60.0
+DURATION_FIELDS = ("load_duration", "prompt_eval_duration", "eval_duration", "total_duration")
+_DURATION_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, None: 1}
+
+
+def parse_keep_alive(value: str) -> float | None:
+    """Seconds in an Ollama keep_alive value ("30m", "1h", "300"); None for forever (negative)"""
+    m = _DURATION_RE.match(value)
+    if m is None:
+        raise ValueError(f"OLLAMA_KEEP_ALIVE must look like 30m, 1h or 300, got {value!r}")
+    seconds = float(m.group(1)) * _UNIT_SECONDS[m.group(2)]
+    return None if seconds < 0 else seconds
+
+
+def parse_hours(value: str) -> tuple[int, int]:
+    start, _, end = value.partition("-")
+    return int(start), int(end or 24)
+
+
+def _timezone(name: str):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        print(f"⚠️  Unknown OLLAMA_TIMEZONE {name!r}; using the server's local time")
+        return None
+
+
+class ModelResidency:
+    def __init__(self, keep_alive: str | None = None, active_hours: str | None = None,
+                 timezone: str | None = None, idle_grace: float | None = None) -> None:
+        self.keep_alive = keep_alive or os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+        self.keep_alive_seconds = parse_keep_alive(self.keep_alive)
+        self.active_hours = parse_hours(active_hours or os.getenv("OLLAMA_ACTIVE_HOURS", "8-20"))
+        self.tz = _timezone(timezone or os.getenv("OLLAMA_TIMEZONE", "Asia/Kolkata"))
+        self.idle_grace = idle_grace if idle_grace is not None else float(os.getenv("OLLAMA_IDLE_GRACE", "3600"))
+
+        self.last_request: float | None = None  # last user question (time.time())
+        self.last_used: float | None = None  # last request of any kind that reset keep_alive
+        self.pings = 0
+        self.cold_loads = 0
+        self.last: dict[str, float] | None = None
+        self._recent: deque[dict[str, float]] = deque(maxlen=50)
+        self._lock = threading.Lock()
+
+    def in_active_hours(self, now: float) -> bool:
+        hour = datetime.fromtimestamp(now, self.tz).hour
+        start, end = self.active_hours
+        return start <= hour < end if start <= end else hour >= start or hour < end
+
+    def should_ping(self, now: float | None = None) -> bool:
+        now = time.time() if now is None else now
+        if self.keep_alive_seconds is None:
+            return self.last_used is None  # kept forever once loaded
+        if self.keep_alive_seconds == 0:
+            return False  # unloaded after every request by choice
+        if self.last_used is not None and now - self.last_used < self.keep_alive_seconds * PING_AT:
+            return False
+        recent_traffic = self.last_request is not None and now - self.last_request < self.idle_grace
+        return recent_traffic or self.in_active_hours(now)
+
+    def note_request(self) -> None:
+        """A user question is about to reach the model"""
+        self.last_request = time.time()
+
+    def record(self, payload: dict[str, Any], kind: str = "generate") -> dict[str, float]:
+        """Note a response from Ollama; returns its durations in ms"""
+        now = time.time()
+        timings = {field.replace("_duration", "_ms"): payload.get(field, 0) / 1e6 for field in DURATION_FIELDS}
+        timings["eval_count"] = payload.get("eval_count", 0)
+        with self._lock:
+            self.last_used = now
+            if kind == "ping":
+                self.pings += 1
+            if timings["load_ms"] > COLD_LOAD_MS:
+                self.cold_loads += 1
+            self.last = {"kind": kind, "at": now, **timings}
+            if kind != "ping":
+                self._recent.append(timings)
+        return timings
+
+    async def run(self, ping: Callable[[], Any], interval: float = CHECK_INTERVAL) -> None:
+        """Ping through ``ping`` (blocking, run in a thread) whenever ``should_ping`` says so"""
+        while True:
+            if self.should_ping():
+                await asyncio.to_thread(ping)
+            await asyncio.sleep(interval)
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            recent = list(self._recent)
+        averages = {
+            key: round(sum(t[key] for t in recent) / len(recent), 1)
+            for key in ("load_ms", "prompt_eval_ms", "eval_ms", "total_ms")
+        } if recent else None
+        return {
+            "keep_alive": self.keep_alive,
+            "active_hours": "{}-{}".format(*self.active_hours),
+            "last_request": self.last_request,
+            "last_used": self.last_used,
+            "pings": self.pings,
+            "cold_loads": self.cold_loads,
+            "last": self.last,
+            "recent_average_ms": averages,
+        }
@@ -4,7 +4,13 @@ Ensures professional, government-grade output for Ministry of Education
 """
 
 import re
-from typing import Dict, List
+
+try:
+    from backend.llm.html_sanitizer import sanitize_html
+    from backend.llm.metric_extraction import scan
+except ImportError:
+    from llm.html_sanitizer import sanitize_html
+    from llm.metric_extraction import scan
 
 
 def remove_all_emojis(text: str) -> str:
@@ -37,26 +43,6 @@ def remove_all_emojis(text: str) -> str:
     return text
 
 
-def _sanitize_html(text: str) -> str:
-    """
-    Remove dangerous HTML tags and attributes to prevent XSS.
-    Preserves safe tags like <table>, <tr>, <td>, <th>, <p>, <strong>, etc.
-    """
-    # Remove script tags and their content
-    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    # Remove iframe tags
-    text = re.sub(r'<iframe[^>]*>.*?</iframe>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    # Remove object/embed tags
-    text = re.sub(r'<(object|embed)[^>]*>.*?</\1>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    # Remove event handler attributes (onclick, onerror, onload, etc.)
-    text = re.sub(r'\s+on\w+\s*=\s*["\'][^"\']*["\']', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\s+on\w+\s*=\s*\S+', '', text, flags=re.IGNORECASE)
-    # Remove javascript: URLs
-    text = re.sub(r'href\s*=\s*["\']javascript:[^"\']*["\']', 'href="#"', text, flags=re.IGNORECASE)
-    text = re.sub(r'src\s*=\s*["\']javascript:[^"\']*["\']', '', text, flags=re.IGNORECASE)
-    return text
-
-
 def production_grade_cleanup(response: str) -> str:
     """
     Clean up response for production-grade government output
@@ -65,8 +51,8 @@ def production_grade_cleanup(response: str) -> str:
     - Removes AI/chatbot language
     - Preserves safe HTML tables intact
     """
-    # Step 0: Sanitize dangerous HTML tags and attributes
-    cleaned = _sanitize_html(response)
+    # Step 0: Sanitize dangerous HTML tags and attributes (allow-list, see html_sanitizer.py)
+    cleaned = sanitize_html(response)
 
     # Step 1: Remove all emojis
     cleaned = remove_all_emojis(cleaned)
@@ -120,78 +106,12 @@ def intelligent_data_visualization(response: str, query: str) -> str:
 
     enhanced = response
 
-    # For statistics queries, extract bullet point data into tables
+    # For statistics queries, turn metrics found in bullet points into a table
     if is_statistics_query or is_comparison_query:
-        bullet_data = _extract_bullet_point_data(response)
-        if bullet_data and len(bullet_data) >= 2:
-            table_html = _format_bullet_data_as_html_table(bullet_data)
+        extraction = scan(response)
+        if extraction.bullets_with_metrics >= 2:
+            table_html = extraction.metrics_table("Statistical Summary", bullets=True)
             if table_html:
                 enhanced += '\n' + table_html
 
     return enhanced
-
-
-def _extract_bullet_point_data(text: str) -> List[Dict]:
-    """
-    Extract statistical data from bullet points
-    """
-    bullet_data = []
-    bullet_pattern = r'[•\-\*]\s*([^\n]+)'
-    matches = re.findall(bullet_pattern, text)
-
-    for match in matches:
-        has_numbers = bool(re.search(r'\d+(?:,\d{3})*', match))
-        if has_numbers:
-            metrics = {}
-            for metric_name, pattern in {
-                'Schools': r'[Ss]chools?\s+(\d+(?:,\d{3})*)',
-                'Teachers': r'[Tt]eachers?\s+(\d+(?:,\d{3})*)',
-                'Students': r'[Ss]tudents?\s+(\d+(?:,\d{3})*)',
-                'APAAR IDs': r'APAAR IDs?\s+(\d+(?:,\d{3})*)',
-                'Attendance': r'[Aa]ttendance\s+(\d+\.?\d*%)',
-            }.items():
-                m = re.search(pattern, match)
-                if m:
-                    metrics[metric_name] = m.group(1)
-            if metrics:
-                bullet_data.append({'text': match, 'metrics': metrics})
-
-    return bullet_data
-
-
-def _format_bullet_data_as_html_table(bullet_data: List[Dict]) -> str:
-    """
-    Convert bullet point data to an HTML table
-    """
-    if not bullet_data:
-        return ""
-
-    all_metrics = {}
-    for item in bullet_data:
-        all_metrics.update(item['metrics'])
-
-    if not all_metrics:
-        return ""
-
-    rows_html = ""
-    for i, (metric, value) in enumerate(all_metrics.items()):
-        bg = "#ffffff" if i % 2 == 0 else "#f8f9fa"
-        rows_html += f'''<tr style="background:{bg};">
-<td style="padding:12px;border-bottom:1px solid #e0e0e0;font-weight:500;color:#003d82;">{metric}</td>
-<td style="padding:12px;border-bottom:1px solid #e0e0e0;color:#333;font-weight:600;">{value}</td>
-</tr>'''
-
-    return f'''
-<p><strong>Statistical Summary:</strong></p>
-<table style="border-collapse:collapse;width:100%;margin:16px 0;box-shadow:0 2px 8px rgba(0,61,130,0.12);border-radius:8px;overflow:hidden;">
-<thead>
-<tr style="background:linear-gradient(135deg,#003d82 0%,#0056b3 100%);color:white;">
-<th style="padding:14px 12px;text-align:left;font-weight:600;border-bottom:3px solid #FF6600;">Metric</th>
-<th style="padding:14px 12px;text-align:left;font-weight:600;border-bottom:3px solid #FF6600;">Value</th>
-</tr>
-</thead>
-<tbody>
-{rows_html}
-</tbody>
-</table>
-'''
@@ -3,6 +3,8 @@ Enhanced System Prompt for Smart Education Newsletter Platform
 Ministry of Education, Government of India
 """
 
+import re
+
 ENHANCED_SYSTEM_PROMPT = """You are an AI assistant for the Ministry of Education, Government of India's Vidya Samiksha Kendra (VSK) Newsletter Platform. You provide precise, data-driven insights from monthly newsletters (April 2025 - January 2026).
 
 **COMMUNICATION STANDARDS:**
@@ -297,10 +299,11 @@ Remember: You are a data-focused assistant for government education officials. Y
 - Helpful in guiding further exploration through follow-up questions
 """
 
-# Query type detection patterns
+# Query type detection patterns, tried in order. "how many" and "total" are
+# left to specific_fact: "How many schools in April 2025?" wants one figure
 QUERY_PATTERNS = {
     "statistical": [
-        "show", "compare", "how many", "total", "statistics", "data",
+        "show", "compare", "statistics", "data",
         "numbers", "breakdown", "trend", "display", "list"
     ],
     "temporal": [
@@ -312,7 +315,7 @@ QUERY_PATTERNS = {
         "major updates", "key points", "main events"
     ],
     "specific_fact": [
-        "what is", "how many", "which state", "when", "where",
+        "what is", "how many", "total", "which state", "when", "where",
         "who", "define", "explain"
     ]
 }
@@ -333,12 +336,19 @@ def get_enhanced_system_prompt():
     """Returns the enhanced system prompt for Ollama"""
     return ENHANCED_SYSTEM_PROMPT
 
+# Whole words only (plurals allowed): as substrings, "to" and "from" made
+# almost every question temporal ("director", "total")
+QUERY_TYPE_RES = {
+    query_type: re.compile(r"\b(?:" + "|".join(map(re.escape, patterns)) + r")s?\b")
+    for query_type, patterns in QUERY_PATTERNS.items()
+}
+
 def detect_query_type(query: str) -> str:
     """Detect the type of query to guide response formatting"""
     query_lower = query.lower()
 
-    for query_type, patterns in QUERY_PATTERNS.items():
-        if any(pattern in query_lower for pattern in patterns):
+    for query_type, pattern in QUERY_TYPE_RES.items():
+        if pattern.search(query_lower):
             return query_type
 
     return "general"
@@ -353,6 +363,13 @@ def detect_chapter(query: str) -> str:
 
     return "general"
 
+def wants_brief(query: str) -> bool:
+    """Whether the user asked for a short answer"""
+    brief_en = ["briefly", "brief", "short", "summary", "summarize", "in short", "one line"]
+    brief_hi = ["संक्षेप", "संक्षिप्त", "छोटा", "सारांश"]
+    q = query.lower()
+    return any(kw in q for kw in brief_en + brief_hi)
+
 def get_structured_prompt(query: str, context: str, language: str = "en") -> str:
     """Generate a structured prompt for VSK Newsletter queries with bilingual support"""
     query_type = detect_query_type(query)
@@ -0,0 +1,78 @@
+"""
+HTML table renderer for chat answers.
+
+Tables are styled by the ``.vsk-table`` classes in
+``frontend/css/enhanced-ui.css`` instead of inline ``style=`` attributes on
+every cell, and built with a single ``"".join``. Column styles are resolved
+to a ``<td ...>`` opening tag once per table, not once per cell.
+
+Column styles keep the shape the chat handler already used::
+
+    {"bold": True, "color": "#003d82"}
+
+Colours of the VSK palette map to classes; any other colour falls back to
+an inline style so nothing renders differently.
+
+``python -m benchmarks.tables`` compares payload size and render time with
+the previous inline-styled tables.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+TABLE_CLASS = "vsk-table"
+
+COLOR_CLASSES = {
+    "#003d82": "vsk-blue",
+    "#ff6600": "vsk-orange",
+    "#28a745": "vsk-green",
+    "#333": "",  # default cell colour
+}
+
+
+def _cell_open(style: dict | None) -> str:
+    if not style:
+        return "<td>"
+    classes = ["vsk-b"] if style.get("bold") else []
+    color = style.get("color")
+    inline = ""
+    if color:
+        mapped = COLOR_CLASSES.get(color.lower())
+        if mapped is None:
+            inline = f' style="color:{color};"'
+        elif mapped:
+            classes.append(mapped)
+    attr = f' class="{" ".join(classes)}"' if classes else ""
+    return f"<td{attr}{inline}>"
+
+
+def render_table(headers: Sequence[str], rows: Sequence[Sequence[str]], *,
+                 col_styles: Sequence[dict] | None = None) -> str:
+    """Render a header row and body rows; cell values are inserted as HTML"""
+    opens = [_cell_open(s) for s in col_styles or ()]
+    width = max((len(r) for r in rows), default=0)
+    opens += ["<td>"] * (width - len(opens))
+
+    parts = [f'<table class="{TABLE_CLASS}"><thead><tr>']
+    parts.extend(f"<th>{h}</th>" for h in headers)
+    parts.append("</tr></thead><tbody>")
+    for row in rows:
+        parts.append("<tr>")
+        for open_tag, cell in zip(opens, row):
+            parts.append(f"{open_tag}{cell}</td>")
+        parts.append("</tr>")
+    parts.append("</tbody></table>")
+    return "".join(parts)
+
+
+def render_metrics_table(metrics: dict[str, str], title: str, headers: Sequence[str] = ("Metric", "Value")) -> str:
+    """Titled two-column metric/value table"""
+    if not metrics:
+        return ""
+    table = render_table(
+        headers,
+        list(metrics.items()),
+        col_styles=[{"color": "#003d82"}, {"bold": True}],
+    )
+    return f"<p><strong>{title}:</strong></p>\n{table}\n"
@@ -1,29 +1,67 @@
 from __future__ import annotations
 
+import asyncio
+import os
 import signal
 import sys
+import threading
 from pathlib import Path
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 
 from backend.api.admin_handler import AdminHandler
 from backend.api.analytics_handler import AnalyticsHandler
 from backend.api.chat_handler import ChatHandler
+from backend.api.executor import StageExecutor
 from backend.api.newsletter_handler import NewsletterHandler
+from backend.api.static_assets import StaticAssets
 from backend.llm.llm_handler import LLMHandler
 from backend.rag.rag_system import RagSystem
+from backend.warmup import Warmup
 
 BASE_DIR = Path(__file__).resolve().parent
 DATA_PATH = BASE_DIR / "data" / "newsletter_data.json"
 FRONTEND_DIR = BASE_DIR.parent / "frontend"
 
+# Construction is cheap: the index itself is built by the lifespan warm-up
+# task (or on the first request that needs it), never at import time.
 rag_system = RagSystem(str(DATA_PATH))
-rag_system.initialize()
 llm_handler = LLMHandler()
+chat_executor = StageExecutor(data_path=str(DATA_PATH),
+                              index_dir=str(rag_system.index_dir) if rag_system.index_dir else None)
+static_assets = StaticAssets(FRONTEND_DIR)
+chat_handler = ChatHandler(rag_system, llm_handler, chat_executor)
+warmup = Warmup(rag_system, chat_handler, llm_handler)
+
+
+async def warm_rag_system() -> None:
+    """Build the RAG index off the event loop so the port binds immediately"""
+    try:
+        await run_in_threadpool(rag_system.ensure_initialized)
+        await run_in_threadpool(llm_handler.set_data_version, rag_system.data_version)
+        print(f"✅ RAG system initialized with {len(rag_system.chunks)} chunks in {rag_system.init_seconds:.2f}s")
+    except Exception as e:
+        print(f"❌ RAG warm-up failed: {e}")
+
+
+async def build_static_assets() -> None:
+    """Fingerprint and pre-compress the frontend off the event loop"""
+    try:
+        await run_in_threadpool(static_assets.build)
+        print(f"✅ Static assets: {len(static_assets.manifest)} fingerprinted in {static_assets.build_seconds:.2f}s")
+    except Exception as e:
+        print(f"❌ Static asset build failed: {e}")
+
+
+async def require_rag_ready() -> None:
+    """Route dependency: wait (in a worker thread) until the index is built"""
+    if not rag_system.ready:
+        await run_in_threadpool(rag_system.ensure_initialized)
 
 
 @asynccontextmanager
@@ -31,7 +69,12 @@ async def lifespan(app: FastAPI):
     """Manage application lifecycle with graceful startup and shutdown"""
     # Startup
     print("🚀 VSK Dashboard starting up...")
-    print(f"✅ RAG system initialized with {len(rag_system.chunks)} chunks")
+    warmup_task = asyncio.create_task(warm_rag_system())
+    executor_task = asyncio.create_task(chat_executor.prewarm())
+    assets_task = asyncio.create_task(build_static_assets())
+    # Keeps the Ollama model loaded during working hours and after recent questions
+    residency_task = asyncio.create_task(llm_handler.residency.run(llm_handler.preload)) if llm_handler.enabled else None
+    print(f"✅ Chat executor: {chat_executor.mode} ({chat_executor.workers} workers)")
     print(f"✅ LLM handler: {'Enabled' if llm_handler.enabled else 'RAG Only'}")
 
     # Setup graceful shutdown handlers
@@ -39,12 +82,19 @@ async def lifespan(app: FastAPI):
         print(f"\n⚠️  Received signal {signum}. Shutting down gracefully...")
         sys.exit(0)
 
-    signal.signal(signal.SIGTERM, signal_handler)
-    signal.signal(signal.SIGINT, signal_handler)
+    # Signal handlers can only be installed from the main thread
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, signal_handler)
+        signal.signal(signal.SIGINT, signal_handler)
 
     yield
 
     # Shutdown
+    for task in (warmup_task, executor_task, assets_task, residency_task):
+        if task is not None and not task.done():
+            task.cancel()
+    chat_executor.shutdown()
+    chat_handler.insight_jobs.shutdown()
     print("👋 VSK Dashboard shutting down gracefully...")
     print("✅ All resources cleaned up")
 
@@ -60,43 +110,54 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Compresses JSON answers from /api/chat (and other API responses) above the
+# threshold for clients that accept gzip; pre-compressed static assets
+# already carry a Content-Encoding and pass through untouched.
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_BYTES", "1024")), compresslevel=6)
 
-app.include_router(ChatHandler(rag_system, llm_handler).router)
-app.include_router(NewsletterHandler(rag_system).router)
-app.include_router(AnalyticsHandler(rag_system).router)
-app.include_router(AdminHandler(rag_system).router)
-
-# Serve static files (CSS, JS)
-if FRONTEND_DIR.exists():
-    app.mount("/css", StaticFiles(directory=str(FRONTEND_DIR / "css")), name="css")
-    app.mount("/js", StaticFiles(directory=str(FRONTEND_DIR / "js")), name="js")
-    app.mount("/assets", StaticFiles(directory=str(FRONTEND_DIR / "assets")), name="assets")
+rag_dependencies = [Depends(require_rag_ready)]
+app.include_router(chat_handler.router, dependencies=rag_dependencies)
+app.include_router(NewsletterHandler(rag_system).router, dependencies=rag_dependencies)
+app.include_router(AnalyticsHandler(rag_system).router, dependencies=rag_dependencies)
+app.include_router(AdminHandler(rag_system).router, dependencies=rag_dependencies)
 
-
-@app.get("/")
-async def root():
-    """Serve the frontend index.html"""
-    index_path = FRONTEND_DIR / "index.html"
-    if index_path.exists():
-        return FileResponse(str(index_path))
-    return {"message": "Frontend not found. API is running at /api/*"}
+# Frontend: index.html plus fingerprinted, pre-compressed CSS, JS and assets
+app.include_router(static_assets.router())
 
 
 @app.get("/api/health")
 async def health():
-    """Enhanced health check for monitoring and auto-restart"""
+    """
+    Liveness check for monitoring and auto-restart.
+    Answers immediately, even while the RAG index is still warming.
+    """
     import time
     return {
         "status": "ok",
         "timestamp": time.time(),
-        "rag_initialized": len(rag_system.chunks) > 0,
+        "rag_initialized": rag_system.ready,
+        "rag_state": rag_system.state,
         "mode": "hybrid" if llm_handler.enabled else "rag_only",
         "chunks_loaded": len(rag_system.chunks),
+        "chat_executor": chat_executor.status(),
         "service": "VSK Dashboard",
         "ready": True
     }
 
 
+@app.get("/api/ready")
+async def ready():
+    """Readiness check: 200 once the RAG index is built, 503 while warming"""
+    body = {
+        "ready": rag_system.ready,
+        "rag_state": rag_system.state,
+        "warmup_seconds": rag_system.init_seconds,
+        "data_version": rag_system.data_version,
+        "error": rag_system.init_error,
+    }
+    return JSONResponse(body, status_code=200 if rag_system.ready else 503)
+
+
 # Global variable to track service start time
 import time
 _service_start_time = time.time()
@@ -105,9 +166,12 @@ _service_start_time = time.time()
 @app.get("/api/keep-alive")
 async def keep_alive():
     """
-    Dedicated endpoint for Render Cron Job keep-alive pings
-    Returns detailed status and logs the ping
+    Dedicated endpoint for Render Cron Job keep-alive pings.
+    Each ping also runs the warm-up (index, mapped pages, top questions,
+    Ollama model) and returns its timings, so the caller can tell a cold
+    service from a warm one.
     """
+    report = await run_in_threadpool(warmup.run)
     current_time = time.time()
     uptime = current_time - _service_start_time
 
@@ -120,10 +184,12 @@ async def keep_alive():
         "timestamp": current_time,
         "uptime_seconds": uptime,
         "service": "VSK Dashboard",
-        "rag_initialized": len(rag_system.chunks) > 0,
+        "rag_initialized": rag_system.ready,
+        "rag_state": rag_system.state,
         "chunks_loaded": len(rag_system.chunks),
         "mode": "hybrid" if llm_handler.enabled else "rag_only",
-        "ready": True,
+        "ready": rag_system.ready,
+        "warmup": report,
         "cron_job": "render_native"
     }
 
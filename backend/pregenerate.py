@@ -0,0 +1,140 @@
+"""
+Offline pre-generation of LLM insights for the most asked questions.
+
+Most chat traffic is a small set of questions: each month's summary, APAAR
+growth, top States, leadership. This job enumerates them from the data
+(one per month, per KPI category and per section of the long-form
+context), resolves each to the evidence key ``ChatHandler.chat`` would use,
+and generates the insight for every distinct key once through
+``LLMHandler`` with at most ``--workers`` Ollama requests in flight. The
+cleaned insights are written with the current ``RagSystem.data_version``
+(see backend/cache/pregenerated.py); the server then answers these
+questions in hybrid mode without waiting for the LLM.
+
+Usage:
+    OLLAMA_URL=http://localhost:11434 python -m backend.pregenerate [--workers 2] [--languages en,hi]
+    python -m backend.pregenerate --dry-run   # list questions and keys only
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+try:
+    from backend.api.chat_handler import CONTEXT_CHUNKS, ChatHandler
+    from backend.cache.pregenerated import default_path, write_insights
+    from backend.llm.llm_handler import LLMHandler
+    from backend.llm.production_cleaner import production_grade_cleanup
+    from backend.rag.rag_system import RagSystem
+except ImportError:
+    from api.chat_handler import CONTEXT_CHUNKS, ChatHandler
+    from cache.pregenerated import default_path, write_insights
+    from llm.llm_handler import LLMHandler
+    from llm.production_cleaner import production_grade_cleanup
+    from rag.rag_system import RagSystem
+
+DATA_PATH = Path(__file__).resolve().parent / "data" / "newsletter_data.json"
+
+# Fixed questions for the sections of newsletter_data.json
+SECTION_QUESTIONS = [
+    "Who leads RVSK?",
+    "What is the director's message?",
+    "Show the APAAR ID growth",
+    "What are the top performing states?",
+    "What technical developments were made to the dashboard?",
+    "What is RVSK?",
+    "Explain the 6A framework",
+    "How do VSKs comply with the DPDP Act?",
+]
+
+
+def canonical_questions(rag: RagSystem) -> list[str]:
+    """Top questions, enumerated from the indexed data"""
+    questions = [f"What happened in {month}?" for month in rag.list_months()]
+    questions += [f"Show the {category.replace('_', ' ')} KPIs"
+                  for category in rag.data.get("key_performance_indicators", {})]
+    questions += SECTION_QUESTIONS
+    seen_sections = set()
+    for chunk in rag.chunks:
+        section = chunk["metadata"].get("section")
+        if section and section not in seen_sections:
+            seen_sections.add(section)
+            questions.append(f"Tell me about {' '.join(section.split()[:8]).lower()}")
+    return questions
+
+
+def plan(handler: ChatHandler, questions: list[str], languages: list[str]) -> dict[str, dict[str, Any]]:
+    """One job per distinct evidence key; rephrasings of a question collapse into one"""
+    jobs: dict[str, dict[str, Any]] = {}
+    for language in languages:
+        for question in questions:
+            found = handler.evidence(question, language)
+            if found is None:
+                continue
+            key, intent, results = found
+            if key not in jobs:
+                context = "\n\n".join(item["text"] for item in results[:CONTEXT_CHUNKS])
+                jobs[key] = {"question": question, "language": language, "intent": intent, "context": context}
+    return jobs
+
+
+def generate(llm: LLMHandler, jobs: dict[str, dict[str, Any]], workers: int) -> dict[str, dict[str, Any]]:
+    """Run the jobs with at most ``workers`` concurrent LLM calls"""
+    def run(item: tuple[str, dict[str, Any]]) -> tuple[str, dict[str, Any], str | None, float]:
+        key, job = item
+        started = time.perf_counter()
+        text = llm.summarize(job["question"], job["context"], language=job["language"])
+        cleaned = production_grade_cleanup(text) if text and text.strip() else None
+        return key, job, cleaned, time.perf_counter() - started
+
+    insights: dict[str, dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for key, job, cleaned, seconds in pool.map(run, jobs.items()):
+            status = "✅" if cleaned else "⚠️ "
+            print(f"{status} {seconds:6.1f}s [{job['language']}] {job['question']}")
+            if cleaned:
+                insights[key] = {k: job[k] for k in ("question", "language", "intent")} | {"insight": cleaned}
+    return insights
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=str(DATA_PATH))
+    parser.add_argument("--output", default=str(default_path()))
+    parser.add_argument("--languages", default="en", help="comma-separated answer languages (en,hi)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("PREGENERATE_WORKERS", "2")),
+                        help="concurrent Ollama requests")
+    parser.add_argument("--dry-run", action="store_true", help="list the questions and keys without calling the LLM")
+    args = parser.parse_args()
+
+    rag = RagSystem(args.data, index_dir="")
+    rag.ensure_initialized()
+    llm = LLMHandler()
+    llm.set_data_version(rag.data_version)
+    handler = ChatHandler(rag, llm)
+    jobs = plan(handler, canonical_questions(rag), [lang.strip() for lang in args.languages.split(",") if lang.strip()])
+    print(f"📋 {len(jobs)} distinct insights for data version {rag.data_version}")
+
+    if args.dry_run:
+        for key, job in jobs.items():
+            print(f"{key[:12]} [{job['language']}] {job['intent']:<28} {job['question']}")
+        return 0
+    if not llm.enabled:
+        print("❌ OLLAMA_URL is not set; nothing to generate")
+        return 1
+
+    started = time.perf_counter()
+    insights = generate(llm, jobs, args.workers)
+    write_insights(args.output, rag.data_version, llm.ollama_model, insights)
+    print(f"💾 {len(insights)}/{len(jobs)} insights written to {args.output} in {time.perf_counter() - started:.0f}s")
+    return 0 if insights else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
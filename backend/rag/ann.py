@@ -0,0 +1,110 @@
+"""
+Approximate nearest-neighbour index modes for the chunk matrix.
+
+``RAG_INDEX_TYPE`` selects the faiss index RagSystem builds:
+
+    flat   IndexFlatIP, exact exhaustive scan (default)
+    ivf    IndexIVFFlat: k-means coarse quantizer, probes a few clusters
+    hnsw   IndexHNSWFlat: navigable small-world graph, no training step
+
+Lifecycle:
+
+1. build  - ``build_index`` L2-normalises a copy of the vectors and creates
+            the index from the build parameters (``RAG_IVF_NLIST``,
+            ``RAG_HNSW_M``, ``RAG_HNSW_EF_CONSTRUCTION``).
+2. train  - IVF runs k-means over the vectors before adding them; nlist is
+            clamped so every centroid gets enough training points.
+3. persist- the index is written into the shared snapshot (see
+            index_store.py); build parameters are part of the snapshot
+            fingerprint, so changing them triggers a rebuild.
+4. search - ``apply_search_params`` sets the query-time knobs
+            (``RAG_IVF_NPROBE``, ``RAG_HNSW_EF_SEARCH``) after every build or
+            attach; they trade recall for latency without a rebuild.
+
+Without faiss, every mode falls back to an exact numpy scan with a partial
+top-k selection. ``python -m benchmarks.ann_recall`` measures recall@k and
+latency of each mode against the exact index.
+"""
+
+from __future__ import annotations
+
+import os
+
+try:
+    from backend.lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+faiss = lazy_import("faiss", optional=True)
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+
+# faiss needs roughly this many training points per IVF centroid
+MIN_POINTS_PER_CENTROID = 39
+
+
+class AnnConfig:
+    def __init__(self, index_type: str | None = None, nlist: int | None = None, nprobe: int | None = None,
+                 hnsw_m: int | None = None, ef_construction: int | None = None,
+                 ef_search: int | None = None) -> None:
+        self.index_type = (index_type or os.getenv("RAG_INDEX_TYPE", "flat")).lower()
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(f"RAG_INDEX_TYPE must be one of {', '.join(INDEX_TYPES)}, got {self.index_type!r}")
+        self.nlist = nlist or int(os.getenv("RAG_IVF_NLIST", "0"))  # 0: choose from corpus size
+        self.nprobe = nprobe or int(os.getenv("RAG_IVF_NPROBE", "8"))
+        self.hnsw_m = hnsw_m or int(os.getenv("RAG_HNSW_M", "32"))
+        self.ef_construction = ef_construction or int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "80"))
+        self.ef_search = ef_search or int(os.getenv("RAG_HNSW_EF_SEARCH", "64"))
+
+    def build_signature(self) -> str:
+        """Parameters that change the built index (query-time knobs excluded)"""
+        if self.index_type == "ivf":
+            return f"ivf:nlist={self.nlist}"
+        if self.index_type == "hnsw":
+            return f"hnsw:m={self.hnsw_m}:efc={self.ef_construction}"
+        return "flat"
+
+    def effective_nlist(self, num_vectors: int) -> int:
+        nlist = self.nlist or int(4 * num_vectors ** 0.5)
+        return max(1, min(nlist, num_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def build_index(vectors, config: AnnConfig):
+    """Create, train and fill a faiss inner-product index over normalised vectors"""
+    normalized = np.array(vectors, dtype=np.float32, copy=True)
+    faiss.normalize_L2(normalized)
+    n, dim = normalized.shape
+
+    if config.index_type == "ivf":
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, config.effective_nlist(n), faiss.METRIC_INNER_PRODUCT)
+        index.train(normalized)
+    elif config.index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, config.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = config.ef_construction
+    else:
+        index = faiss.IndexFlatIP(dim)
+
+    index.add(normalized)
+    apply_search_params(index, config)
+    return index
+
+
+def apply_search_params(index, config: AnnConfig) -> None:
+    """Set query-time recall/latency knobs on a built or attached index"""
+    if index is None:
+        return
+    ivf = faiss.try_extract_index_ivf(index) if hasattr(faiss, "try_extract_index_ivf") else None
+    if ivf is not None:
+        ivf.nprobe = min(config.nprobe, ivf.nlist)
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = config.ef_search
+
+
+def recall_at_k(exact_ids, approx_ids, k: int) -> float:
+    """Mean fraction of the exact top-k found in the approximate top-k"""
+    hits = 0
+    for exact, approx in zip(exact_ids, approx_ids):
+        hits += len(set(int(i) for i in exact[:k]) & set(int(i) for i in approx[:k] if i >= 0))
+    return hits / (k * len(exact_ids)) if len(exact_ids) else 1.0
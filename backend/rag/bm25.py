@@ -0,0 +1,132 @@
+"""
+BM25 ranking over an inverted index.
+
+Each term maps to a posting list of chunk ids with precomputed BM25 term
+weights, so a query is scored by scattering the weights of its terms into
+one score array: work is proportional to the postings touched, not to the
+corpus size times the vocabulary. The postings are flat arrays (sorted
+terms, offsets, chunk ids, weights) rather than Python objects, so a shared
+index snapshot can memory-map them (see ``arrays`` and index_store.py). Length normalisation (``b``) removes the
+edge short chunks get under cosine-normalised TF-IDF. RagSystem passes the
+language-aware analyzer from text_analysis.py; the fallback token pattern
+still keeps Devanagari vowel signs and viramas inside words.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Callable, Iterable
+
+try:
+    from backend.lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+TOKEN_RE = re.compile(r"[\w\u0900-\u097F]+")
+
+
+def top_k_indices(scores, k: int):
+    """Indices of the k highest scores, best first, without a full sort"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(scores[candidates], kind="stable")[::-1]]
+
+
+class BM25Index:
+    ARRAYS = ("terms", "offsets", "doc_ids", "weights", "doc_boosts")
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, stop_words: Iterable[str] = (),
+                 analyzer: Callable[[str], list[str]] | None = None) -> None:
+        self.k1 = k1
+        self.b = b
+        self.stop_words = frozenset(stop_words)
+        self.analyzer = analyzer
+        # Posting list of terms[t]: doc_ids/weights[offsets[t]:offsets[t + 1]]
+        self.terms = np.empty(0, dtype=str)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.empty(0, dtype=np.int32)
+        self.weights = np.empty(0, dtype=np.float32)
+        self.num_docs = 0
+        self.doc_boosts = None
+
+    def tokenize(self, text: str) -> list[str]:
+        if self.analyzer is not None:
+            return self.analyzer(text)
+        return [t for t in TOKEN_RE.findall(text.lower()) if t not in self.stop_words]
+
+    def build(self, texts: Iterable[str], doc_boosts=None) -> BM25Index:
+        term_docs: dict[str, list[int]] = defaultdict(list)
+        term_tfs: dict[str, list[int]] = defaultdict(list)
+        doc_lens = []
+        for doc_id, text in enumerate(texts):
+            counts = Counter(self.tokenize(text))
+            doc_lens.append(sum(counts.values()))
+            for term, tf in counts.items():
+                term_docs[term].append(doc_id)
+                term_tfs[term].append(tf)
+
+        self.num_docs = len(doc_lens)
+        lens = np.asarray(doc_lens, dtype=np.float32)
+        avgdl = float(lens.mean()) if self.num_docs and lens.mean() > 0 else 1.0
+        norm = self.k1 * (1 - self.b + self.b * lens / avgdl)
+
+        terms = sorted(term_docs)
+        self.terms = np.asarray(terms, dtype=str)
+        self.offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(term_docs[term]) for term in terms], out=self.offsets[1:])
+        self.doc_ids = np.empty(int(self.offsets[-1]), dtype=np.int32)
+        self.weights = np.empty(int(self.offsets[-1]), dtype=np.float32)
+        for t, term in enumerate(terms):
+            ids = np.asarray(term_docs.pop(term), dtype=np.int32)
+            tf = np.asarray(term_tfs.pop(term), dtype=np.float32)
+            df = len(ids)
+            idf = math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+            start, end = self.offsets[t], self.offsets[t + 1]
+            self.doc_ids[start:end] = ids
+            self.weights[start:end] = idf * tf * (self.k1 + 1) / (tf + norm[ids])
+
+        self.doc_boosts = None if doc_boosts is None else np.asarray(doc_boosts, dtype=np.float32)
+        return self
+
+    def arrays(self) -> dict[str, object]:
+        """The posting arrays by name, for a snapshot to store and map back with ``attach``"""
+        return {name: getattr(self, name) for name in self.ARRAYS if getattr(self, name) is not None}
+
+    def attach(self, arrays: dict[str, object], num_docs: int) -> BM25Index:
+        """Use posting arrays from ``arrays`` (typically read-only memory maps)"""
+        for name in self.ARRAYS:
+            setattr(self, name, arrays.get(name))
+        self.num_docs = num_docs
+        return self
+
+    def _posting(self, term: str):
+        t = int(np.searchsorted(self.terms, term))
+        if t == len(self.terms) or self.terms[t] != term:
+            return None
+        start, end = self.offsets[t], self.offsets[t + 1]
+        return self.doc_ids[start:end], self.weights[start:end]
+
+    def scores(self, query: str, boost: bool = True):
+        """BM25 score of every chunk for ``query`` (zero where no term matches)"""
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        for term in set(self.tokenize(query)):
+            posting = self._posting(term)
+            if posting is not None:
+                ids, weights = posting
+                scores[ids] += weights
+        if boost and self.doc_boosts is not None:
+            scores *= self.doc_boosts
+        return scores
+
+    def search(self, query: str, top_k: int, boost: bool = True) -> list[tuple[int, float]]:
+        scores = self.scores(query, boost=boost)
+        return [(int(i), float(scores[i])) for i in top_k_indices(scores, top_k)]
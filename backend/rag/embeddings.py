@@ -0,0 +1,153 @@
+"""
+Optional dense-embedding retrieval backend.
+
+Keyword rankers miss paraphrases ("how many kids" vs "students") and mixed
+Hindi/English wording. When ``RAG_EMBEDDINGS=1`` and sentence-transformers is
+installed, chunks are embedded offline on CPU with a small multilingual model
+(``RAG_EMBED_MODEL``) and stored quantized (``RAG_EMBED_QUANT``: ``int8`` or
+``fp16``) in a faiss scalar-quantizer index, or in a numpy array of codes
+when faiss is unavailable. Nothing here needs a GPU.
+
+Dense and lexical rankings are combined with reciprocal rank fusion, which
+needs only the two candidate lists, not comparable score scales.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Callable, Sequence
+
+try:
+    from backend.lazy_imports import lazy_import
+    from backend.rag.bm25 import top_k_indices
+except ImportError:
+    from lazy_imports import lazy_import
+    from rag.bm25 import top_k_indices
+
+np = lazy_import("numpy")
+faiss = lazy_import("faiss", optional=True)
+
+DEFAULT_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+QUANTIZATIONS = ("int8", "fp16")
+
+Encoder = Callable[[list[str]], "np.ndarray"]
+
+
+def load_encoder(model_name: str | None = None) -> Encoder | None:
+    """CPU sentence-transformers encoder, or None when the package is missing"""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+
+    model = SentenceTransformer(model_name or os.getenv("RAG_EMBED_MODEL", DEFAULT_MODEL), device="cpu")
+
+    def encode(texts: list[str]):
+        return model.encode(texts, batch_size=32, normalize_embeddings=True, convert_to_numpy=True)
+
+    return encode
+
+
+def hashing_encoder(dim: int = 256) -> Encoder:
+    """
+    Deterministic character n-gram encoder with no model download.
+    Used by tests and benchmarks as a stand-in when no model is installed.
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    vectorizer = HashingVectorizer(analyzer="char_wb", ngram_range=(3, 4), n_features=dim, norm="l2")
+
+    def encode(texts: list[str]):
+        return vectorizer.transform(texts).astype(np.float32).toarray()
+
+    return encode
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> list[tuple[int, float]]:
+    """Fuse ranked id lists: score(d) = sum over lists of 1 / (k + rank of d)"""
+    fused: dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+class EmbeddingIndex:
+    def __init__(self, encoder: Encoder | None, quantization: str = "int8", model_name: str | None = None) -> None:
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"RAG_EMBED_QUANT must be one of {', '.join(QUANTIZATIONS)}, got {quantization!r}")
+        self.encoder = encoder
+        self.quantization = quantization
+        self.model_name = model_name
+        self.dim = 0
+        self.size = 0
+        self.index = None
+        self.codes = None
+        self.scale = 127.0
+
+    def _encode(self, texts: list[str]):
+        if self.encoder is None:
+            # Attached from a snapshot: the model is reloaded on first query
+            self.encoder = load_encoder(self.model_name)
+            if self.encoder is None:
+                raise RuntimeError("sentence-transformers is required to query the embedding index")
+        vectors = np.asarray(self.encoder(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def build(self, texts: list[str], batch_size: int = 64) -> EmbeddingIndex:
+        batches = [self._encode(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        vectors = np.vstack(batches) if batches else np.zeros((0, 1), dtype=np.float32)
+        self.size, self.dim = vectors.shape
+
+        if faiss is not None and self.size:
+            qtype = faiss.ScalarQuantizer.QT_8bit if self.quantization == "int8" else faiss.ScalarQuantizer.QT_fp16
+            self.index = faiss.IndexScalarQuantizer(self.dim, qtype, faiss.METRIC_INNER_PRODUCT)
+            self.index.train(vectors)
+            self.index.add(vectors)
+        elif self.quantization == "int8":
+            # Unit vectors lie in [-1, 1] per component, so one global scale suffices
+            self.codes = np.round(vectors * self.scale).astype(np.int8)
+        else:
+            self.codes = vectors.astype(np.float16)
+        return self
+
+    def nbytes(self) -> int:
+        if self.index is not None:
+            return int(faiss.serialize_index(self.index).nbytes)
+        return int(self.codes.nbytes) if self.codes is not None else 0
+
+    def search(self, query: str, top_k: int, min_similarity: float = 0.0,
+               candidates=None) -> list[tuple[int, float]]:
+        """Top-k (chunk id, cosine) pairs, optionally restricted to candidate ids"""
+        if not self.size or (candidates is not None and not len(candidates)):
+            return []
+        q = self._encode([query])
+        if self.index is not None:
+            params = None
+            if candidates is not None:
+                params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(np.asarray(candidates, dtype=np.int64)))
+            scores, ids = self.index.search(q, min(top_k, self.size), params=params)
+            pairs = [(int(i), float(s)) for i, s in zip(ids[0], scores[0]) if i >= 0]
+        else:
+            rows = self.codes if candidates is None else self.codes[candidates]
+            sims = rows.astype(np.float32) @ q[0]
+            if self.quantization == "int8":
+                sims /= self.scale
+            top = top_k_indices(sims, top_k)
+            ids = top if candidates is None else candidates[top]
+            pairs = [(int(i), float(sims[j])) for i, j in zip(ids, top)]
+        return [(i, s) for i, s in pairs if s >= min_similarity]
+
+    def __getstate__(self):
+        # The model is not picklable; faiss indexes travel as serialized bytes
+        state = self.__dict__.copy()
+        state["encoder"] = None
+        if self.index is not None:
+            state["index"] = faiss.serialize_index(self.index)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.index is not None:
+            self.index = faiss.deserialize_index(self.index)
@@ -0,0 +1,208 @@
+"""
+On-disk RAG index snapshots shared by several uvicorn workers.
+
+When ``RAG_INDEX_DIR`` is set, the first worker to take the build lock builds
+the index and publishes a snapshot directory; every other worker waits on the
+lock and then attaches to the same snapshot. The bulky parts are arrays
+memory-mapped read-only, so their pages live once in the OS page cache
+instead of once per worker: the chunk matrix, the BM25 postings, the chunk
+texts (one UTF-8 buffer and its offsets) and the faiss index when available.
+``state.pkl`` is still unpickled by every worker; it holds the parsed data,
+the chunk metadata, the vectorizer, the partitions and the embedding index.
+
+Snapshot layout::
+
+    <RAG_INDEX_DIR>/<fingerprint>/state.pkl         parsed data, chunk metadata, vectorizer
+    <RAG_INDEX_DIR>/<fingerprint>/<name>.npy        arrays: tfidf_* (CSR chunk matrix),
+                                                    chunk_text, chunk_offsets, bm25_* (mmap)
+    <RAG_INDEX_DIR>/<fingerprint>/faiss.index       optional faiss index (mmap)
+
+The fingerprint covers the source files (path, size, mtime), library
+versions and the build settings (index type, embeddings), so editing the
+newsletter data or the index configuration produces a fresh snapshot.
+
+A snapshot can be pre-built at deploy time:
+
+    python -m backend.rag.index_store --index-dir /tmp/vsk-rag-index
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import shutil
+import sys
+from collections.abc import Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX hosts build without a lock
+    fcntl = None
+
+try:
+    from backend.lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+faiss = lazy_import("faiss", optional=True)
+
+SNAPSHOT_VERSION = 4
+
+STATE_FILE = "state.pkl"
+FAISS_FILE = "faiss.index"
+
+
+def pack_texts(texts: Iterable[str]):
+    """Chunk texts as one UTF-8 byte array and the offsets of each text in it"""
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class MappedChunks(Sequence):
+    """
+    The chunks of an attached snapshot: ``{"text", "metadata"}`` dicts built
+    on access, with the text decoded from the mapped buffer.
+    """
+
+    def __init__(self, metadata: list[dict[str, Any]], text, offsets) -> None:
+        self.metadata = metadata
+        self.text = text
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    def __getitem__(self, i: int) -> dict[str, Any]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = range(len(self))[i]
+        text = self.text[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+        return {"text": text, "metadata": self.metadata[i]}
+
+
+class IndexSnapshotStore:
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+
+    def fingerprint(self, source_paths: list[Path], build_signature: str = "") -> str:
+        import sklearn
+
+        h = hashlib.sha256()
+        h.update(f"v{SNAPSHOT_VERSION}|sklearn {sklearn.__version__}|numpy {np.__version__}".encode())
+        h.update(build_signature.encode())
+        for path in source_paths:
+            h.update(str(path.resolve()).encode())
+            if path.exists():
+                st = path.stat()
+                h.update(f"|{st.st_size}|{st.st_mtime_ns}".encode())
+        return h.hexdigest()[:16]
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / key
+
+    def exists(self, key: str) -> bool:
+        return (self.path_for(key) / STATE_FILE).exists()
+
+    @contextmanager
+    def build_lock(self) -> Iterator[None]:
+        """Exclusive inter-process lock held while checking for / building a snapshot"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".build.lock", "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def write(self, key: str, state: dict[str, Any], arrays: dict[str, Any], faiss_index=None) -> Path:
+        """Write a snapshot to a temp dir, then publish it with an atomic rename"""
+        final = self.path_for(key)
+        tmp = self.directory / f".tmp-{key}-{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+
+        with (tmp / STATE_FILE).open("wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        for name, array in arrays.items():
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(array))
+        if faiss_index is not None and faiss is not None:
+            faiss.write_index(faiss_index, str(tmp / FAISS_FILE))
+
+        try:
+            os.rename(tmp, final)
+        except OSError:
+            # Another process published the same snapshot first
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._prune(keep=key)
+        return final
+
+    def read(self, key: str) -> dict[str, Any]:
+        """Attach to a published snapshot; arrays are read-only memory maps"""
+        path = self.path_for(key)
+        with (path / STATE_FILE).open("rb") as f:
+            state = pickle.load(f)
+        arrays = {file.stem: np.load(file, mmap_mode="r") for file in path.glob("*.npy")}
+
+        faiss_index = None
+        faiss_path = path / FAISS_FILE
+        if faiss_path.exists() and faiss is not None:
+            flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+            try:
+                faiss_index = faiss.read_index(str(faiss_path), flags)
+            except RuntimeError:
+                faiss_index = faiss.read_index(str(faiss_path))
+
+        return {"path": path, "state": state, "arrays": arrays, "faiss_index": faiss_index}
+
+    @staticmethod
+    def prefetch(path: Path, block_size: int = 1 << 20) -> int:
+        """
+        Read every file of a snapshot once, so its pages sit in the OS page
+        cache (shared by all workers) before a query maps them in. Returns
+        the number of bytes read.
+        """
+        total = 0
+        for file in sorted(p for p in Path(path).iterdir() if p.is_file()):
+            with file.open("rb", buffering=0) as f:
+                while chunk := f.read(block_size):
+                    total += len(chunk)
+        return total
+
+    def _prune(self, keep: str) -> None:
+        """Drop snapshots for older source versions"""
+        for child in self.directory.iterdir():
+            if child.is_dir() and child.name != keep and not child.name.startswith("."):
+                shutil.rmtree(child, ignore_errors=True)
+
+
+def main() -> int:
+    import argparse
+
+    try:
+        from backend.rag.rag_system import RagSystem
+    except ImportError:
+        from rag.rag_system import RagSystem
+
+    default_data = Path(__file__).resolve().parent.parent / "data" / "newsletter_data.json"
+    parser = argparse.ArgumentParser(description="Pre-build a shared RAG index snapshot")
+    parser.add_argument("--index-dir", default=os.getenv("RAG_INDEX_DIR", ""), required=not os.getenv("RAG_INDEX_DIR"))
+    parser.add_argument("--data", default=str(default_data))
+    args = parser.parse_args()
+
+    rag = RagSystem(args.data, index_dir=args.index_dir)
+    rag.ensure_initialized()
+    print(f"Snapshot ready at {rag.snapshot_path} ({len(rag.chunks)} chunks, {rag.init_seconds:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
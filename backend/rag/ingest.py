@@ -0,0 +1,204 @@
+"""
+Streaming ingestion of long context documents.
+
+``detailed_context.txt`` (and any other plain-text source) is read line by
+line, never whole. Sections are delimited by a title framed between two
+rules of ``=`` characters::
+
+    ==============================================================================
+    DIRECTOR'S MESSAGE - DETAILED CONTEXT
+    ==============================================================================
+
+Paragraphs are packed into chunks of about ``RAG_CHUNK_TOKENS`` whitespace
+tokens; consecutive chunks of one section share ``RAG_CHUNK_OVERLAP`` tokens
+so a sentence cut at a boundary is still retrievable. Each chunk carries the
+title of its section in ``metadata["section"]``. Only the current section's
+pending tokens are held in memory, however large the source file is.
+
+``ingest_directory`` applies the same chunking to every ``.txt``, ``.md``
+and (with pypdf installed) ``.pdf`` file under ``RAG_CORPUS_DIR``, parsing
+files in parallel across a process pool of ``RAG_INGEST_WORKERS``. Each
+chunk records the file it came from in ``metadata["file"]``.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+try:
+    from backend.lazy_imports import lazy_import
+except ImportError:
+    from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pypdf = lazy_import("pypdf", optional=True)
+
+RULE_RE = re.compile(r"^={20,}\s*$")
+
+DEFAULT_CHUNK_TOKENS = 160
+DEFAULT_CHUNK_OVERLAP = 32
+TRANSFORM_BATCH = 256
+
+TEXT_SUFFIXES = (".txt", ".md")
+PDF_SUFFIX = ".pdf"
+
+
+def chunk_settings() -> tuple[int, int]:
+    """(max tokens, overlap tokens) from RAG_CHUNK_TOKENS / RAG_CHUNK_OVERLAP"""
+    size = int(os.getenv("RAG_CHUNK_TOKENS", str(DEFAULT_CHUNK_TOKENS)))
+    overlap = int(os.getenv("RAG_CHUNK_OVERLAP", str(DEFAULT_CHUNK_OVERLAP)))
+    if size <= 0 or not 0 <= overlap < size:
+        raise ValueError(f"RAG_CHUNK_TOKENS must be > RAG_CHUNK_OVERLAP >= 0, got {size}/{overlap}")
+    return size, overlap
+
+
+def iter_paragraphs(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
+    """Yield (section title, paragraph) pairs from a stream of lines"""
+    section = ""
+    in_title = False
+    title_lines: list[str] = []
+    para: list[str] = []
+
+    for raw in lines:
+        line = raw.rstrip("\n").strip()
+        if RULE_RE.match(line):
+            if para:
+                yield section, " ".join(para)
+                para = []
+            if in_title:
+                section = " ".join(title_lines)
+                title_lines = []
+            in_title = not in_title
+        elif in_title:
+            if line:
+                title_lines.append(line)
+        elif line:
+            para.append(line)
+        elif para:
+            yield section, " ".join(para)
+            para = []
+
+    if para:
+        yield section, " ".join(para)
+
+
+def iter_chunks(paragraphs: Iterable[tuple[str, str]], max_tokens: int, overlap: int) -> Iterator[tuple[str, str]]:
+    """
+    Pack paragraphs into (section, text) chunks of at most ``max_tokens``
+    tokens. Windows restart at every section boundary; a paragraph longer
+    than the window is split across several chunks.
+    """
+    section = None
+    window: list[str] = []
+    fresh = 0  # tokens in the window not yet emitted in an earlier chunk
+
+    for title, paragraph in paragraphs:
+        if title != section:
+            if fresh:
+                yield section, " ".join(window)
+            section, window, fresh = title, [], 0
+        for token in paragraph.split():
+            window.append(token)
+            fresh += 1
+            if len(window) >= max_tokens:
+                yield section, " ".join(window)
+                window = window[len(window) - overlap:] if overlap else []
+                fresh = 0
+
+    if fresh:
+        yield section, " ".join(window)
+
+
+def _pdf_lines(path: Path) -> Iterator[str]:
+    # One page at a time; a blank line between pages ends the paragraph
+    for page in pypdf.PdfReader(str(path)).pages:
+        yield from (page.extract_text() or "").splitlines()
+        yield ""
+
+
+def iter_document_chunks(path: str | Path, max_tokens: int | None = None, overlap: int | None = None,
+                         file: str | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Stream a text (or PDF) document as RAG chunks of type
+    ``detailed_context``; ``file`` is recorded as the chunk's provenance.
+    """
+    if max_tokens is None or overlap is None:
+        max_tokens, overlap = chunk_settings()
+    path = Path(path)
+
+    def emit(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+        for section, text in iter_chunks(iter_paragraphs(lines), max_tokens, overlap):
+            metadata: dict[str, Any] = {"type": "detailed_context", "data": {}}
+            if section:
+                metadata["section"] = section
+            if file:
+                metadata["file"] = file
+            yield {"text": text, "metadata": metadata}
+
+    if path.suffix.lower() == PDF_SUFFIX:
+        yield from emit(_pdf_lines(path))
+    else:
+        with path.open("r", encoding="utf-8", errors="replace") as f:
+            yield from emit(f)
+
+
+def corpus_files(directory: str | Path) -> list[Path]:
+    """Documents under ``directory`` in a stable order; PDFs only when pypdf is installed"""
+    suffixes = TEXT_SUFFIXES + ((PDF_SUFFIX,) if pypdf is not None else ())
+    return sorted(
+        p for p in Path(directory).rglob("*")
+        if p.is_file() and p.suffix.lower() in suffixes and not p.name.startswith(".")
+    )
+
+
+def _ingest_file(path: str, root: str, max_tokens: int, overlap: int) -> list[dict[str, Any]]:
+    # Runs in a pool worker: parse and chunk one file
+    return list(iter_document_chunks(path, max_tokens, overlap, file=Path(path).relative_to(root).as_posix()))
+
+
+def ingest_directory(directory: str | Path, max_tokens: int | None = None, overlap: int | None = None,
+                     workers: int | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Parse and chunk every document under ``directory`` across a process
+    pool, yielding the chunks as each file completes. Chunks come in file
+    order, so the result (and the chunk ids of the index built from it)
+    does not depend on worker scheduling.
+    """
+    if max_tokens is None or overlap is None:
+        max_tokens, overlap = chunk_settings()
+    root = Path(directory).resolve()
+    files = [str(p.resolve()) for p in corpus_files(root)]
+    workers = workers or int(os.getenv("RAG_INGEST_WORKERS", "0")) or os.cpu_count() or 1
+    workers = min(workers, len(files))
+
+    args = ([str(root)] * len(files), [max_tokens] * len(files), [overlap] * len(files))
+    if workers <= 1:
+        for chunks in map(_ingest_file, files, *args):
+            yield from chunks
+        return
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for chunks in pool.map(_ingest_file, files, *args):
+            yield from chunks
+
+
+def fit_transform_batched(vectorizer, texts: Callable[[], Iterable[str]], batch_size: int = TRANSFORM_BATCH):
+    """
+    Fit ``vectorizer`` on one pass over ``texts()``, then transform a second
+    pass in batches into a float32 CSR matrix. The corpus is streamed and
+    the matrix stays sparse, so memory grows with the non-zero weights, not
+    with chunks times vocabulary.
+    """
+    from scipy import sparse
+
+    vectorizer.fit(texts())
+    stream = iter(texts())
+    batches = []
+    while batch := list(islice(stream, batch_size)):
+        batches.append(vectorizer.transform(batch).astype(np.float32))
+    return sparse.vstack(batches, format="csr", dtype=np.float32)
@@ -0,0 +1,206 @@
+"""
+Corpus partitions (shards) by chunk metadata.
+
+Every chunk is tagged at build time with its type, KPI category, document
+section and source file, language, the newsletter months it covers and the
+States/UTs it mentions. Each (field, value) pair owns a sorted posting list
+of chunk ids, which ``select`` intersects to answer metadata filters such as
+``{"type": "rvsk"}`` or ``{"type": "month", "month": "Q3 2025"}``.
+
+At query time ``route`` turns the months and states detected in the question
+into shard filters, so search scores only the matching chunks and keeps
+off-topic ones out of the LLM context. When the routed shards are too small,
+the state and then the month restriction is relaxed.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from typing import Any, Iterable
+
+try:
+    from backend.lazy_imports import lazy_import
+    from backend.rag.text_analysis import shared_form
+except ImportError:
+    from lazy_imports import lazy_import
+    from rag.text_analysis import shared_form
+
+np = lazy_import("numpy")
+
+MONTH_NAMES = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+]
+
+MONTH_NAMES_HI = {
+    "जनवरी": "january", "फरवरी": "february", "मार्च": "march",
+    "अप्रैल": "april", "मई": "may", "जून": "june",
+    "जुलाई": "july", "अगस्त": "august", "सितंबर": "september",
+    "अक्टूबर": "october", "नवंबर": "november", "दिसंबर": "december",
+}
+
+STATES_UTS = [
+    "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar", "Chhattisgarh", "Goa", "Gujarat",
+    "Haryana", "Himachal Pradesh", "Jharkhand", "Karnataka", "Kerala", "Madhya Pradesh",
+    "Maharashtra", "Manipur", "Meghalaya", "Mizoram", "Nagaland", "Odisha", "Punjab",
+    "Rajasthan", "Sikkim", "Tamil Nadu", "Telangana", "Tripura", "Uttar Pradesh",
+    "Uttarakhand", "West Bengal", "Andaman and Nicobar Islands", "Chandigarh",
+    "Dadra and Nagar Haveli and Daman and Diu", "Delhi", "Jammu and Kashmir", "Ladakh",
+    "Lakshadweep", "Puducherry",
+]
+
+_MONTH_RE = re.compile(r"\b(" + "|".join(MONTH_NAMES) + r")\b(?:\s*,?\s*(20\d\d))?", re.IGNORECASE)
+_MONTH_HI_RE = re.compile("(" + "|".join(MONTH_NAMES_HI) + r")(?:\s*(20\d\d))?")
+_YEAR_RE = re.compile(r"\b(20\d\d)\b")
+# Start of the text or of a sentence, where "May" is capitalised as a verb too
+_SENTENCE_START_RE = re.compile(r"(?:^|[.!?:;]\s+)[\"'(\s]*$")
+_QUARTER_RE = re.compile(r"^Q([1-4])(?:\s+(20\d\d))?$", re.IGNORECASE)
+_DEVANAGARI_RE = re.compile("[\u0900-\u097F]")
+_LATIN_RE = re.compile("[A-Za-z]")
+
+FILTER_FIELDS = ("type", "category", "section", "file", "language", "month", "state")
+
+
+def _is_month(match: re.Match, text: str) -> bool:
+    # "may" is mostly the verb: only "May" mid-sentence or "may 2025" is the month
+    if match.group(1).lower() != "may" or match.group(2):
+        return True
+    return match.group(1) == "May" and not _SENTENCE_START_RE.search(text[:match.start()])
+
+
+def mentioned_months(text: str) -> set[str]:
+    """Month words (lowercase English) named in text, in English or Hindi"""
+    found = {m.group(1).lower() for m in _MONTH_RE.finditer(text) if _is_month(m, text)}
+    found.update(MONTH_NAMES_HI[m.group(1)] for m in _MONTH_HI_RE.finditer(text))
+    return found
+
+
+def chunk_language(text: str) -> str:
+    """Language tag of a chunk: hi when Devanagari letters outnumber Latin ones, else en"""
+    return "hi" if len(_DEVANAGARI_RE.findall(text)) > len(_LATIN_RE.findall(text)) else "en"
+
+
+def _state_pattern(states: Iterable[str]) -> re.Pattern:
+    # Longest names first so "Andhra Pradesh" wins over shorter overlaps
+    names = sorted(set(states), key=len, reverse=True)
+    return re.compile(r"\b(" + "|".join(re.escape(n) for n in names) + r")\b", re.IGNORECASE)
+
+
+class PartitionIndex:
+    def __init__(self, states: Iterable[str] = STATES_UTS) -> None:
+        self.state_names = {s.lower(): s for s in states}
+        self._state_re = _state_pattern(self.state_names.values())
+        self.postings: dict[str, dict[str, Any]] = {}
+        self.month_keys: list[str] = []
+        self.num_docs = 0
+
+    def mentioned_months(self, text: str) -> set[str]:
+        return mentioned_months(text)
+
+    def mentioned_states(self, text: str) -> set[str]:
+        """States/UTs named in text; Hindi names are matched via their shared form"""
+        if _DEVANAGARI_RE.search(text):
+            text = f"{text} {shared_form(text)}"
+        return {self.state_names[m.group(1).lower()] for m in self._state_re.finditer(text)}
+
+    def tag(self, chunk: dict[str, Any], month_keys: list[str]) -> dict[str, list[str]]:
+        metadata = chunk["metadata"]
+        tags: dict[str, list[str]] = {
+            "type": [metadata.get("type", "")],
+            "category": [metadata["category"]] if metadata.get("category") else [],
+            "section": [metadata["section"]] if metadata.get("section") else [],
+            "file": [metadata["file"]] if metadata.get("file") else [],
+            "language": [chunk_language(chunk["text"])],
+        }
+        if metadata.get("type") == "month":
+            tags["month"] = [metadata["data"]["month"]]
+        else:
+            text = chunk["text"]
+            tags["month"] = [k for k in month_keys if k.lower() in text.lower()]
+        tags["state"] = sorted(self.mentioned_states(chunk["text"]))
+        return tags
+
+    def build(self, chunks: list[dict[str, Any]], month_keys: list[str]) -> PartitionIndex:
+        """Tag chunks and build one posting list per (field, value)"""
+        self.month_keys = list(month_keys)
+        self.num_docs = len(chunks)
+        lists: dict[str, dict[str, list[int]]] = defaultdict(lambda: defaultdict(list))
+        for doc_id, chunk in enumerate(chunks):
+            for field, values in self.tag(chunk, self.month_keys).items():
+                for value in values:
+                    lists[field][value].append(doc_id)
+        self.postings = {
+            field: {value: np.asarray(ids, dtype=np.int32) for value, ids in values.items()}
+            for field, values in lists.items()
+        }
+        return self
+
+    def shard_sizes(self) -> dict[str, dict[str, int]]:
+        return {field: {v: len(ids) for v, ids in values.items()} for field, values in self.postings.items()}
+
+    def _expand(self, field: str, values: list[str]) -> list[str]:
+        """Month filters also accept quarters, e.g. Q3 or Q3 2025"""
+        if field != "month":
+            return values
+        expanded: list[str] = []
+        for value in values:
+            m = _QUARTER_RE.match(value.strip())
+            if not m:
+                expanded.append(value)
+                continue
+            quarter = MONTH_NAMES[3 * (int(m.group(1)) - 1):3 * int(m.group(1))]
+            expanded.extend(
+                k for k in self.month_keys
+                if k.split()[0].lower() in quarter and (not m.group(2) or k.split()[-1] == m.group(2))
+            )
+        return expanded
+
+    def select(self, filters: dict[str, str | list[str]]):
+        """
+        Chunk ids matching every field filter; values within one field are
+        OR-ed. Returns a sorted int32 array (possibly empty).
+        """
+        selected = None
+        for field, values in filters.items():
+            if field not in FILTER_FIELDS:
+                raise ValueError(f"Unknown filter field {field!r}; expected one of {', '.join(FILTER_FIELDS)}")
+            if isinstance(values, str):
+                values = [values]
+            values = self._expand(field, list(values))
+            shard_lists = [self.postings.get(field, {}).get(v) for v in values]
+            ids = np.unique(np.concatenate([s for s in shard_lists if s is not None] or [np.empty(0, np.int32)]))
+            selected = ids if selected is None else np.intersect1d(selected, ids, assume_unique=True)
+        return selected if selected is not None else np.arange(self.num_docs, dtype=np.int32)
+
+    def route_filters(self, query: str) -> dict[str, list[str]]:
+        """Shard filters implied by the months and states named in the query"""
+        filters: dict[str, list[str]] = {}
+        months = self.mentioned_months(query)
+        if months:
+            years = set(_YEAR_RE.findall(query))
+            keys = [
+                k for k in self.month_keys
+                if k.split()[0].lower() in months and (not years or k.split()[-1] in years)
+            ]
+            if keys:
+                filters["month"] = keys
+        states = self.mentioned_states(query)
+        if states:
+            filters["state"] = sorted(states)
+        return filters
+
+    def route(self, query: str, min_size: int = 1, filters: dict[str, Any] | None = None):
+        """
+        Candidate chunk ids for the query, or None when it names no month or
+        state. Routing restrictions are relaxed (state first, then month)
+        until the candidate set holds at least ``min_size`` chunks; explicit
+        ``filters`` always apply and are never relaxed.
+        """
+        routed = {k: v for k, v in self.route_filters(query).items() if k not in (filters or {})}
+        while routed:
+            ids = self.select({**(filters or {}), **routed})
+            if len(ids) >= min_size:
+                return ids
+            routed.pop("state" if "state" in routed else "month")
+        return None
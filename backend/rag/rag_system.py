@@ -1,70 +1,317 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import mmap
+import os
+import threading
+import time
+from collections.abc import Sequence
 from pathlib import Path
 from typing import Any
 
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-
 try:
-    import faiss  # type: ignore
-except Exception:  # pragma: no cover
-    faiss = None
+    from backend.lazy_imports import lazy_import
+    from backend.rag.ann import AnnConfig, apply_search_params, build_index
+    from backend.rag.bm25 import BM25Index, top_k_indices
+    from backend.rag.embeddings import EmbeddingIndex, Encoder, load_encoder, reciprocal_rank_fusion
+    from backend.rag.index_store import IndexSnapshotStore, MappedChunks, pack_texts
+    from backend.rag.ingest import (
+        chunk_settings,
+        corpus_files,
+        fit_transform_batched,
+        ingest_directory,
+        iter_document_chunks,
+    )
+    from backend.rag.partitions import PartitionIndex
+    from backend.rag.text_analysis import analyze
+except ImportError:
+    from lazy_imports import lazy_import
+    from rag.ann import AnnConfig, apply_search_params, build_index
+    from rag.bm25 import BM25Index, top_k_indices
+    from rag.embeddings import EmbeddingIndex, Encoder, load_encoder, reciprocal_rank_fusion
+    from rag.index_store import IndexSnapshotStore, MappedChunks, pack_texts
+    from rag.ingest import (
+        chunk_settings,
+        corpus_files,
+        fit_transform_batched,
+        ingest_directory,
+        iter_document_chunks,
+    )
+    from rag.partitions import PartitionIndex
+    from rag.text_analysis import analyze
+
+# numpy and faiss are only loaded when the index is first built or searched
+np = lazy_import("numpy")
+faiss = lazy_import("faiss", optional=True)
+
+
+RANKERS = ("tfidf", "bm25", "hybrid", "dense", "fusion")
+
+# Preference order of chunk types for structured answers (lower is better).
+# The bm25 and hybrid rankers boost chunks by it, so the top result is the
+# one AnswerComposer._try_structured_format formats.
+CHUNK_TYPE_PRIORITY = {
+    "month": 1, "rvsk": 2, "kpi": 3, "state_engagement": 4,
+    "technical": 5, "director_message": 6, "detailed_context": 99,
+}
+
+
+def type_boost(chunk_type: str) -> float:
+    """Multiplicative ranking boost derived from CHUNK_TYPE_PRIORITY"""
+    priority = CHUNK_TYPE_PRIORITY.get(chunk_type, 100)
+    return 1.0 + 0.3 / priority if priority < 99 else 1.0
+
+
+def _faiss_available() -> bool:
+    if faiss is None:
+        return False
+    try:
+        return hasattr(faiss, "IndexFlatIP")
+    except Exception:  # pragma: no cover
+        return False
+
+
+def _make_vectorizer():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(analyzer=analyze)
+
+
+def _make_bm25() -> BM25Index:
+    return BM25Index(
+        k1=float(os.getenv("RAG_BM25_K1", "1.5")),
+        b=float(os.getenv("RAG_BM25_B", "0.75")),
+        analyzer=analyze,
+    )
 
 
 class RagSystem:
-    def __init__(self, data_path: str) -> None:
+    def __init__(self, data_path: str, index_dir: str | None = None, ranker: str | None = None,
+                 encoder: Encoder | None = None, index_type: str | None = None,
+                 corpus_dir: str | None = None) -> None:
         self.data_path = Path(data_path)
-        self.vectorizer = TfidfVectorizer(stop_words="english")
+        # Optional directory of extra documents indexed next to the newsletter data
+        corpus_dir = os.getenv("RAG_CORPUS_DIR", "") if corpus_dir is None else corpus_dir
+        self.corpus_dir = Path(corpus_dir) if corpus_dir else None
+        self.ranker = (ranker or os.getenv("RAG_RANKER", "hybrid")).lower()
+        if self.ranker not in RANKERS:
+            raise ValueError(f"RAG_RANKER must be one of {', '.join(RANKERS)}, got {self.ranker!r}")
+        # Weight of TF-IDF cosine vs normalised BM25 in the hybrid ranker
+        self.hybrid_alpha = float(os.getenv("RAG_HYBRID_ALPHA", "0.5"))
+        self.bm25: BM25Index | None = None
+
+        # Optional dense embeddings (RAG_EMBEDDINGS=1 or an injected encoder)
+        self.encoder = encoder
+        self.use_embeddings = encoder is not None or os.getenv("RAG_EMBEDDINGS", "").lower() in ("1", "true", "yes")
+        self.embed_quantization = os.getenv("RAG_EMBED_QUANT", "int8").lower()
+        self.dense_min_similarity = float(os.getenv("RAG_DENSE_MIN_SIM", "0.2"))
+        self.embeddings: EmbeddingIndex | None = None
+
+        # faiss index type and recall/latency parameters (see ann.py)
+        self.ann = AnnConfig(index_type=index_type)
+
+        # Token window and overlap for long context documents (see ingest.py)
+        self.chunk_tokens = chunk_settings()
+
+        # Shards by chunk type, month and state for query-time routing
+        self.partitions: PartitionIndex | None = None
+        # Shared snapshot mode: workers attach to one memory-mapped index
+        index_dir = index_dir if index_dir is not None else os.getenv("RAG_INDEX_DIR", "")
+        self.index_dir = Path(index_dir) if index_dir else None
+        self.snapshot_path: Path | None = None
+        self.vectorizer = None
         self.data: dict[str, Any] = {}
         self.newsletters: list[dict[str, Any]] = []
-        self.chunks: list[dict[str, Any]] = []
+        self.chunks: Sequence[dict[str, Any]] = []  # MappedChunks when attached to a snapshot
         self.index = None
-        self.chunk_matrix: np.ndarray | None = None
+        self.chunk_matrix = None  # float32 CSR TF-IDF matrix, chunks x vocabulary
         self.using_faiss = False
 
+        # Readiness is tracked separately from liveness so the API can bind
+        # and answer health checks while the index warms in the background.
+        self.state = "cold"
+        # Content hash of the indexed sources; cached answers are keyed by it
+        self.data_version: str | None = None
+        self.init_seconds: float | None = None
+        self.init_error: str | None = None
+        self._init_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def ensure_initialized(self) -> bool:
+        """
+        Build the index once, thread-safely. Concurrent callers block until
+        the first build finishes instead of building their own copy.
+        """
+        if self.ready:
+            return True
+        with self._init_lock:
+            if self.ready:
+                return True
+            self.state = "warming"
+            started = time.perf_counter()
+            try:
+                self.initialize()
+                self.data_version = self._data_version()
+            except Exception as e:
+                self.state = "failed"
+                self.init_error = str(e)
+                raise
+            self.init_seconds = time.perf_counter() - started
+            self.init_error = None
+            self.state = "ready"
+        return True
+
+    def touch_pages(self) -> int:
+        """
+        Page in the memory-mapped snapshot: read its files into the page
+        cache, then touch one byte per page of the mapped chunk matrix so
+        this process's mapping is populated too. Returns the bytes read.
+        """
+        if self.snapshot_path is None:
+            return 0  # private in-memory index, nothing mapped
+        read = IndexSnapshotStore.prefetch(self.snapshot_path)
+        for array in (self.chunk_matrix.data, self.chunk_matrix.indices):
+            if array.size:
+                int(array.view(np.uint8)[::mmap.PAGESIZE].sum())
+        return read
+
     def initialize(self) -> None:
+        if self.index_dir is not None:
+            self._initialize_from_snapshot()
+        else:
+            self._build_index()
+
+    def _source_paths(self) -> list[Path]:
+        paths = [self.data_path, self.data_path.parent / "detailed_context.txt"]
+        if self.corpus_dir is not None:
+            paths.extend(corpus_files(self.corpus_dir))
+        return paths
+
+    def _data_version(self) -> str:
+        """
+        Hash of the source file contents and chunk window. Unlike the snapshot
+        fingerprint it ignores mtimes, so a redeploy of the same data keeps it.
+        """
+        h = hashlib.sha256("chunks={}/{}".format(*self.chunk_tokens).encode())
+        for path in self._source_paths():
+            if path.exists():
+                h.update(f"|{path.name}|".encode())
+                h.update(path.read_bytes())
+        return h.hexdigest()[:16]
+
+    def _build_signature(self) -> str:
+        """Build-time settings that must match for a snapshot to be reused"""
+        embeddings = f"{self.embed_quantization}:{os.getenv('RAG_EMBED_MODEL', '')}" if self.use_embeddings else "off"
+        chunks = "{}/{}".format(*self.chunk_tokens)
+        return (
+            f"index={self.ann.build_signature()}|embeddings={embeddings}|faiss={_faiss_available()}"
+            f"|chunks={chunks}|corpus={self.corpus_dir.resolve() if self.corpus_dir else ''}"
+        )
+
+    def _initialize_from_snapshot(self) -> None:
+        """
+        Attach to the shared snapshot, building it first if no worker has.
+        The builder also re-attaches, dropping its private copy of the matrix.
+        """
+        store = IndexSnapshotStore(self.index_dir)
+        key = store.fingerprint(self._source_paths(), self._build_signature())
+        with store.build_lock():
+            if not store.exists(key):
+                self._build_index()
+                text, offsets = pack_texts(chunk["text"] for chunk in self.chunks)
+                store.write(
+                    key,
+                    state={
+                        "data": self.data,
+                        "metadata": [chunk["metadata"] for chunk in self.chunks],
+                        "vectorizer": self.vectorizer,
+                        "matrix_shape": self.chunk_matrix.shape,
+                        "bm25": {"k1": self.bm25.k1, "b": self.bm25.b, "num_docs": self.bm25.num_docs},
+                        "embeddings": self.embeddings,
+                        "partitions": self.partitions,
+                    },
+                    arrays={
+                        "tfidf_data": self.chunk_matrix.data,
+                        "tfidf_indices": self.chunk_matrix.indices,
+                        "tfidf_indptr": self.chunk_matrix.indptr,
+                        "chunk_text": text,
+                        "chunk_offsets": offsets,
+                        **{f"bm25_{name}": array for name, array in self.bm25.arrays().items()},
+                    },
+                    faiss_index=self.index if self.using_faiss else None,
+                )
+        snapshot = store.read(key)
+        from scipy import sparse
+
+        state, arrays = snapshot["state"], snapshot["arrays"]
+        self.data = state["data"]
+        self.newsletters = self.data.get("months", [])
+        self.chunks = MappedChunks(state["metadata"], arrays["chunk_text"], arrays["chunk_offsets"])
+        self.vectorizer = state["vectorizer"]
+        bm25 = state["bm25"]
+        self.bm25 = BM25Index(bm25["k1"], bm25["b"], analyzer=analyze).attach(
+            {name[len("bm25_"):]: array for name, array in arrays.items() if name.startswith("bm25_")},
+            bm25["num_docs"],
+        )
+        self.embeddings = state["embeddings"]
+        self.partitions = state["partitions"]
+        if self.embeddings is not None and self.encoder is not None:
+            self.embeddings.encoder = self.encoder
+        self.chunk_matrix = sparse.csr_matrix(
+            (arrays["tfidf_data"], arrays["tfidf_indices"], arrays["tfidf_indptr"]),
+            shape=tuple(state["matrix_shape"]), copy=False,
+        )
+        self.index = snapshot["faiss_index"]
+        self.using_faiss = self.index is not None
+        apply_search_params(self.index, self.ann)
+        self.snapshot_path = snapshot["path"]
+
+    def _build_index(self) -> None:
+        self.vectorizer = _make_vectorizer()
         with self.data_path.open("r", encoding="utf-8") as f:
             self.data = json.load(f)
         self.newsletters = self.data.get("months", [])
         self.chunks = self._build_chunks(self.data)
 
-        # Load detailed context file if available
+        # Stream the long-form context in token windows with section titles
         context_path = self.data_path.parent / "detailed_context.txt"
         if context_path.exists():
-            with context_path.open("r", encoding="utf-8") as f:
-                detailed_context = f.read()
-                # Split into sections for better retrieval
-                sections = detailed_context.split("=" * 78)
-                for section in sections:
-                    section = section.strip()
-                    if section and len(section) > 100:
-                        # Further split large sections into paragraphs
-                        paragraphs = section.split("\n\n")
-                        for para in paragraphs:
-                            para = para.strip()
-                            if para and len(para) > 50:
-                                self.chunks.append({
-                                    "text": para,
-                                    "metadata": {"type": "detailed_context", "data": {}}
-                                })
-
-        corpus = [chunk["text"] for chunk in self.chunks]
-        tfidf = self.vectorizer.fit_transform(corpus)
-        dense = tfidf.astype(np.float32).toarray()
-        self.chunk_matrix = dense
-
-        if faiss is not None and dense.size > 0:
-            self.index = faiss.IndexFlatIP(dense.shape[1])
-            normalized = dense.copy()
-            faiss.normalize_L2(normalized)
-            self.index.add(normalized)
+            self.chunks.extend(iter_document_chunks(context_path, *self.chunk_tokens))
+        if self.corpus_dir is not None:
+            self.chunks.extend(ingest_directory(self.corpus_dir, *self.chunk_tokens))
+
+        def texts():
+            return (chunk["text"] for chunk in self.chunks)
+
+        self.partitions = PartitionIndex().build(self.chunks, self.list_months())
+        self.bm25 = _make_bm25().build(
+            texts(), doc_boosts=[type_boost(c["metadata"].get("type", "")) for c in self.chunks]
+        )
+        self.embeddings = self._build_embeddings()
+        # Sparse TF-IDF; only the faiss index needs (and briefly holds) a dense copy
+        self.chunk_matrix = fit_transform_batched(self.vectorizer, texts)
+
+        if _faiss_available() and self.chunk_matrix.nnz > 0:
+            self.index = build_index(self.chunk_matrix.toarray(), self.ann)
             self.using_faiss = True
         else:
             self.index = None
             self.using_faiss = False
 
+    def _build_embeddings(self) -> EmbeddingIndex | None:
+        if not self.use_embeddings:
+            return None
+        encoder = self.encoder or load_encoder()
+        if encoder is None:
+            print("⚠️  RAG_EMBEDDINGS is set but sentence-transformers is not installed; dense retrieval disabled")
+            return None
+        corpus = [chunk["text"] for chunk in self.chunks]
+        return EmbeddingIndex(encoder, self.embed_quantization, os.getenv("RAG_EMBED_MODEL")).build(corpus)
+
     def _build_chunks(self, data: dict[str, Any]) -> list[dict[str, Any]]:
         chunks: list[dict[str, Any]] = []
 
@@ -208,81 +455,127 @@ class RagSystem:
                 )
                 chunks.append({"text": leader_text, "metadata": {"type": "rvsk", "data": rvsk}})
 
-                leader_text_hi = (
-                    "RVSK नेतृत्व leadership निदेशक director संयुक्त निदेशक joint director: "
-                    "Prof. Dinesh Prasad Saklani (निदेशक, NCERT); "
-                    "Prof. Amarendra Behera (संयुक्त निदेशक, CIET-NCERT); "
-                    "Prof. Indu Kumar (प्रमुख, DICT & TD, CIET-NCERT); "
-                    "Dr. Rajesh D. (सहयोगी प्रोफेसर, CIET-NCERT, राष्ट्रीय समन्वयक VSK)"
-                )
-                chunks.append({"text": leader_text_hi, "metadata": {"type": "rvsk", "data": rvsk}})
-
-            six_a_hi = (
-                "6A Framework 6A फ्रेमवर्क छह स्तंभ: "
-                "Attendance उपस्थिति, Assessment मूल्यांकन, Administration प्रशासन, "
-                "Accreditation मान्यता, Adaptive Learning अनुकूली शिक्षा, "
-                "Artificial Intelligence कृत्रिम बुद्धिमत्ता"
-            )
-            chunks.append({"text": six_a_hi, "metadata": {"type": "rvsk", "data": rvsk}})
-
-            rvsk_hi = (
-                "राष्ट्रीय विद्या समीक्षा केंद्र RVSK VSK विद्या समीक्षा: "
-                f"{progress.get('states_uts_operationalized', 35)} राज्य/केंद्र शासित प्रदेश, "
-                f"{progress.get('total_operational_vsks', 38)} VSK संचालित (35 राज्य/केंद्र शासित प्रदेश + 3 CABs), "
-                f"APAAR IDs: {progress.get('total_apaar_ids', '')}. "
-                "स्कूल शिक्षा school education शिक्षा मंत्रालय ministry of education"
-            )
-            chunks.append({"text": rvsk_hi, "metadata": {"type": "rvsk", "data": rvsk}})
-
         return chunks
 
-    def search(self, query: str, top_k: int = 3) -> list[dict[str, Any]]:
+    def search(self, query: str, top_k: int = 3, ranker: str | None = None,
+               route: bool = False, filters: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        """
+        Rank chunks for ``query``. ``ranker`` overrides the configured
+        RAG_RANKER: "tfidf" (cosine), "bm25" (inverted index with chunk type
+        boosts), "hybrid" (weighted blend of both), "dense" (embeddings) or
+        "fusion" (reciprocal rank fusion of BM25 and embeddings). Without an
+        embedding index, "dense" falls back to tfidf and "fusion" to bm25.
+
+        With ``route=True`` only the month/state shards named in the query
+        are scored. ``filters`` restricts results by metadata through the
+        partition posting lists, e.g. ``{"type": "rvsk"}`` or
+        ``{"type": "month", "month": "Q3 2025"}`` (fields: type, category,
+        language, month, state; see partitions.py).
+        """
+        return self.results(self.search_ids(query, top_k, ranker, route, filters))
+
+    def search_ids(self, query: str, top_k: int = 3, ranker: str | None = None,
+                   route: bool = False, filters: dict[str, Any] | None = None) -> list[tuple[int, float]]:
+        """The (chunk id, score) pairs behind ``search``, best first; cheap to send between processes"""
         if not query.strip() or self.chunk_matrix is None or len(self.chunks) == 0:
             return []
 
-        q = self.vectorizer.transform([query]).astype(np.float32).toarray()
-        if self.using_faiss and self.index is not None:
-            qn = q.copy()
-            faiss.normalize_L2(qn)
-            scores, indices = self.index.search(qn, min(top_k, len(self.chunks)))
-            pairs = zip(indices[0], scores[0], strict=False)
+        ranker = (ranker or self.ranker).lower()
+        if ranker in ("dense", "fusion") and self.embeddings is None:
+            ranker = "bm25" if ranker == "fusion" else "tfidf"
+
+        candidates = None
+        if filters:
+            candidates = self.partitions.select(filters)
+            if not len(candidates):
+                return []
+        if route and self.partitions is not None:
+            routed = self.partitions.route(query, min_size=top_k, filters=filters)
+            if routed is not None:
+                candidates = routed
+
+        return [(int(i), float(score)) for i, score in self._rank(query, top_k, ranker, candidates) if i >= 0]
+
+    def results(self, pairs: list[tuple[int, float]]) -> list[dict[str, Any]]:
+        """Result dicts, as ``search`` returns them, for (chunk id, score) pairs"""
+        return [self._result(i, score) for i, score in pairs]
+
+    def _rank(self, query: str, top_k: int, ranker: str, candidates=None):
+        """(chunk id, score) pairs, best first, optionally within candidate ids"""
+        if ranker == "dense":
+            return self.embeddings.search(query, top_k, self.dense_min_similarity, candidates)
+        if ranker == "fusion":
+            return self._fusion_search(query, top_k, candidates)
+        if ranker == "tfidf" and candidates is None and self.using_faiss and self.index is not None:
+            return self._faiss_search(query, top_k)
+
+        scores = self._lexical_scores(query, ranker, candidates)
+        top = top_k_indices(scores, top_k)
+        ids = top if candidates is None else candidates[top]
+        return [(int(i), float(scores[j])) for i, j in zip(ids, top)]
+
+    def _query_vector(self, query: str):
+        return self.vectorizer.transform([query]).astype(np.float32).toarray()
+
+    def _faiss_search(self, query: str, top_k: int):
+        qn = self._query_vector(query)
+        faiss.normalize_L2(qn)
+        scores, indices = self.index.search(qn, min(top_k, len(self.chunks)))
+        return zip(indices[0], scores[0], strict=False)
+
+    def _lexical_scores(self, query: str, ranker: str, candidates=None):
+        """Exact scores over all chunks, or only over the candidate rows"""
+        if ranker == "bm25":
+            scores = self.bm25.scores(query)
+            return scores if candidates is None else scores[candidates]
+
+        rows = self.chunk_matrix if candidates is None else self.chunk_matrix[candidates]
+        cosine = (rows @ self._query_vector(query).T).flatten()
+        if ranker != "hybrid":
+            return cosine
+
+        bm25 = self.bm25.scores(query)
+        if candidates is not None:
+            bm25 = bm25[candidates]
+        peak = float(bm25.max()) if bm25.size else 0.0
+        if peak > 0:
+            bm25 = bm25 / peak
+        return self.hybrid_alpha * cosine + (1 - self.hybrid_alpha) * bm25
+
+    def _fusion_search(self, query: str, top_k: int, candidates=None):
+        depth = max(top_k * 4, 20)
+        lexical = [i for i, score in self._rank(query, depth, "bm25", candidates) if score > 0]
+        dense = [i for i, _ in self.embeddings.search(query, depth, self.dense_min_similarity, candidates)]
+        return reciprocal_rank_fusion([lexical, dense])[:top_k]
+
+    def _result(self, i: int, score: float) -> dict[str, Any]:
+        # Generate appropriate source based on chunk type
+        metadata = self.chunks[i]["metadata"]
+        chunk_type = metadata.get("type", "month")
+
+        if chunk_type == "month":
+            source = f"official_newsletter::{metadata['data']['month']}"
+        elif chunk_type == "director_message":
+            source = "official_newsletter::director_message"
+        elif chunk_type == "technical":
+            source = "official_newsletter::technical_developments"
+        elif chunk_type == "kpi":
+            category = metadata.get("category", "general")
+            source = f"official_newsletter::kpi_{category}"
+        elif chunk_type == "state_engagement":
+            source = "official_newsletter::state_engagement"
+        elif "file" in metadata:
+            source = f"corpus::{metadata['file']}"
         else:
-            scores = (self.chunk_matrix @ q.T).flatten()
-            top_indices = np.argsort(scores)[::-1][:top_k]
-            pairs = [(i, float(scores[i])) for i in top_indices]
-
-        results = []
-        for i, score in pairs:
-            if i < 0:
-                continue
-
-            # Generate appropriate source based on chunk type
-            metadata = self.chunks[i]["metadata"]
-            chunk_type = metadata.get("type", "month")
-
-            if chunk_type == "month":
-                source = f"official_newsletter::{metadata['data']['month']}"
-            elif chunk_type == "director_message":
-                source = "official_newsletter::director_message"
-            elif chunk_type == "technical":
-                source = "official_newsletter::technical_developments"
-            elif chunk_type == "kpi":
-                category = metadata.get("category", "general")
-                source = f"official_newsletter::kpi_{category}"
-            elif chunk_type == "state_engagement":
-                source = "official_newsletter::state_engagement"
-            else:
-                source = "official_newsletter::general"
-
-            results.append(
-                {
-                    "score": float(score),
-                    "text": self.chunks[i]["text"],
-                    "metadata": metadata,
-                    "source": source,
-                }
-            )
-        return results
+            source = "official_newsletter::general"
+
+        return {
+            "id": int(i),
+            "score": float(score),
+            "text": self.chunks[i]["text"],
+            "metadata": metadata,
+            "source": source,
+        }
 
     def list_months(self) -> list[str]:
         return [m["month"] for m in self.newsletters]
@@ -0,0 +1,200 @@
+"""
+Language-aware text analysis shared by the TF-IDF and BM25 indexes.
+
+The default sklearn token pattern splits Devanagari words on their vowel
+signs and viramas, so Hindi queries used to match only hand-written
+bilingual chunks. ``analyze`` instead:
+
+1. normalises Devanagari (NFC, nukta letters folded to their base letter,
+   chandrabindu to anusvara, zero-width joiners and dandas removed,
+   Devanagari digits to ASCII),
+2. tokenises whole words, Devanagari marks included,
+3. maps Hindi and Hinglish (romanised Hindi) words to one shared English
+   form through ``SHARED_FORMS``, so "उपस्थिति", "upasthiti" and
+   "attendance" are the same term, and
+4. drops English, Hindi and Hinglish stopwords.
+
+Both languages therefore share one vocabulary; chunks are still tagged with
+their script language (see partitions.py), which gives each language its
+own sub-index through ``filters={"language": "hi"}``.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from functools import lru_cache
+
+TOKEN_RE = re.compile(r"[\w\u0900-\u097F]+")
+
+_NUKTA = "\u093c"
+_STRIP = str.maketrans({
+    "\u200c": None, "\u200d": None,  # zero-width (non-)joiner
+    "\u0964": " ", "\u0965": " ",    # danda, double danda
+    "\u0901": "\u0902",              # chandrabindu -> anusvara
+    **{chr(0x0966 + d): str(d) for d in range(10)},  # Devanagari digits
+})
+
+# Romanised Hindi words common in chat questions. Function words among them
+# are stopwords; content words have an entry in SHARED_FORMS.
+HINGLISH_KEYWORDS = [
+    "kya", "hai", "hain", "mein", "ka", "ki", "ke", "ko", "se", "par",
+    "kitne", "kitni", "kaun", "kaise", "kahan", "kab", "kyun", "kyon",
+    "batao", "bataiye", "bataen", "dijiye", "karein", "karo",
+    "aur", "ya", "lekin", "agar", "toh", "nahi", "nahin",
+    "shiksha", "vidyalaya", "school", "adhyapak", "chhatra",
+    "upasthiti", "pradesh", "rajya", "sarkar", "mantralaya",
+    "vikas", "yojana", "karyakram",
+    "kitna", "kaisa", "sabhi", "sab", "kuch", "bahut",
+    "samiksha", "vidya", "kendra",
+]
+
+HINGLISH_TOKENS = frozenset(HINGLISH_KEYWORDS)
+
+HINGLISH_STOP_WORDS = frozenset({
+    "kya", "hai", "hain", "mein", "ka", "ki", "ke", "ko", "se", "par",
+    "kitne", "kitni", "kitna", "kaun", "kaise", "kaisa", "kahan", "kab", "kyun", "kyon",
+    "batao", "bataiye", "bataen", "dijiye", "karein", "karo",
+    "aur", "ya", "lekin", "agar", "toh", "nahi", "nahin", "sabhi", "sab", "kuch", "bahut",
+})
+
+HINDI_STOP_WORDS = frozenset({
+    "का", "की", "के", "को", "में", "से", "पर", "है", "हैं", "था", "थी", "थे", "हो", "होता",
+    "होती", "होते", "और", "या", "भी", "तो", "ही", "यह", "ये", "वह", "वे", "इस", "उस", "इन",
+    "उन", "एक", "कि", "जो", "कर", "करें", "किया", "क्या", "कितने", "कितनी", "कितना",
+    "कौन", "कैसे", "कैसा", "कहां", "कहाँ", "कब", "क्यों", "बताएं", "बताइए", "बताओ", "दीजिए",
+    "लिए", "द्वारा", "साथ", "तक", "गया", "गई", "गए", "रहा", "रही", "रहे", "सभी", "कुछ", "बहुत",
+    "अपने", "अपनी", "नहीं", "हुआ", "हुई", "हुए",
+})
+
+# Hindi / Hinglish word -> shared (English) form used by both indexes.
+# Multi-word values expand to several tokens.
+SHARED_FORMS = {
+    # months
+    "जनवरी": "january", "फरवरी": "february", "मार्च": "march", "अप्रैल": "april",
+    "मई": "may", "जून": "june", "जुलाई": "july", "अगस्त": "august",
+    "सितंबर": "september", "अक्टूबर": "october", "नवंबर": "november", "दिसंबर": "december",
+    # core metrics
+    "स्कूल": "schools", "विद्यालय": "schools", "vidyalaya": "schools",
+    "शिक्षक": "teachers", "अध्यापक": "teachers", "adhyapak": "teachers", "shikshak": "teachers",
+    "छात्र": "students", "विद्यार्थी": "students", "chhatra": "students", "vidyarthi": "students",
+    "उपस्थिति": "attendance", "upasthiti": "attendance", "हाजिरी": "attendance",
+    "नामांकन": "enrollment", "पंजीकरण": "registrations", "panjikaran": "registrations",
+    "आईडी": "ids", "अपार": "apaar",
+    # education system
+    "शिक्षा": "education", "shiksha": "education", "मंत्रालय": "ministry", "mantralaya": "ministry",
+    "सरकार": "government", "sarkar": "government", "राज्य": "state", "rajya": "state",
+    "राष्ट्रीय": "rashtriya", "विद्या": "vidya", "समीक्षा": "samiksha", "केंद्र": "kendra",
+    "प्रदेश": "pradesh", "विकास": "development", "vikas": "development",
+    "योजना": "scheme", "yojana": "scheme", "कार्यक्रम": "programme", "karyakram": "programme",
+    # leadership and programmes
+    "निदेशक": "director", "संयुक्त": "joint", "नेतृत्व": "leadership", "प्रमुख": "head",
+    "संदेश": "message", "प्रोफेसर": "professor", "समन्वयक": "coordinator",
+    "मूल्यांकन": "assessment", "प्रशासन": "administration", "मान्यता": "accreditation",
+    "अनुकूली": "adaptive", "कृत्रिम": "artificial", "बुद्धिमत्ता": "intelligence",
+    "फ्रेमवर्क": "framework", "प्रशिक्षण": "training", "कार्यशाला": "workshop",
+    "डैशबोर्ड": "dashboard", "तकनीकी": "technical", "गोपनीयता": "privacy",
+    "डेटा": "data", "संरक्षण": "protection", "प्रदर्शन": "performance",
+    "परिणाम": "outcomes", "सीखने": "learning", "वृद्धि": "growth",
+    # States / UTs
+    "आंध्र": "andhra", "अरुणाचल": "arunachal", "असम": "assam", "बिहार": "bihar",
+    "छत्तीसगढ़": "chhattisgarh", "गोवा": "goa", "गुजरात": "gujarat", "हरियाणा": "haryana",
+    "हिमाचल": "himachal", "झारखंड": "jharkhand", "कर्नाटक": "karnataka", "केरल": "kerala",
+    "मध्य": "madhya", "महाराष्ट्र": "maharashtra", "मणिपुर": "manipur", "मेघालय": "meghalaya",
+    "मिजोरम": "mizoram", "नागालैंड": "nagaland", "ओडिशा": "odisha", "पंजाब": "punjab",
+    "राजस्थान": "rajasthan", "सिक्किम": "sikkim", "तमिलनाडु": "tamil nadu", "तमिल": "tamil",
+    "नाडु": "nadu", "तेलंगाना": "telangana", "त्रिपुरा": "tripura", "उत्तर": "uttar",
+    "उत्तराखंड": "uttarakhand", "पश्चिम": "west", "बंगाल": "bengal", "चंडीगढ़": "chandigarh",
+    "दिल्ली": "delhi", "जम्मू": "jammu", "कश्मीर": "kashmir", "लद्दाख": "ladakh",
+    "लक्षद्वीप": "lakshadweep", "पुडुचेरी": "puducherry",
+}
+
+
+def normalize(text: str) -> str:
+    """NFC-normalise and fold Devanagari spelling variants to one form"""
+    text = unicodedata.normalize("NFC", text)
+    if _NUKTA in text or any("\u0958" <= ch <= "\u095f" for ch in text):
+        # Precomposed nukta letters (U+0958..U+095F) decompose to base + nukta
+        text = unicodedata.normalize("NFD", text).replace(_NUKTA, "")
+        text = unicodedata.normalize("NFC", text)
+    return text.translate(_STRIP)
+
+
+# Oblique/plural endings tried, longest first, when a word is not in SHARED_FORMS
+# (शिक्षकों -> शिक्षक). Only stems that are themselves known words are used.
+HINDI_SUFFIXES = ("ियों", "ाओं", "ों", "ें", "ी", "े", "ा")
+
+
+@lru_cache(maxsize=65536)
+def _shared(token: str) -> tuple[str, ...]:
+    shared = SHARED_FORMS.get(token)
+    if shared is None:
+        for suffix in HINDI_SUFFIXES:
+            if token.endswith(suffix) and token[:-len(suffix)] in SHARED_FORMS:
+                shared = SHARED_FORMS[token[:-len(suffix)]]
+                break
+    return tuple((shared or token).split())
+
+
+# Keys are normalised once so lookups match normalised tokens
+SHARED_FORMS = {normalize(k): v for k, v in SHARED_FORMS.items()}
+HINDI_STOP_WORDS = frozenset(normalize(w) for w in HINDI_STOP_WORDS)
+
+
+def shared_form(text: str) -> str:
+    """Text with Hindi/Hinglish words replaced by their shared form; stopwords kept"""
+    return " ".join(t for token in TOKEN_RE.findall(normalize(text).lower()) for t in _shared(token))
+
+
+def _english_stop_words() -> frozenset[str]:
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+    return frozenset(ENGLISH_STOP_WORDS)
+
+
+@lru_cache(maxsize=1)
+def stop_words() -> frozenset[str]:
+    return _english_stop_words() | HINDI_STOP_WORDS | HINGLISH_STOP_WORDS
+
+
+# Language detection: str.translate deletes one script in C, so the length
+# difference counts its characters without a Python-level loop.
+_DROP_DEVANAGARI = {cp: None for cp in range(0x0900, 0x0980)}
+_DROP_LATIN = {cp: None for cp in (*range(ord("a"), ord("z") + 1), *range(ord("A"), ord("Z") + 1))}
+DETECT_WINDOW = 2000  # long pasted queries are judged on their first characters
+HINGLISH_RATIO = 0.25  # share of Hinglish words that makes a Latin query Hindi
+DEVANAGARI_RATIO = 0.3  # Devanagari letters per Latin letter that make a query Hindi
+
+
+def detect_language(query: str) -> tuple[str, float]:
+    """
+    ("hi" | "en", confidence in [0, 1]) for a chat query.
+
+    A query is Hindi when it has Devanagari letters at DEVANAGARI_RATIO of its
+    Latin letters or more, or when at least HINGLISH_RATIO of its words are
+    romanised Hindi. Confidence is 0.5 at a decision boundary and 1.0 for
+    pure Devanagari, pure Hinglish or no Hinglish words at all.
+    """
+    window = query[:DETECT_WINDOW]
+    devanagari = len(window) - len(window.translate(_DROP_DEVANAGARI))
+    if devanagari:
+        latin = len(window) - len(window.translate(_DROP_LATIN))
+        if devanagari >= latin * DEVANAGARI_RATIO:
+            return "hi", devanagari / (devanagari + latin * DEVANAGARI_RATIO)
+
+    words = window.lower().split()
+    if not words:
+        return "en", 0.0
+    ratio = sum(1 for w in words if w in HINGLISH_TOKENS) / len(words)
+    if ratio >= HINGLISH_RATIO:
+        return "hi", min(1.0, 0.5 + (ratio - HINGLISH_RATIO) / (2 * HINGLISH_RATIO))
+    return "en", 1.0 - ratio / (2 * HINGLISH_RATIO)
+
+
+def analyze(text: str) -> list[str]:
+    """Index terms for ``text``: normalised, shared-form, stopword-free tokens"""
+    stop = stop_words()
+    return [
+        t for token in TOKEN_RE.findall(normalize(text).lower()) if token not in stop
+        for t in _shared(token) if len(t) > 1 and t not in stop
+    ]
@@ -0,0 +1,130 @@
+"""
+Warm-up work done on every ``/api/keep-alive`` ping.
+
+The keep-alive cron job used to only keep the process running; after a
+spin-down the first real user still paid for the index build, page faults on
+the memory-mapped snapshot, first-call costs in the chat path and the
+Ollama model load. ``Warmup.run`` does each of those steps itself and times
+them:
+
+1. ``index``: build or attach the RAG index (``RagSystem.ensure_initialized``)
+2. ``pages``: read the snapshot into the page cache and touch the mapped
+   chunk matrix (``RagSystem.touch_pages``)
+3. ``queries``: answer the top questions through search and rendering, but
+   not the LLM. These are the questions of the pre-generated insights, or
+   the canonical questions from pregenerate.py; ``WARMUP_QUERIES`` caps
+   them (default 8).
+4. ``model``: ask Ollama to load the model with ``keep_alive``
+   (``LLMHandler.preload``). A cold load can take longer than the cron
+   job waits for the response, so it runs in the background: the report
+   says ``"pending"``, and the next ping reports that load's timings.
+
+The report says whether the service was cold: the index had to be built or
+Ollama had to load the model. keep_alive_cron.py prints it.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any
+
+try:
+    from backend.llm.answer_blocks import render_blocks
+    from backend.llm.model_residency import COLD_LOAD_MS
+    from backend.pregenerate import canonical_questions
+except ImportError:
+    from llm.answer_blocks import render_blocks
+    from llm.model_residency import COLD_LOAD_MS
+    from pregenerate import canonical_questions
+
+
+class Warmup:
+    def __init__(self, rag_system, chat_handler, llm_handler, max_queries: int | None = None) -> None:
+        self.rag = rag_system
+        self.chat = chat_handler
+        self.llm = llm_handler
+        self.max_queries = max_queries if max_queries is not None else int(os.getenv("WARMUP_QUERIES", "8"))
+        self.last: dict[str, Any] | None = None
+        self._lock = threading.Lock()
+        self._model_thread: threading.Thread | None = None
+        self._model_result: dict[str, float] | str | None = None  # finished preload not yet reported
+
+    def top_queries(self) -> list[tuple[str, str]]:
+        """(question, language) pairs, pre-generated ones first"""
+        pregenerated = self.chat.pregenerated.entries(self.rag.data_version)
+        queries = [(entry["question"], entry["language"]) for entry in pregenerated.values()]
+        if not queries:
+            queries = [(question, "en") for question in canonical_questions(self.rag)]
+        return queries[:self.max_queries]
+
+    def _load_model(self) -> None:
+        self._model_result = self.llm.preload() or "failed"
+
+    def _preload_model(self) -> dict[str, float] | str | None:
+        """Timings of the preload finished since the last report, or "pending"; starts the next one"""
+        if self.llm is None or not self.llm.enabled:
+            return None
+        if self._model_thread is not None and self._model_thread.is_alive():
+            return "pending"
+        finished, self._model_result = self._model_result, None
+        self._model_thread = threading.Thread(target=self._load_model, name="warmup-model", daemon=True)
+        self._model_thread.start()
+        return finished or "pending"
+
+    def run(self) -> dict[str, Any]:
+        """Run every step once; concurrent pings get the last report instead"""
+        if not self._lock.acquire(blocking=False):
+            return {**(self.last or {}), "skipped": "warm-up already running"}
+        try:
+            self.last = self._run()
+            return self.last
+        finally:
+            self._lock.release()
+
+    def _run(self) -> dict[str, Any]:
+        durations: dict[str, float] = {}
+        started = time.perf_counter()
+
+        def lap(step: str, since: float) -> float:
+            now = time.perf_counter()
+            durations[step] = round((now - since) * 1000, 1)
+            return now
+
+        index_cold = not self.rag.ready
+        try:
+            self.rag.ensure_initialized()
+        except Exception as e:
+            return {"cold": True, "error": f"index: {e}", "durations_ms": durations}
+        t = lap("index", started)
+
+        pages_bytes = self.rag.touch_pages()
+        t = lap("pages", t)
+
+        answered = 0
+        for question, language in self.top_queries():
+            found = self.chat.structured_answer(question, language)
+            if found is not None:
+                render_blocks(found[2], language)
+                answered += 1
+        lap("queries", t)
+
+        model = self._preload_model()
+        model_cold = isinstance(model, dict) and model["load_ms"] > COLD_LOAD_MS
+
+        report = {
+            "cold": index_cold or model_cold,
+            "index_cold": index_cold,
+            "model_cold": model_cold,
+            "durations_ms": durations,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+            "pages_bytes": pages_bytes,
+            "queries": answered,
+            "model": model,
+            "finished_at": time.time(),
+        }
+        state = "cold" if report["cold"] else "warm"
+        print(f"🔥 Warm-up ({state}): {report['total_ms']:.0f} ms "
+              + ", ".join(f"{step} {ms:.0f} ms" for step, ms in durations.items()))
+        return report
@@ -0,0 +1,79 @@
+"""
+Recall@k and latency of the ANN index modes against the exact flat index.
+
+Usage:
+    python -m benchmarks.ann_recall [--size N] [--k 5] [--queries 200]
+
+The newsletter corpus is only a few hundred chunks, so ``--size`` grows it
+synthetically: each extra vector blends two real chunk vectors, which keeps
+the sparse TF-IDF structure. Query vectors are perturbed chunk vectors.
+Sweeps nprobe (IVF) and efSearch (HNSW) to show the recall/latency trade-off.
+Requires faiss.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend.rag.ann import AnnConfig, apply_search_params, build_index, recall_at_k
+from backend.rag.rag_system import RagSystem
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "backend" / "data" / "newsletter_data.json"
+
+
+def _corpus(size: int, rng) -> np.ndarray:
+    rag = RagSystem(str(DATA_PATH), index_dir="")
+    rag.ensure_initialized()
+    base = rag.chunk_matrix.toarray()
+    if size <= len(base):
+        return base
+    a = base[rng.integers(0, len(base), size - len(base))]
+    b = base[rng.integers(0, len(base), size - len(base))]
+    w = rng.random((size - len(base), 1), dtype=np.float32)
+    return np.vstack([base, w * a + (1 - w) * b])
+
+
+def _search(index, queries: np.ndarray, k: int) -> tuple[np.ndarray, float]:
+    started = time.perf_counter()
+    _, ids = index.search(queries, k)
+    return ids, (time.perf_counter() - started) * 1000 / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=5000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors = _corpus(args.size, rng)
+    queries = vectors[rng.integers(0, len(vectors), args.queries)]
+    queries = queries + rng.normal(0, 0.01, queries.shape).astype(np.float32)
+    queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+    started = time.perf_counter()
+    exact = build_index(vectors, AnnConfig("flat"))
+    exact_build_ms = (time.perf_counter() - started) * 1000
+    print(f"corpus: {vectors.shape[0]} x {vectors.shape[1]}, k={args.k}")
+    print(f"{'index':<22} {'build ms':>9} {'query ms':>9} {'recall@k':>9}")
+    truth, exact_ms = _search(exact, queries, args.k)
+    print(f"{'flat (exact)':<22} {exact_build_ms:>9.1f} {exact_ms:>9.3f} {1.0:>9.3f}")
+
+    for index_type, knob, values in (("ivf", "nprobe", (1, 4, 8, 16)), ("hnsw", "ef_search", (16, 32, 64, 128))):
+        started = time.perf_counter()
+        index = build_index(vectors, AnnConfig(index_type))
+        build_ms = (time.perf_counter() - started) * 1000
+        for value in values:
+            apply_search_params(index, AnnConfig(index_type, **{knob: value}))
+            ids, query_ms = _search(index, queries, args.k)
+            label = f"{index_type} {knob}={value}"
+            print(f"{label:<22} {build_ms:>9.1f} {query_ms:>9.3f} {recall_at_k(truth, ids, args.k):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
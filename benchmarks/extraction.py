@@ -0,0 +1,122 @@
+"""
+Post-processing cost of LLM answers: the single-pass metric scanner against
+the previous per-metric regex loops of data_formatter.py and
+production_cleaner.py.
+
+Usage:
+    python -m benchmarks.extraction [--repeat 200] [--scale 1,4,16,64]
+
+The answer is a typical statistics reply (bullets, monthly figures, State
+percentages) repeated ``scale`` times, to show how both grow with length.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+
+from backend.llm.metric_extraction import scan
+
+ANSWER = """APAAR registrations kept growing through the year.
+
+- Schools 14,72,000 reporting, Teachers 98,00,000 linked
+• Students 24,80,00,000 tracked, Attendance 94.2%
+* APAAR IDs 23,50,00,000 generated, Enrollment 25,10,00,000
+Kerala 96.1%, Tamil Nadu 95.4% and Uttar Pradesh 88.5% lead attendance.
+April 2025: 120M registrations (28 States)
+May 2025: 140M
+June 2025: 150M students
+"""
+
+
+# Previous extraction code, kept here as the baseline
+def legacy_detect_statistical_patterns(text):
+    patterns = []
+    stat_pattern = r'(?:Schools?|Teachers?|Students?|APAAR IDs?|Attendance|Enrollment)\s+(\d[\d,]*\.?\d*%?)'
+    matches = re.findall(stat_pattern, text, re.IGNORECASE)
+    if len(matches) >= 3:
+        patterns.append({'type': 'key_metrics', 'matches': matches, 'text': text})
+    monthly_pattern = (r'((?:January|February|March|April|May|June|July|August|September|October|November|December)'
+                       r'\s+\d{4}):\s*(\d+M?)\s*(?:registrations?|students?|schools?)?\s*(?:\([^)]+\))?')
+    monthly_matches = re.findall(monthly_pattern, text, re.IGNORECASE)
+    if len(monthly_matches) >= 3:
+        patterns.append({'type': 'monthly_data', 'matches': monthly_matches, 'text': text})
+    state_matches = re.findall(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)\s+(\d+\.?\d*%)', text)
+    if len(state_matches) >= 2:
+        patterns.append({'type': 'state_data', 'matches': state_matches, 'text': text})
+    return patterns
+
+
+def legacy_extract_key_metrics_from_text(text):
+    metrics = {}
+    metric_patterns = {
+        'Schools': r'Schools?\s+(\d[\d,]*)',
+        'Teachers': r'Teachers?\s+(\d[\d,]*)',
+        'Students': r'Students?\s+(\d[\d,]*)',
+        'APAAR IDs': r'APAAR IDs?\s+(\d[\d,]*)',
+        'Attendance': r'Attendance\s+(\d+\.?\d*%)',
+        'Enrollment': r'Enrollment\s+(\d[\d,]*)',
+    }
+    for metric_name, pattern in metric_patterns.items():
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            value = match.group(1)
+            if '%' not in value:
+                try:
+                    value = f"{int(value.replace(',', '')):,}"
+                except ValueError:
+                    pass
+            metrics[metric_name] = value
+    return metrics
+
+
+def legacy_extract_bullet_point_data(text):
+    bullet_data = []
+    for match in re.findall(r'[•\-\*]\s*([^\n]+)', text):
+        if bool(re.search(r'\d+(?:,\d{3})*', match)):
+            metrics = {}
+            for metric_name, pattern in {
+                'Schools': r'[Ss]chools?\s+(\d+(?:,\d{3})*)',
+                'Teachers': r'[Tt]eachers?\s+(\d+(?:,\d{3})*)',
+                'Students': r'[Ss]tudents?\s+(\d+(?:,\d{3})*)',
+                'APAAR IDs': r'APAAR IDs?\s+(\d+(?:,\d{3})*)',
+                'Attendance': r'[Aa]ttendance\s+(\d+\.?\d*%)',
+            }.items():
+                m = re.search(pattern, match)
+                if m:
+                    metrics[metric_name] = m.group(1)
+            if metrics:
+                bullet_data.append({'text': match, 'metrics': metrics})
+    return bullet_data
+
+
+def legacy_pipeline(text):
+    legacy_detect_statistical_patterns(text)
+    legacy_extract_key_metrics_from_text(text)
+    legacy_extract_bullet_point_data(text)
+
+
+def _time(fn, text: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - started) * 1e6 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--scale", default="1,4,16,64")
+    args = parser.parse_args()
+
+    print(f"{'answer chars':>12} {'regex loops us':>15} {'single pass us':>15}")
+    for scale in (int(s) for s in args.scale.split(",")):
+        text = ANSWER * scale
+        legacy_us = _time(legacy_pipeline, text, args.repeat)
+        scan_us = _time(scan, text, args.repeat)
+        print(f"{len(text):>12} {legacy_us:>15.1f} {scan_us:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
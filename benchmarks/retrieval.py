@@ -0,0 +1,82 @@
+"""
+CPU retrieval benchmark: index build time and query latency per ranker.
+
+Usage:
+    python -m benchmarks.retrieval [--encoder hashing|model] [--quant int8|fp16] [--repeat N]
+
+``--encoder model`` embeds with the sentence-transformers model from
+RAG_EMBED_MODEL (must be installed and downloaded); ``hashing`` uses the
+dependency-light character n-gram stand-in so the index and quantization
+overhead can be measured anywhere. All timings are CPU-only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from backend.rag.embeddings import hashing_encoder, load_encoder
+from backend.rag.rag_system import RagSystem
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "backend" / "data" / "newsletter_data.json"
+
+QUERIES = [
+    "How many students in April 2025?",
+    "how many kids were enrolled in January",
+    "APAAR registration growth",
+    "Kerala attendance",
+    "RVSK leadership",
+    "उपस्थिति दर",
+    "DPDP compliance",
+    "teacher training workshops",
+]
+
+
+def _time_queries(rag: RagSystem, ranker: str, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            started = time.perf_counter()
+            rag.search(query, top_k=5, ranker=ranker)
+            samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--encoder", choices=["hashing", "model"], default="hashing")
+    parser.add_argument("--quant", choices=["int8", "fp16"], default="int8")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    encoder = hashing_encoder() if args.encoder == "hashing" else load_encoder()
+    if encoder is None:
+        raise SystemExit("sentence-transformers is not installed; use --encoder hashing")
+
+    lexical = RagSystem(str(DATA_PATH), index_dir="")
+    started = time.perf_counter()
+    lexical.ensure_initialized()
+    lexical_build = time.perf_counter() - started
+
+    semantic = RagSystem(str(DATA_PATH), index_dir="", encoder=encoder)
+    semantic.embed_quantization = args.quant
+    started = time.perf_counter()
+    semantic.ensure_initialized()
+    semantic_build = time.perf_counter() - started
+
+    print(f"chunks: {len(lexical.chunks)}")
+    print(f"build  lexical (tfidf + bm25): {lexical_build * 1000:8.1f} ms")
+    print(f"build  + embeddings ({args.encoder}, {args.quant}): {semantic_build * 1000:8.1f} ms, "
+          f"{semantic.embeddings.nbytes() / 1024:.1f} KiB of vectors")
+    print(f"{'ranker':<8} {'p50 ms':>8} {'p95 ms':>8}")
+    for ranker in ("tfidf", "bm25", "hybrid", "dense", "fusion"):
+        rag = semantic if ranker in ("dense", "fusion") else lexical
+        samples = sorted(_time_queries(rag, ranker, args.repeat))
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        print(f"{ranker:<8} {statistics.median(samples):>8.3f} {p95:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
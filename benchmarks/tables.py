@@ -0,0 +1,89 @@
+"""
+Payload size and render time of chat answer tables: the class-based
+renderer against the previous inline-styled tables.
+
+Usage:
+    python -m benchmarks.tables [--rows 36] [--repeat 2000]
+
+The table mirrors the "State-wise Performance" block of a monthly answer,
+with one row per State/UT.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from backend.llm.table_renderer import render_table
+from backend.rag.partitions import STATES_UTS
+
+# Previous renderer from chat_handler.py, kept here as the baseline
+LEGACY_TABLE_STYLE = (
+    'border-collapse:collapse;width:100%;margin:16px 0;'
+    'box-shadow:0 2px 8px rgba(0,61,130,0.12);border-radius:8px;overflow:hidden;'
+    "font-family:'Segoe UI',Tahoma,Geneva,Verdana,sans-serif;"
+)
+LEGACY_THEAD_STYLE = 'background:linear-gradient(135deg,#003d82 0%,#0056b3 100%);color:white;'
+LEGACY_TH_STYLE = 'padding:14px 12px;text-align:left;font-weight:600;border-bottom:3px solid #FF6600;'
+
+
+def _legacy_td(value: str, bold: bool = False, color: str = "#333") -> str:
+    fw = "font-weight:600;" if bold else ""
+    return f'<td style="padding:12px;border-bottom:1px solid #e0e0e0;{fw}color:{color};">{value}</td>'
+
+
+def legacy_html_table(headers, rows, *, col_styles=None) -> str:
+    ths = "".join(f'<th style="{LEGACY_TH_STYLE}">{h}</th>' for h in headers)
+    body = ""
+    for i, row in enumerate(rows):
+        bg = "#ffffff" if i % 2 == 0 else "#f8f9fa"
+        cells = ""
+        for j, cell in enumerate(row):
+            st = (col_styles[j] if col_styles and j < len(col_styles) else {})
+            cells += _legacy_td(cell, bold=st.get("bold", False), color=st.get("color", "#333"))
+        body += f'<tr style="background:{bg};">{cells}</tr>'
+    return (
+        f'<table style="{LEGACY_TABLE_STYLE}">'
+        f'<thead><tr style="{LEGACY_THEAD_STYLE}">{ths}</tr></thead>'
+        f'<tbody>{body}</tbody></table>'
+    )
+
+
+HEADERS = ["State / UT", "Attendance", "APAAR Coverage", "Schools"]
+COL_STYLES = [{"bold": True, "color": "#003d82"}, {"bold": True, "color": "#28a745"}, {"bold": True}, {}]
+
+
+def state_rows(n: int) -> list[list[str]]:
+    names = (STATES_UTS * (n // len(STATES_UTS) + 1))[:n]
+    return [[name, f"{90 + i % 10}.{i % 7}%", f"{80 + i % 20}.{i % 3}%", f"{12000 + 137 * i:,}"]
+            for i, name in enumerate(names)]
+
+
+def _time(fn, rows, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(HEADERS, rows, col_styles=COL_STYLES)
+    return (time.perf_counter() - started) * 1e6 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=len(STATES_UTS))
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = state_rows(args.rows)
+    legacy = legacy_html_table(HEADERS, rows, col_styles=COL_STYLES)
+    compiled = render_table(HEADERS, rows, col_styles=COL_STYLES)
+    legacy_us = _time(legacy_html_table, rows, args.repeat)
+    compiled_us = _time(render_table, rows, args.repeat)
+
+    print(f"state table: {args.rows} rows x {len(HEADERS)} columns")
+    print(f"{'renderer':<14} {'bytes':>8} {'render us':>10}")
+    print(f"{'inline styles':<14} {len(legacy.encode()):>8} {legacy_us:>10.1f}")
+    print(f"{'css classes':<14} {len(compiled.encode()):>8} {compiled_us:>10.1f}")
+    print(f"size -{100 * (1 - len(compiled) / len(legacy)):.0f}%, time -{100 * (1 - compiled_us / legacy_us):.0f}%")
+
+
+if __name__ == "__main__":
+    main()
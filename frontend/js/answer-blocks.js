@@ -0,0 +1,141 @@
+/* ================================================================
+   ANSWER BLOCKS
+   Client-side renderer for /api/chat answers requested with
+   response_format: 'json'. Mirrors backend/llm/answer_blocks.py:
+   labels are fetched once per language from /api/chat/labels and
+   blocks are rendered to the same markup the server would send.
+   ================================================================ */
+(function() {
+    const labelCache = {};
+
+    const HEADING_STYLE = 'color:#003d82;margin:0 0 16px 0;';
+    const SECTION_FIRST_STYLE = 'margin:8px 0;';
+    const SECTION_STYLE = 'margin:20px 0 8px;';
+    const PARAGRAPH_STYLE = 'margin:8px 0 12px;line-height:1.7;';
+    const LEAD_PARAGRAPH_STYLE = 'margin:16px 0 4px;line-height:1.7;';
+    const LIST_STYLE = 'margin:0;padding-left:24px;';
+    const ITEM_STYLE = 'margin:6px 0;line-height:1.7;';
+    const RULE_STYLE = 'border:none;border-top:1px solid #e0e0e0;margin:24px 0;';
+    const INSIGHT_STYLE = 'padding:12px 16px;background:#f8f9fa;border-left:4px solid #003d82;border-radius:4px;line-height:1.7;';
+    const COLOR_CLASSES = { '#003d82': 'vsk-blue', '#ff6600': 'vsk-orange', '#28a745': 'vsk-green', '#333': '' };
+
+    function loadLabels(lang) {
+        if (!labelCache[lang]) {
+            labelCache[lang] = fetch(`${API_BASE}/api/chat/labels?language=${encodeURIComponent(lang)}`)
+                .then(r => { if (!r.ok) throw new Error('labels'); return r.json(); })
+                .then(data => data.labels)
+                .catch(err => { delete labelCache[lang]; throw err; });
+        }
+        return labelCache[lang];
+    }
+
+    function text(item, labels) {
+        if (typeof item === 'string') return labels[item] !== undefined ? labels[item] : item;
+        if (item.label !== undefined) return labels[item.label] !== undefined ? labels[item.label] : item.label;
+        return item.text || '';
+    }
+
+    // Data cells are literal strings; only {label} cells are translated
+    function cellText(cell, labels) {
+        if (typeof cell === 'string') return cell;
+        const label = text(cell, labels);
+        return cell.count !== undefined ? `${cell.count} ${label}` : label;
+    }
+
+    function cellOpen(style) {
+        if (!style || !Object.keys(style).length) return '<td>';
+        const classes = style.bold ? ['vsk-b'] : [];
+        let inline = '';
+        if (style.color) {
+            const mapped = COLOR_CLASSES[style.color.toLowerCase()];
+            if (mapped === undefined) inline = ` style="color:${style.color};"`;
+            else if (mapped) classes.push(mapped);
+        }
+        return `<td${classes.length ? ` class="${classes.join(' ')}"` : ''}${inline}>`;
+    }
+
+    function renderTable(block, labels) {
+        const opens = (block.styles || []).map(cellOpen);
+        const parts = ['<table class="vsk-table"><thead><tr>'];
+        block.columns.forEach(c => parts.push(`<th>${text(c, labels)}</th>`));
+        parts.push('</tr></thead><tbody>');
+        block.rows.forEach(row => {
+            parts.push('<tr>');
+            row.forEach((cell, j) => parts.push(`${opens[j] || '<td>'}${cellText(cell, labels)}</td>`));
+            parts.push('</tr>');
+        });
+        parts.push('</tbody></table>');
+        return parts.join('');
+    }
+
+    function renderBlock(block, labels, afterHeading) {
+        switch (block.type) {
+            case 'heading': {
+                let title = text(block, labels);
+                if (block.prefix) title = `${block.prefix} — ${title}`;
+                if (block.suffix) title = `${title}: ${block.suffix}`;
+                return `<h3 style="${HEADING_STYLE}">${title}</h3>`;
+            }
+            case 'section':
+                return `<p style="${afterHeading ? SECTION_FIRST_STYLE : SECTION_STYLE}"><strong>${text(block, labels)}:</strong></p>`;
+            case 'table':
+                return renderTable(block, labels);
+            case 'list':
+                return `<ul style="${LIST_STYLE}">${block.items.map(i => `<li style="${ITEM_STYLE}">${i}</li>`).join('')}</ul>`;
+            case 'paragraph':
+                if (block.lead) return `<p style="${LEAD_PARAGRAPH_STYLE}"><strong>${text(block.lead, labels)}:</strong> ${text(block, labels)}</p>`;
+                return `<p style="${PARAGRAPH_STYLE}">${text(block, labels)}</p>`;
+            case 'byline':
+                return `<p><strong>${block.name}</strong><br><em>${block.position}</em></p>`;
+            case 'no_data':
+                return `<p><strong>${labels.no_data_title}</strong></p><p>${labels.no_data_suggest}</p>`
+                    + `<ul>${labels.no_data_items.map(i => `<li>${i}</li>`).join('')}</ul>`;
+            case 'insight':
+                return `<hr style="${RULE_STYLE}">\n<p style="margin:12px 0 8px;"><strong>${labels.analysis_insights}:</strong></p>\n`
+                    + `<div style="${INSIGHT_STYLE}">${block.html}</div>`;
+            case 'html':
+                return block.html;
+            case 'attribution':
+                return `\n${block.text}`;
+            default:
+                console.warn('[VSK] Unknown answer block', block.type);
+                return '';
+        }
+    }
+
+    // Answer string for a /api/chat response, whichever format it came in
+    window.renderAnswerPayload = async function(data) {
+        if (!data.blocks) return data.answer;
+        const labels = await loadLabels(data.language || 'en');
+        let previous = null;
+        return data.blocks.map(block => {
+            const html = renderBlock(block, labels, previous === null || previous === 'heading');
+            previous = block.type;
+            return html;
+        }).join('\n');
+    };
+
+    // Insight generated after the answer (insight.status 'pending'): polls its job
+    // with a growing delay; resolves to its markup, or null when there is none
+    window.fetchPendingInsight = async function(data) {
+        if (!data.insight || data.insight.status !== 'pending' || !data.insight.job) return null;
+        const url = `${API_BASE}/api/chat/insight/${encodeURIComponent(data.insight.job)}?response_format=json`;
+        let delay = 1000;
+        const deadline = Date.now() + 90000;
+        while (Date.now() < deadline) {
+            await new Promise(resolve => setTimeout(resolve, delay));
+            delay = Math.min(delay * 1.5, 5000);
+            try {
+                const response = await fetch(url);
+                if (!response.ok) return null;
+                const insight = await response.json();
+                if (insight.status === 'pending') continue;
+                return insight.blocks && insight.blocks.length ? renderAnswerPayload(insight) : null;
+            } catch (err) {
+                console.warn('[VSK] Insight unavailable', err);
+                return null;
+            }
+        }
+        return null;
+    };
+})();
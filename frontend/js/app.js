@@ -1177,6 +1177,8 @@ style.textContent = `
 `;
 document.head.appendChild(style);
 
+let askSequence = 0;
+
 async function askQuestion() {
     const queryEl = document.getElementById('chatQuery');
     if (!queryEl) return;
@@ -1188,6 +1190,7 @@ async function askQuestion() {
     const sourcesElement = document.getElementById('chatSources');
     const modeElement = document.getElementById('responseMode');
 
+    const asked = ++askSequence;
     if (answerElement) answerElement.textContent = 'Analyzing your question...';
     if (sourcesElement) sourcesElement.textContent = '';
     if (modeElement) modeElement.textContent = '';
@@ -1196,15 +1199,16 @@ async function askQuestion() {
         const response = await fetch(`${API_BASE}/api/chat`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ query, language: 'en' })
+            body: JSON.stringify({ query, language: 'en', response_format: 'json' })
         });
 
         if (!response.ok) throw new Error('Failed to get response');
 
         const data = await response.json();
+        const answer = await renderAnswerPayload(data);
 
         if (answerElement) {
-            const rendered = renderResponseHTML(data.answer);
+            const rendered = renderResponseHTML(answer);
             answerElement.innerHTML = rendered;
             answerElement.style.whiteSpace = 'normal';
             answerElement.style.overflowX = 'auto';
@@ -1217,6 +1221,13 @@ async function askQuestion() {
                 ? `Sources: ${data.sources.join(', ')}`
                 : 'Sources: Newsletter data from April 2025 - January 2026';
         }
+
+        const insight = await fetchPendingInsight(data);
+        if (insight && answerElement && asked === askSequence) {
+            answerElement.insertAdjacentHTML('beforeend', renderResponseHTML(insight));
+            enhanceInteractiveTables(answerElement);
+            if (modeElement) modeElement.textContent = 'HYBRID';
+        }
     } catch (error) {
         console.error('Error asking question:', error);
         if (answerElement) answerElement.textContent = 'Unable to process your question at this time. Please try again.';
@@ -144,13 +144,19 @@ window.initializeChatWidget = function() {
             const response = await fetch(`${API_BASE}/api/chat`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ query: message, language: chatLanguage || 'en' })
+                body: JSON.stringify({ query: message, language: chatLanguage || 'en', response_format: 'json' })
             });
             if (!response.ok) throw new Error('Failed');
             const data = await response.json();
+            const answer = await renderAnswerPayload(data);
             typingIndicator.remove();
-            addChatMessage(data.answer, 'bot');
+            addChatMessage(answer, 'bot');
             chatMessages.scrollTop = chatMessages.scrollHeight;
+            fetchPendingInsight(data).then(insight => {
+                if (!insight) return;
+                addChatMessage(insight, 'bot');
+                chatMessages.scrollTop = chatMessages.scrollHeight;
+            });
         } catch (err) {
             console.error('Chat error:', err);
             typingIndicator.remove();
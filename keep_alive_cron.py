@@ -4,18 +4,59 @@ Render Cron Job - Keep VSK Dashboard Alive
 ===========================================
 
 This script runs every 10 minutes via Render Cron Jobs to prevent
-the web service from spinning down on the free tier.
+the web service from spinning down on the free tier. Each ping also makes
+the service warm itself up (index, memory-mapped pages, top questions,
+Ollama model); the report shows whether it had gone cold.
 
 Environment Variables:
     SERVICE_URL: The URL of the web service to keep alive
+    WAKE_TIMEOUT: Seconds to wait for a cold service to become ready (default 120)
 """
 
 import os
 import sys
+import time
 import requests
 from datetime import datetime
 
 
+def print_warmup(report):
+    """Print the warm-up report returned by /api/keep-alive"""
+    if not report:
+        print(f"   Warm-up: not reported")
+        return
+    if report.get("error"):
+        print(f"   ❌ Warm-up failed: {report['error']}")
+        return
+    state = "🥶 COLD" if report.get("cold") else "🔥 WARM"
+    durations = ", ".join(f"{step} {ms:.0f} ms" for step, ms in report.get("durations_ms", {}).items())
+    print(f"   Warm-up: {state} in {report.get('total_ms', 0):.0f} ms ({durations})")
+    if report.get("index_cold"):
+        print(f"   Index was rebuilt (service had restarted)")
+    if report.get("model") == "pending":
+        print(f"   Ollama model loading in the background; timings on the next ping")
+    elif report.get("model_cold"):
+        print(f"   Ollama model was loaded ({report['model']['load_ms']:.0f} ms)")
+    print(f"   Top questions warmed: {report.get('queries', 0)}, snapshot bytes read: {report.get('pages_bytes', 0)}")
+
+
+def wait_until_ready(service_url, timeout):
+    """Poll /api/ready with backoff until the index is built or ``timeout`` passes"""
+    deadline = time.monotonic() + timeout
+    delay = 2
+    while time.monotonic() < deadline:
+        try:
+            response = requests.get(f"{service_url}/api/ready", timeout=10)
+            if response.status_code == 200:
+                return True
+            print(f"   ⏳ Not ready yet ({response.json().get('rag_state', 'unknown')}), retrying in {delay}s")
+        except requests.exceptions.RequestException:
+            print(f"   ⏳ No answer yet, retrying in {delay}s")
+        time.sleep(min(delay, max(0, deadline - time.monotonic())))
+        delay = min(delay * 2, 30)
+    return False
+
+
 def ping_service():
     """Ping the service to keep it alive"""
     service_url = os.getenv("SERVICE_URL", "https://vsk-newsletter.in")
@@ -42,6 +83,7 @@ def ping_service():
             print(f"   Uptime: {data.get('uptime_seconds', 'N/A')} seconds")
             print(f"   Chunks: {data.get('chunks_loaded', 'N/A')}")
             print(f"   Mode: {data.get('mode', 'N/A')}")
+            print_warmup(data.get("warmup"))
             return 0
         else:
             print(f"⚠️  WARNING - Received HTTP {response.status_code}")
@@ -50,17 +92,19 @@ def ping_service():
 
     except requests.exceptions.Timeout:
         print(f"⏱️  TIMEOUT - Service is waking up (this is normal after sleep)")
-        print(f"   The service will be ready in ~30 seconds")
 
-        # Try one more time after waiting
-        print(f"\n🔄 Retrying after 30 seconds...")
-        import time
-        time.sleep(30)
+        # Wait for readiness instead of a fixed sleep, then ping again to warm up
+        wake_timeout = int(os.getenv("WAKE_TIMEOUT", "120"))
+        print(f"\n🔄 Waiting up to {wake_timeout}s for the service to become ready...")
+        if not wait_until_ready(service_url, wake_timeout):
+            print(f"❌ ERROR - Service not ready after {wake_timeout}s")
+            return 1
 
         try:
             response = requests.get(keep_alive_url, timeout=60)
             if response.status_code == 200:
                 print(f"✅ SUCCESS - Service woke up successfully")
+                print_warmup(response.json().get("warmup"))
                 return 0
             else:
                 print(f"⚠️  WARNING - Retry returned HTTP {response.status_code}")
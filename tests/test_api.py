@@ -1,3 +1,5 @@
+import re
+
 from fastapi.testclient import TestClient
 
 from backend.main import app
@@ -10,7 +12,17 @@ def test_health():
     res = client.get('/api/health')
     assert res.status_code == 200
     data = res.json()
-    assert data['rag_initialized'] is True
+    assert data['ready'] is True
+    assert data['rag_state'] in ('cold', 'warming', 'ready')
+
+
+def test_ready_after_first_data_request():
+    # Data routes build the index on demand when the lifespan warm-up has not run
+    client.get('/api/newsletter/months')
+    res = client.get('/api/ready')
+    assert res.status_code == 200
+    assert res.json()['ready'] is True
+    assert client.get('/api/health').json()['rag_initialized'] is True
 
 
 def test_chat_rag_only_response_structure():
@@ -71,3 +83,79 @@ def test_newsletter_month_detail():
     assert data['month'] == 'April 2025'
     assert 'schools' in data
     assert 'teachers' in data
+
+
+def test_chat_json_format_uses_label_keys():
+    res = client.post('/api/chat', json={'query': 'What happened in April 2025?', 'response_format': 'json'})
+    assert res.status_code == 200
+    data = res.json()
+    assert data['format'] == 'json'
+    heading, section = data['blocks'][:2]
+    assert heading == {'type': 'heading', 'label': 'education_report', 'prefix': 'April 2025'}
+    assert section == {'type': 'section', 'label': 'key_statistics'}
+
+    labels = client.get('/api/chat/labels', params={'language': 'hi'}).json()
+    assert labels['language'] == 'hi'
+    assert labels['labels']['key_statistics'] == 'मुख्य सांख्यिकी'
+    assert client.get('/api/chat/labels', params={'language': 'fr'}).json()['language'] == 'en'
+
+
+def test_static_assets_are_fingerprinted_and_precompressed():
+    index = client.get('/')
+    assert index.headers['cache-control'] == 'no-cache'
+    hashed = re.search(r'src="(js/app\.[0-9a-f]{10}\.js)"', index.text).group(1)
+
+    res = client.get(f'/{hashed}', headers={'Accept-Encoding': 'gzip'})
+    assert res.status_code == 200
+    assert res.headers['cache-control'] == 'public, max-age=31536000, immutable'
+    assert res.headers['content-encoding'] == 'gzip'
+    assert int(res.headers['content-length']) < len(res.content)  # decoded by the client
+    assert res.content == client.get('/js/app.js', headers={'Accept-Encoding': 'identity'}).content
+
+    plain = client.get('/js/app.js', headers={'Accept-Encoding': 'identity'})
+    assert plain.headers['cache-control'] == 'no-cache'
+    assert 'content-encoding' not in plain.headers
+    etag = plain.headers['etag']
+    assert client.get('/js/app.js', headers={'Accept-Encoding': 'identity', 'If-None-Match': etag}).status_code == 304
+    assert client.get('/js/missing.js').status_code == 404
+
+
+def test_chat_json_compressed_above_threshold():
+    res = client.post('/api/chat', json={'query': 'What happened in April 2025?'}, headers={'Accept-Encoding': 'gzip'})
+    assert res.headers['content-encoding'] == 'gzip'
+    plain = client.post('/api/chat', json={'query': 'What happened in April 2025?'}, headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in plain.headers
+
+
+def test_keep_alive_runs_warm_up():
+    first = client.get('/api/keep-alive').json()['warmup']
+    assert set(first['durations_ms']) == {'index', 'pages', 'queries'}
+    assert first['queries'] > 0 and first['model'] is None
+    second = client.get('/api/keep-alive').json()['warmup']
+    assert second['cold'] is False and second['index_cold'] is False
+
+
+def test_keep_alive_loads_the_model_in_the_background():
+    import threading
+
+    from backend.main import chat_handler, rag_system
+    from backend.warmup import Warmup
+
+    class SlowLLM:
+        enabled = True
+        loaded = threading.Event()
+
+        def preload(self):
+            self.loaded.wait(5)
+            return {'load_ms': 40_000.0, 'total_ms': 40_100.0}
+
+    llm = SlowLLM()
+    warmup = Warmup(rag_system, chat_handler, llm, max_queries=1)
+    first = warmup.run()
+    assert first['model'] == 'pending' and first['model_cold'] is False
+    # Still loading: the next ping does not start a second load
+    assert warmup.run()['model'] == 'pending'
+    llm.loaded.set()
+    warmup._model_thread.join(5)
+    third = warmup.run()
+    assert third['model']['load_ms'] == 40_000.0 and third['model_cold'] is True
@@ -0,0 +1,397 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.api.chat_handler import ChatHandler, ChatRequest, _search_stage
+from backend.api.executor import StageExecutor
+from backend.llm.insight_policy import InsightPolicy
+from backend.llm.llm_handler import LLMHandler
+from backend.main import DATA_PATH
+from backend.rag.rag_system import RagSystem
+
+
+@pytest.fixture(scope='module')
+def rag():
+    system = RagSystem(str(DATA_PATH), index_dir='')
+    system.ensure_initialized()
+    return system
+
+
+def _ask(handler, query):
+    return asyncio.run(handler.chat(ChatRequest(query=query)))
+
+
+def test_executor_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        StageExecutor(mode='fibers')
+
+
+@pytest.mark.parametrize('mode', ['thread', 'process'])
+def test_offloaded_stages_match_inline(rag, mode):
+    class CannedLLM:
+        def summarize(self, question, context, language='en'):
+            return f'**Analysis:** {question} ' + 'Enrollment rose across *States* and UTs. ' * 8
+
+    # The insight cleanup runs in the stage pool too
+    always = InsightPolicy('always')
+    inline = ChatHandler(rag, CannedLLM(), StageExecutor(mode='inline'), insight_policy=always)
+    executor = StageExecutor(mode=mode, workers=2, data_path=str(DATA_PATH))
+    offloaded = ChatHandler(rag, CannedLLM(), executor, insight_policy=always)
+    try:
+        if mode == 'process':
+            asyncio.run(executor.prewarm())
+            assert executor.warm_workers == 2
+        for query in ['What happened in April 2025?', 'Who leads RVSK?', 'teacher training outcomes']:
+            assert _ask(offloaded, query) == _ask(inline, query)
+        # Only (chunk id, score) pairs cross the process boundary
+        pairs = asyncio.run(executor.run(offloaded._search, 'Who leads RVSK?', 5, worker_fn=_search_stage))
+        assert pairs == inline._search('Who leads RVSK?', 5) and all(type(i) is int for i, _ in pairs)
+    finally:
+        executor.shutdown()
+
+
+def _legacy_detect_language(query):
+    # Character-loop detector the compiled one replaced, kept as an oracle
+    from backend.rag.text_analysis import HINGLISH_KEYWORDS
+
+    devanagari_count = sum(1 for ch in query if '\u0900' <= ch <= '\u097F')
+    latin_count = sum(1 for ch in query if 'a' <= ch.lower() <= 'z')
+    if devanagari_count > 0 and devanagari_count >= latin_count * 0.3:
+        return 'hi'
+    words = query.lower().split()
+    hinglish_hits = sum(1 for w in words if w in HINGLISH_KEYWORDS)
+    if len(words) > 0 and hinglish_hits / len(words) >= 0.25:
+        return 'hi'
+    return 'en'
+
+
+@pytest.mark.parametrize('query', [
+    'What happened in April 2025?', 'अप्रैल 2025 में क्या हुआ?', 'kerala mein upasthiti kitni hai',
+    'APAAR IDs ka growth batao', 'RVSK नेतृत्व about the leadership team of the kendra', '', '2025 9.8%',
+])
+def test_detect_language_matches_legacy_detector(query):
+    from backend.rag.text_analysis import detect_language
+
+    language, confidence = detect_language(query)
+    assert language == _legacy_detect_language(query)
+    assert 0.0 <= confidence <= 1.0
+
+
+def test_detect_language_confidence_and_long_queries():
+    import time
+
+    from backend.rag.text_analysis import detect_language
+
+    assert detect_language('केरल में उपस्थिति') == ('hi', 1.0)
+    assert detect_language('Kerala attendance in January') == ('en', 1.0)
+    pasted = 'Attendance figures for Kerala schools were reported monthly. ' * 20000
+    started = time.perf_counter()
+    assert detect_language(pasted)[0] == 'en'
+    assert time.perf_counter() - started < 0.005
+
+
+def test_language_is_logged_only_when_uncertain(rag, capsys):
+    handler = ChatHandler(rag, None)
+    _ask(handler, 'What happened in April 2025?')
+    assert 'Query language' not in capsys.readouterr().out
+    _ask(handler, 'how many schools hai')
+    assert 'low confidence' in capsys.readouterr().out
+
+
+def test_tables_use_css_classes(rag):
+    from backend.llm.table_renderer import render_table
+
+    assert render_table(['A', 'B'], [['x', 'y']], col_styles=[{'bold': True, 'color': '#003d82'}, {'color': '#123456'}]) == (
+        '<table class="vsk-table"><thead><tr><th>A</th><th>B</th></tr></thead>'
+        '<tbody><tr><td class="vsk-b vsk-blue">x</td><td style="color:#123456;">y</td></tr></tbody></table>'
+    )
+    answer = _ask(ChatHandler(rag, LLMHandler()), 'What happened in April 2025?')['answer']
+    assert 'class="vsk-table"' in answer
+    assert '<td style=' not in answer and '<th style=' not in answer
+
+
+@pytest.mark.parametrize('query, intent', [
+    ('dashboard features', 'technical'), ('attendance in Kerala', 'state_engagement'),
+    ('capacity building workshop', 'rvsk'),
+])
+def test_structured_answer_follows_the_boosted_ranking(rag, query, intent):
+    # The default ranker applies the chunk-type boosts; the top result picks the answer
+    assert rag.ranker == 'hybrid'
+    results, found, _ = ChatHandler(rag, None).structured_answer(query, 'en')
+    assert found == intent == results[0]['metadata']['type']
+
+
+def test_structured_lookups_search_their_shard(rag, monkeypatch):
+    filters = []
+    search = rag.search
+    monkeypatch.setattr(rag, 'search', lambda *args, **kwargs: filters.append(kwargs['filters']) or search(*args, **kwargs))
+    handler = ChatHandler(rag, None)
+    assert handler.structured_answer('What happened in April 2025?', 'en')[1] == 'month:April 2025'
+    assert handler.structured_answer('May I know the top states?', 'en')[1] == 'state_engagement'
+    assert filters == [{'type': 'month', 'month': 'April 2025'}, {'type': 'state_engagement'}]
+
+
+@pytest.mark.parametrize('query', [
+    'What happened in April 2025?', 'RVSK के बारे में बताइए', 'DPDP compliance', 'teacher training outcomes', '',
+])
+def test_json_answer_renders_to_html_answer(rag, query):
+    import json
+
+    from backend.llm.answer_blocks import render_blocks
+
+    handler = ChatHandler(rag, LLMHandler())
+    html = _ask(handler, query)
+    data = asyncio.run(handler.chat(ChatRequest(query=query, response_format='json')))
+    assert data['format'] == 'json' and 'answer' not in data
+    assert (data['mode'], data['sources']) == (html['mode'], html['sources'])
+    assert render_blocks(data['blocks'], data['language']) == html['answer']
+    assert len(json.dumps(data['blocks'], ensure_ascii=False)) < len(html['answer'])
+
+
+@pytest.mark.parametrize('query', [
+    'What happened in April 2025?', 'Who leads RVSK?', 'What is the DPDP Act?', 'What is the 6A framework?',
+    'top performing states', 'Tell me about RVSK progress', 'dashboard features',
+])
+def test_json_answer_is_the_same_in_every_language(rag, query):
+    from backend.llm.answer_blocks import render_blocks
+
+    handler = ChatHandler(rag, LLMHandler())
+    en, hi = (asyncio.run(handler.chat(ChatRequest(query=query, language=lang, response_format='json')))
+              for lang in ('en', 'hi'))
+    assert (en.pop('language'), hi.pop('language')) == ('en', 'hi')
+    assert en == hi
+    # Only the rendering is translated
+    rendered = render_blocks(hi['blocks'], 'hi')
+    for english in ('Total States / UTs', 'Schools Connected', 'Digital Readiness', 'Feature', 'Data Minimization'):
+        assert english not in rendered
+
+
+def test_rephrasings_reuse_cached_insight(rag):
+    from backend.cache.answer_cache import AnswerCache
+
+    class CountingLLM:
+        calls = 0
+
+        def summarize(self, question, context, language='en'):
+            self.calls += 1
+            return f'<p>January 2026 saw steady growth in APAAR registrations across States. {"Details follow. " * 12}</p>'
+
+    llm = CountingLLM()
+    handler = ChatHandler(rag, llm, answer_cache=AnswerCache(max_entries=8, ttl=0),
+                          insight_policy=InsightPolicy('always'))
+    answers = [_ask(handler, q) for q in ['Jan 2026 stats', 'January 2026 statistics', 'What happened in January 2026?']]
+    assert llm.calls == 1
+    assert all(a['mode'] == 'hybrid' and 'steady growth' in a['answer'] for a in answers)
+    assert answers[0]['answer'] == answers[1]['answer'] == answers[2]['answer']
+
+    # Another intent, language or set of chunks is a separate entry
+    _ask(handler, 'जनवरी 2026 के आंकड़े')
+    _ask(handler, 'Who leads RVSK?')
+    assert llm.calls == 3
+    assert handler.answer_cache.stats()['hits'] == 2
+
+
+def test_pregenerated_insights_served_without_llm(rag, tmp_path):
+    from backend.cache.pregenerated import PregeneratedInsights, write_insights
+    from backend.pregenerate import canonical_questions, generate, plan
+
+    class OfflineLLM:
+        def summarize(self, question, context, language='en'):
+            return f'<p>Pre-generated overview for {question} {"with supporting figures. " * 10}</p>'
+
+    class NoLLM:
+        def summarize(self, *args, **kwargs):
+            raise AssertionError('LLM called for a pre-generated question')
+
+    questions = canonical_questions(rag)
+    assert 'What happened in April 2025?' in questions and 'Show the learning outcomes KPIs' in questions
+    jobs = plan(ChatHandler(rag, OfflineLLM()), questions, ['en'])
+    assert len(jobs) <= len(questions)
+    path = tmp_path / 'insights.json'
+    write_insights(path, rag.data_version, 'test', generate(OfflineLLM(), jobs, workers=4))
+
+    handler = ChatHandler(rag, NoLLM(), pregenerated=PregeneratedInsights(path))
+    answer = _ask(handler, 'What happened in April 2025?')
+    assert answer['mode'] == 'hybrid' and 'Pre-generated overview' in answer['answer']
+
+    # Insights generated for other data are not served
+    write_insights(path, 'other-version', 'test', generate(OfflineLLM(), jobs, workers=4))
+    handler = ChatHandler(rag, LLMHandler(), pregenerated=PregeneratedInsights(path))
+    assert _ask(handler, 'What happened in April 2025?')['mode'] == 'rag_only'
+
+
+def _read_cache(path, keys):
+    from backend.cache.disk_cache import DiskCache
+
+    cache = DiskCache(path)
+    return [cache.get('answers', key) for key in keys for _ in range(20)]
+
+
+def test_persistent_cache_survives_restart_and_evicts(rag, tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+
+    from backend.cache.answer_cache import AnswerCache
+    from backend.cache.disk_cache import DiskCache
+
+    class CountingLLM:
+        calls = 0
+
+        def summarize(self, question, context, language='en'):
+            self.calls += 1
+            return f'<p>Leadership of RVSK is shared by NCERT and CIET. {"More context follows. " * 10}</p>'
+
+    db = tmp_path / 'cache.sqlite3'
+    before, after = CountingLLM(), CountingLLM()
+    always = InsightPolicy('always')
+    first = _ask(ChatHandler(rag, before, answer_cache=AnswerCache(store=DiskCache(db)), insight_policy=always),
+                 'Who leads RVSK?')
+    # A new process after a night's spin-down: empty memory tier, same database,
+    # entries older than the memory TTL
+    import sqlite3
+    with sqlite3.connect(db) as conn:
+        conn.execute('UPDATE entries SET created = created - 86400, accessed = accessed - 86400')
+    restarted = ChatHandler(rag, after, answer_cache=AnswerCache(ttl=3600, store=DiskCache(db)), insight_policy=always)
+    assert _ask(restarted, 'Who leads RVSK?')['answer'] == first['answer']
+    assert (before.calls, after.calls, restarted.answer_cache.disk_hits) == (1, 0, 1)
+
+    # Several workers read while this one writes
+    store = DiskCache(db, max_bytes=20_000)
+    keys = [f'k{i}' for i in range(40)]
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        readers = [pool.submit(_read_cache, db, keys) for _ in range(3)]
+        for i, key in enumerate(keys):
+            store.put('answers', key, f'{i:02d}' * 500, 'v1')
+        for reader in readers:
+            assert all(value is None or value == value[:2] * 500 for value in reader.result())
+
+    # Size bound drops the least recently used entries
+    sizes = store.stats()['namespaces']['answers']
+    assert sizes['bytes'] <= 20_000
+    assert store.get('answers', keys[-1]) is not None and store.get('answers', keys[0]) is None
+
+    # Entries for other data versions are dropped on invalidation
+    assert store.invalidate('answers', 'v2') == sizes['entries']
+    assert store.get('answers', keys[-1]) is None
+
+
+def test_insight_policy_skips_llm_for_complete_answers(rag):
+    class CountingLLM:
+        calls = 0
+        gate = threading.Event()
+
+        def summarize(self, question, context, language='en'):
+            self.calls += 1
+            self.gate.wait(5)
+            return f'<p>April and May 2025 differ mainly in APAAR registrations. {"Details follow. " * 12}</p>'
+
+    llm = CountingLLM()
+    handler = ChatHandler(rag, llm)
+    for query in ['What happened in April 2025?', 'Who leads RVSK?', 'What is the DPDP Act?', 'What is the 6A framework?']:
+        answer = _ask(handler, query)
+        assert answer['mode'] == 'rag_only' and answer['insight']['status'] == 'skipped', query
+    assert llm.calls == 0
+
+    # Comparisons across months are not covered by one month's table: the
+    # answer goes out at once and the insight follows under a job id
+    request = ChatRequest(query='Compare April 2025 and May 2025', response_format='json')
+    answer = asyncio.run(handler.chat(request))
+    assert answer['insight']['status'] == 'pending' and answer['insight']['score'] < 0.75
+    assert answer['mode'] == 'rag_only' and any(block['type'] == 'table' for block in answer['blocks'])
+    job_id = answer['insight']['job']
+    assert asyncio.run(handler.chat(request))['insight']['job'] == job_id
+    llm.gate.set()
+
+    deadline = time.monotonic() + 5
+    while (follow_up := asyncio.run(handler.insight(job_id)))['status'] == 'pending' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert follow_up['status'] == 'done' and follow_up['blocks'][0]['type'] == 'insight'
+    assert llm.calls == 1
+    # Once generated, the insight is cached and included directly
+    assert _ask(handler, 'Compare April 2025 and May 2025')['insight']['status'] == 'included'
+
+    # Waiting for the LLM remains available
+    waiting = ChatHandler(rag, llm, insight_policy=InsightPolicy('wait'))
+    answer = _ask(waiting, 'Why did attendance change between June and July 2025?')
+    assert answer['insight']['status'] == 'included' and answer['mode'] == 'hybrid'
+    assert llm.calls == 2
+    assert waiting.insight_policy.stats()['decisions'] == {'call': 1, 'skip': 0, 'defer': 0}
+
+
+def test_insight_jobs_expire_and_stay_bounded():
+    from fastapi import HTTPException
+
+    from backend.api.insight_jobs import InsightJobs
+
+    release = threading.Event()
+    jobs = InsightJobs(workers=1, max_pending=2, max_jobs=3, ttl=0.2)
+    blocked = jobs.submit('a', lambda: release.wait() and '<p>a</p>')
+    time.sleep(0.05)  # picked up by the worker
+    queued = [jobs.submit(key, lambda: '<p>queued</p>') for key in 'bc']
+    assert None not in queued and jobs.submit('d', lambda: '<p>d</p>') is None
+    assert jobs.stats()['rejected'] == 1 and jobs.get(blocked)['status'] == 'running'
+
+    time.sleep(0.25)  # the queued jobs outlive the TTL before a worker is free
+    release.set()
+    deadline = time.monotonic() + 5
+    while jobs.stats()['queued'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert jobs.get(blocked)['status'] == 'done'
+    assert jobs.stats()['expired'] == 2
+
+    # Finished jobs are forgotten after the TTL and capped at max_jobs
+    time.sleep(0.25)
+    assert jobs.get(blocked) is None and jobs.stats()['jobs'] == {}
+    for key in 'efghi':
+        job_id = jobs.submit(key, lambda: None)
+        while jobs.get(job_id)['status'] != 'unavailable':
+            time.sleep(0.005)
+    assert sum(jobs.stats()['jobs'].values()) == 3
+    assert (jobs.stats()['done'], jobs.stats()['unavailable']) == (1, 5)
+    jobs.shutdown()
+
+    handler = ChatHandler(None, None, insight_jobs=jobs)
+    with pytest.raises(HTTPException):
+        asyncio.run(handler.insight('unknown'))
+
+
+def test_insight_jobs_shared_between_workers(rag, tmp_path, monkeypatch):
+    from backend.api.insight_jobs import InsightJobs
+    from backend.cache.answer_cache import AnswerCache
+    from backend.cache.disk_cache import DiskCache
+
+    monkeypatch.setenv('WEB_CONCURRENCY', '2')
+    db = tmp_path / 'cache.sqlite3'
+    running, polling = InsightJobs(workers=1, store=DiskCache(db)), InsightJobs(workers=1, store=DiskCache(db))
+    job_id = running.submit('k', lambda: '<p>shared</p>')
+    deadline = time.monotonic() + 5
+    while (job := polling.get(job_id))['status'] != 'done' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job['insight'] == '<p>shared</p>' and polling.get('unknown') is None
+    assert running.shared and polling.shared
+    running.shutdown()
+
+    # Without a shared store, a poll could reach a worker that never saw the job
+    handler = ChatHandler(rag, LLMHandler(), answer_cache=AnswerCache(store=None))
+    assert not handler.insight_jobs.shared and handler.insight_policy.mode == 'wait'
+
+
+def test_cached_insight_lookup_runs_off_the_event_loop(rag, tmp_path):
+    from backend.cache.pregenerated import PregeneratedInsights
+
+    class RecordingInsights(PregeneratedInsights):
+        threads = []
+
+        def get(self, key, data_version):
+            self.threads.append(threading.current_thread())
+            return super().get(key, data_version)
+
+    insights = RecordingInsights(tmp_path / 'missing.json')
+    executor = StageExecutor(mode='thread', workers=1)
+    try:
+        _ask(ChatHandler(rag, LLMHandler(), executor, pregenerated=insights), 'What happened in April 2025?')
+    finally:
+        executor.shutdown()
+    assert insights.threads and threading.main_thread() not in insights.threads
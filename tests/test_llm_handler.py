@@ -1,3 +1,5 @@
+import time
+
 from backend.llm.llm_handler import LLMHandler
 
 
@@ -68,3 +70,244 @@ def test_llm_status_enabled(monkeypatch):
     status = handler.status()
     assert status['enabled'] is True
     assert status['provider'] == 'ollama'
+
+
+def test_model_residency_keep_alive_pings_and_timings(monkeypatch):
+    from datetime import datetime
+    from zoneinfo import ZoneInfo
+
+    from backend.llm.model_residency import ModelResidency, parse_keep_alive
+
+    monkeypatch.setenv('OLLAMA_URL', 'http://mock-ollama')
+    monkeypatch.setenv('OLLAMA_KEEP_ALIVE', '10m')
+    handler = LLMHandler()
+    sent = []
+
+    class TimedResponse(DummyLongResponse):
+        def json(self):
+            return {**super().json(), 'load_duration': 4_200_000_000, 'prompt_eval_duration': 300_000_000,
+                    'eval_duration': 2_000_000_000, 'total_duration': 6_600_000_000, 'eval_count': 180}
+
+    def fake_post(url, json, timeout):
+        sent.append(json)
+        return TimedResponse()
+
+    monkeypatch.setattr('backend.llm.llm_handler.requests.post', fake_post)
+    handler.summarize('APAAR growth statistics', 'context data here')
+    assert handler.preload()['load_ms'] == 4200
+    assert [body['keep_alive'] for body in sent] == ['10m', '10m']
+    residency = handler.status()['residency']
+    assert (residency['pings'], residency['cold_loads']) == (1, 2)
+    assert residency['recent_average_ms']['eval_ms'] == 2000 and residency['last']['kind'] == 'ping'
+
+    assert parse_keep_alive('1h') == 3600 and parse_keep_alive('300') == 300 and parse_keep_alive('-1') is None
+    residency = ModelResidency(keep_alive='10m', active_hours='8-20', timezone='Asia/Kolkata', idle_grace=3600)
+    noon = datetime(2026, 3, 2, 12, tzinfo=ZoneInfo('Asia/Kolkata')).timestamp()
+    night = datetime(2026, 3, 2, 23, tzinfo=ZoneInfo('Asia/Kolkata')).timestamp()
+    assert residency.should_ping(noon) and not residency.should_ping(night)
+    residency.record({'load_duration': 1_000_000}, kind='ping')
+    assert not residency.should_ping(time.time() + 60)  # just used
+    residency.note_request()
+    assert residency.should_ping(time.time() + 9 * 60)  # recent questions keep it loaded after hours
+
+
+def test_cached_llm_responses_follow_the_data_version(monkeypatch, tmp_path):
+    monkeypatch.setenv('OLLAMA_URL', 'http://mock-ollama')
+    monkeypatch.setenv('CACHE_DB', str(tmp_path / 'cache.sqlite3'))
+    calls = []
+
+    def fake_post(*args, **kwargs):
+        calls.append(kwargs['json'])
+        return DummyLongResponse()
+
+    monkeypatch.setattr('backend.llm.llm_handler.requests.post', fake_post)
+    handler = LLMHandler()
+    handler.set_data_version('v1')
+    first = handler.summarize('APAAR growth statistics', 'context data here')
+    assert handler.summarize('APAAR growth statistics', 'context data here') == first and len(calls) == 1
+    assert 'data_version' not in calls[0]
+
+    # A restarted server on new data neither reuses nor keeps the old response
+    restarted = LLMHandler()
+    restarted.set_data_version('v2')
+    assert 'llm' not in restarted.cache.stats()['namespaces']
+    restarted.summarize('APAAR growth statistics', 'context data here')
+    assert len(calls) == 2
+
+
+def test_generation_profiles_follow_query_type_and_brevity(monkeypatch):
+    monkeypatch.setenv('OLLAMA_URL', 'http://mock-ollama')
+    handler = LLMHandler()
+    sent = []
+
+    class CountedResponse(DummyLongResponse):
+        def json(self):
+            options = sent[-1]['options']
+            return {**super().json(), 'eval_count': options['num_predict'] // 2, 'eval_duration': 10_000_000,
+                    'done_reason': 'stop'}
+
+    def fake_post(url, json, timeout):
+        sent.append(json)
+        return CountedResponse()
+
+    monkeypatch.setattr('backend.llm.llm_handler.requests.post', fake_post)
+    for question in ['Who is the director?', 'Briefly, what is APAAR?', 'Show the state ranking',
+                     'Tell me about the newsletter', 'How many schools in April 2025?']:
+        handler.summarize(question, 'context data here')
+
+    fact, brief, analysis, default, count = (body['options'] for body in sent)
+    assert (fact['num_predict'], brief['num_predict'], default['num_predict']) == (384, 256, 1024)
+    assert count['num_predict'] == 384  # a single figure, not a table
+    assert analysis['num_predict'] == 1536  # state tables get more room
+    assert '**Data Source:**' in brief['stop'] and '**Data Source:**' not in default['stop']
+    # The window holds the whole prompt and the answer, in 512-token steps
+    assert all(o['num_ctx'] % 512 == 0 and o['num_ctx'] * 3 >= len(b['prompt']) for o, b in zip((fact, brief), sent))
+    stats = handler.status()['generation_profiles']
+    assert stats['brief'] == {'requests': 1, 'avg_tokens': 128, 'avg_eval_ms': 10.0, 'cut_off': 0}
+    assert set(stats) == {'fact', 'brief', 'analysis', 'default'}
+
+
+def _legacy_sanitize_html(text):
+    # Regex sanitizer the streaming one replaced, kept as an oracle
+    import re
+
+    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<iframe[^>]*>.*?</iframe>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<(object|embed)[^>]*>.*?</\1>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'\s+on\w+\s*=\s*["\'][^"\']*["\']', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s+on\w+\s*=\s*\S+', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'href\s*=\s*["\']javascript:[^"\']*["\']', 'href="#"', text, flags=re.IGNORECASE)
+    text = re.sub(r'src\s*=\s*["\']javascript:[^"\']*["\']', '', text, flags=re.IGNORECASE)
+    return text
+
+
+def _fuzz_document(rng):
+    # Well-formed LLM-style HTML: the inputs the regex sanitizer handles correctly
+    words = ['APAAR', '95.8%', 'उपस्थिति', 'states', '&amp;', 'a < b', '\n', '36', 'Kerala', ' ']
+    attrs = ['class="vsk"', "colspan='2'", 'style="color:#003d82"', 'onclick="alert(1)"',
+             'ONERROR = "x()"', 'title="t"', 'onmouseover=\'steal()\'']
+    parts = []
+    for _ in range(rng.randint(1, 40)):
+        kind = rng.random()
+        if kind < 0.4:
+            parts.append(rng.choice(words))
+        elif kind < 0.75:
+            tag = rng.choice(['td', 'TD', 'tr', 'p', 'strong', 'table', 'li', 'span'])
+            attr = ''.join(' ' + rng.choice(attrs) for _ in range(rng.randint(0, 3)))
+            parts.append(f'<{tag}{attr}>{rng.choice(words)}</{tag}>')
+        elif kind < 0.8:
+            parts.append(rng.choice(['<br>', '<br/>', '<br />', '<hr>']))
+        elif kind < 0.87:
+            href = rng.choice(['"javascript:alert(1)"', "'JavaScript:void(0)'", '"/api/health"'])
+            parts.append(f'<a href={href}>link</a>')
+        else:
+            tag = rng.choice(['script', 'SCRIPT', 'iframe', 'object', 'embed'])
+            parts.append(f'<{tag} src="x">{rng.choice(words)}<td onclick="x">in</td></{tag}>')
+    return ''.join(parts)
+
+
+def _feed_in_chunks(text, rng):
+    from backend.llm.html_sanitizer import HtmlSanitizer
+
+    sanitizer = HtmlSanitizer()
+    out, i = [], 0
+    while i < len(text):
+        step = rng.randint(1, 12)
+        out.append(sanitizer.feed(text[i:i + step]))
+        i += step
+    return ''.join(out) + sanitizer.close()
+
+
+def test_streaming_sanitizer_matches_regex_sanitizer():
+    import random
+    import re
+
+    from backend.llm.html_sanitizer import sanitize_html
+
+    rng = random.Random(41)
+    for _ in range(2000):
+        doc = _fuzz_document(rng)
+        # The only intended difference: a literal '<' is escaped
+        expected = re.sub(r'<(?!/?[A-Za-z])', '&lt;', _legacy_sanitize_html(doc))
+        assert sanitize_html(doc) == expected, doc
+        assert _feed_in_chunks(doc, rng) == expected, doc
+
+
+def test_streaming_sanitizer_on_malformed_input():
+    import random
+    import time
+    from html.parser import HTMLParser
+
+    from backend.llm.html_sanitizer import ALLOWED_ATTRIBUTES, ALLOWED_TAGS, MAX_TAG_LENGTH, HtmlSanitizer, sanitize_html
+
+    class AllowListCheck(HTMLParser):
+        # How a browser-like tokenizer reads the output
+        def handle_starttag(self, tag, attrs):
+            assert tag in ALLOWED_TAGS
+            for name, value in attrs:
+                assert name in ALLOWED_ATTRIBUTES
+                assert not (name == 'href' and (value or '').strip().lower().startswith('javascript:'))
+
+        def handle_endtag(self, tag):
+            assert tag in ALLOWED_TAGS
+
+    rng = random.Random(7)
+    alphabet = ['<', '>', '/', '"', "'", '=', ' ', '\n', 'script', 'SCRIPT', 'iframe', 'td', 'a href', 'on', 'click',
+                'img', '!--', '-->', '</', 'x', 'javascript:']
+    for _ in range(3000):
+        doc = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 80)))
+        out = sanitize_html(doc)
+        assert _feed_in_chunks(doc, rng) == out
+        checker = AllowListCheck()
+        checker.feed(out)
+        checker.close()
+
+    # Unclosed script and an endless tag: linear time, bounded buffers
+    sanitizer = HtmlSanitizer()
+    started = time.perf_counter()
+    assert sanitizer.feed('<script>' * 20000) == ''
+    assert sanitizer.feed('<td class="' + 'x' * 100000) == ''
+    assert len(sanitizer._buf) <= MAX_TAG_LENGTH and len(sanitizer._tail) < 16
+    assert time.perf_counter() - started < 1.0
+    assert sanitize_html('<p>attendance < 90% <!-- note --></p>') == '<p>attendance &lt; 90% </p>'
+
+
+def test_single_pass_extraction_matches_regex_loops():
+    from benchmarks.extraction import (ANSWER, legacy_detect_statistical_patterns, legacy_extract_bullet_point_data,
+                                       legacy_extract_key_metrics_from_text)
+    from backend.llm.data_formatter import detect_statistical_patterns, extract_key_metrics_from_text
+    from backend.llm.metric_extraction import scan
+    from backend.llm.production_cleaner import intelligent_data_visualization
+
+    answers = [ANSWER, ANSWER * 3, 'Schools 1,000 and teachers 250', 'No figures here.', 'Attendance 91 and Kerala 96%',
+               '- APAAR IDs 120000\n- Attendance 94.5%\nGujarat 90.2% Goa 97%']
+    def digits(metrics):
+        return {name: value.replace(',', '') for name, value in metrics.items()}
+
+    for text in answers:
+        # The old loops re-grouped every number with Western commas; the values are the same
+        assert digits(extract_key_metrics_from_text(text)) == digits(legacy_extract_key_metrics_from_text(text))
+        assert [p['type'] for p in detect_statistical_patterns(text)] == \
+            [p['type'] for p in legacy_detect_statistical_patterns(text)]
+        legacy_bullets = legacy_extract_bullet_point_data(text)
+        extraction = scan(text)
+        assert extraction.bullets_with_metrics == len(legacy_bullets)
+        merged = {}
+        for item in legacy_bullets:
+            merged.update(item['metrics'])
+        # Bullets now also report Enrollment, like the metric table does
+        assert set(extraction.bullet_metrics) - {'Enrollment'} == set(merged)
+
+    table = intelligent_data_visualization(ANSWER, 'APAAR statistics')
+    assert table.count('<table class="vsk-table">') == 1
+    assert '<td class="vsk-blue">Attendance</td><td class="vsk-b">94.2%</td>' in table
+
+
+def test_extraction_keeps_indian_digit_grouping():
+    from backend.llm.data_formatter import extract_key_metrics_from_text
+    from backend.llm.production_cleaner import intelligent_data_visualization
+
+    text = '- Students 14,72,000 enrolled\n- Schools 1,20,500 connected\n- Attendance 94.2%'
+    assert extract_key_metrics_from_text(text) == {'Students': '14,72,000', 'Schools': '1,20,500', 'Attendance': '94.2%'}
+    table = intelligent_data_visualization(text, 'student statistics')
+    assert '14,72,000' in table and '1,472,000' not in table
@@ -0,0 +1,287 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from backend.main import DATA_PATH
+from backend.rag.rag_system import RagSystem
+
+
+def _is_mapped(array):
+    while array is not None and not isinstance(array, np.memmap):
+        array = array.base
+    return array is not None
+
+
+def _attach_and_search(index_dir):
+    rag = RagSystem(str(DATA_PATH), index_dir=index_dir)
+    rag.ensure_initialized()
+    top = rag.search('APAAR registrations', top_k=1)[0]
+    return str(rag.snapshot_path), _is_mapped(rag.chunk_matrix.data), top['source']
+
+
+def test_shared_snapshot_is_built_once_and_memory_mapped(tmp_path):
+    with ProcessPoolExecutor(max_workers=3) as pool:
+        results = list(pool.map(_attach_and_search, [str(tmp_path)] * 3))
+
+    snapshot_paths = {r[0] for r in results}
+    assert len(snapshot_paths) == 1
+    assert all(r[1] for r in results)
+    assert len({r[2] for r in results}) == 1
+    assert [p.name for p in tmp_path.iterdir() if not p.name.startswith('.')] == [
+        snapshot_paths.pop().rsplit('/', 1)[-1]
+    ]
+
+
+def test_shared_snapshot_matches_in_memory_index(tmp_path):
+    local = RagSystem(str(DATA_PATH), index_dir='')
+    local.ensure_initialized()
+    shared = RagSystem(str(DATA_PATH), index_dir=str(tmp_path))
+    shared.ensure_initialized()
+
+    for query in ['April 2025 attendance', 'RVSK leadership', 'DPDP compliance']:
+        a = local.search(query, top_k=3)
+        b = shared.search(query, top_k=3)
+        assert [r['text'] for r in a] == [r['text'] for r in b]
+        assert np.array_equal(local.bm25.scores(query), shared.bm25.scores(query))
+
+    # BM25 postings and chunk texts are mapped, not unpickled into each worker
+    assert all(isinstance(a, np.memmap) for a in shared.bm25.arrays().values())
+    assert isinstance(shared.chunks.text, np.memmap)
+    assert [c['text'] for c in shared.chunks] == [c['text'] for c in local.chunks]
+
+    # Same data, same version; only the mapped snapshot has pages to touch
+    assert local.data_version == shared.data_version
+    assert local.touch_pages() == 0
+    assert shared.touch_pages() >= shared.chunk_matrix.data.nbytes
+
+
+def test_bm25_inverted_index_scores():
+    from backend.rag.bm25 import BM25Index
+
+    index = BM25Index().build(
+        ['apaar ids generated', 'attendance attendance attendance in kerala schools today', 'attendance'],
+        doc_boosts=[1.0, 1.0, 2.0],
+    )
+    scores = index.scores('attendance', boost=False)
+    assert scores[0] == 0
+    # Length normalisation: the short chunk does not lose to the padded one
+    assert scores[2] > 0 and scores[1] > 0
+    assert index.search('attendance', 1)[0][0] == 2
+    assert all(score == 0 for _, score in index.search('अनुपस्थिति', 3))
+
+
+def test_bm25_keeps_devanagari_words_whole():
+    from backend.rag.bm25 import BM25Index
+
+    assert BM25Index().tokenize('उपस्थिति दर 96%') == ['उपस्थिति', 'दर', '96']
+
+
+def test_rankers_are_selectable():
+    rag = RagSystem(str(DATA_PATH), index_dir='', ranker='bm25')
+    rag.ensure_initialized()
+    query = 'How many students in April 2025?'
+    for ranker in ('tfidf', 'bm25', 'hybrid'):
+        results = rag.search(query, top_k=3, ranker=ranker)
+        assert len(results) == 3
+        assert results[0]['score'] >= results[-1]['score']
+    assert rag.search(query, top_k=1)[0]['source'] == 'official_newsletter::April 2025'
+
+
+def test_unknown_ranker_rejected():
+    with pytest.raises(ValueError):
+        RagSystem(str(DATA_PATH), ranker='pagerank')
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    from backend.rag.embeddings import reciprocal_rank_fusion
+
+    fused = reciprocal_rank_fusion([[3, 1, 2], [1, 3]])
+    assert {fused[0][0], fused[1][0]} == {1, 3}
+    assert fused[-1][0] == 2
+
+
+@pytest.mark.parametrize('quantization', ['int8', 'fp16'])
+def test_embedding_index_numpy_fallback_matches_float(monkeypatch, quantization):
+    from backend.rag import embeddings
+    from backend.rag.embeddings import EmbeddingIndex, hashing_encoder
+
+    monkeypatch.setattr(embeddings, 'faiss', None)
+    texts = ['students enrolled in april', 'teacher training workshop', 'apaar id registrations']
+    index = EmbeddingIndex(hashing_encoder(64), quantization).build(texts)
+    assert index.codes.dtype == (np.int8 if quantization == 'int8' else np.float16)
+    assert index.search('teacher training', 1)[0][0] == 1
+
+
+def test_dense_and_fusion_rankers_with_snapshot(tmp_path):
+    from backend.rag.embeddings import hashing_encoder
+
+    built = RagSystem(str(DATA_PATH), index_dir=str(tmp_path), encoder=hashing_encoder())
+    built.ensure_initialized()
+    attached = RagSystem(str(DATA_PATH), index_dir=str(tmp_path), encoder=hashing_encoder())
+    attached.ensure_initialized()
+
+    for ranker in ('dense', 'fusion'):
+        a = built.search('APAAR registrations growth', top_k=3, ranker=ranker)
+        b = attached.search('APAAR registrations growth', top_k=3, ranker=ranker)
+        assert a and [r['text'] for r in a] == [r['text'] for r in b]
+
+
+def test_dense_ranker_falls_back_without_embeddings():
+    rag = RagSystem(str(DATA_PATH), index_dir='')
+    rag.ensure_initialized()
+    assert rag.embeddings is None
+    assert rag.search('April 2025', top_k=2, ranker='dense') == rag.search('April 2025', top_k=2, ranker='tfidf')
+
+
+def test_unknown_index_type_rejected():
+    with pytest.raises(ValueError):
+        RagSystem(str(DATA_PATH), index_type='annoy')
+
+
+def test_ivf_with_full_probe_matches_exact_index():
+    pytest.importorskip('faiss')
+    from backend.rag.ann import AnnConfig, build_index, recall_at_k
+
+    rng = np.random.default_rng(1)
+    vectors = rng.random((400, 16), dtype=np.float32)
+    exact = build_index(vectors, AnnConfig('flat'))
+    ivf = build_index(vectors, AnnConfig('ivf', nlist=8, nprobe=8))
+    _, truth = exact.search(vectors[:20], 5)
+    _, approx = ivf.search(vectors[:20], 5)
+    assert recall_at_k(truth, approx, 5) == 1.0
+
+
+@pytest.mark.parametrize('index_type', ['ivf', 'hnsw'])
+def test_ann_index_persists_in_snapshot(tmp_path, index_type):
+    pytest.importorskip('faiss')
+    built = RagSystem(str(DATA_PATH), index_dir=str(tmp_path), index_type=index_type)
+    built.ensure_initialized()
+    attached = RagSystem(str(DATA_PATH), index_dir=str(tmp_path), index_type=index_type)
+    attached.ensure_initialized()
+    assert type(attached.index).__name__ == type(built.index).__name__
+    assert attached.search('Kerala attendance', top_k=3) == built.search('Kerala attendance', top_k=3)
+
+
+def test_numpy_fallback_matches_faiss(monkeypatch):
+    from backend.rag import rag_system
+
+    with_faiss = RagSystem(str(DATA_PATH), index_dir='')
+    with_faiss.ensure_initialized()
+    monkeypatch.setattr(rag_system, '_faiss_available', lambda: False)
+    without = RagSystem(str(DATA_PATH), index_dir='')
+    without.ensure_initialized()
+    assert without.index is None
+    query = 'APAAR registrations in January 2026'
+    assert [r['text'] for r in without.search(query, 5)] == [r['text'] for r in with_faiss.search(query, 5)]
+
+
+def test_routed_search_stays_in_month_shard():
+    rag = RagSystem(str(DATA_PATH), index_dir='')
+    rag.ensure_initialized()
+    april = set(rag.partitions.select({'month': 'April 2025'}).tolist())
+    results = rag.search('Attendance highlights for April 2025', top_k=5, route=True)
+    assert results
+    assert {rag.chunks.index(next(c for c in rag.chunks if c['text'] == r['text'])) for r in results} <= april
+
+
+def test_partition_routing_relaxes_small_shards():
+    rag = RagSystem(str(DATA_PATH), index_dir='')
+    rag.ensure_initialized()
+    parts = rag.partitions
+    assert parts.route('What is the APAAR target?') is None
+    both = parts.select({'month': 'January 2026', 'state': 'Kerala'})
+    assert set(both.tolist()) <= set(parts.select({'month': 'January 2026'}).tolist())
+    relaxed = parts.route('Kerala in January 2026', min_size=len(both) + 1)
+    assert len(relaxed) > len(both)
+
+
+@pytest.mark.parametrize('query, months', [
+    ('May I know the top states?', None), ('may i see attendance', None), ('You may compare them', None),
+    ('What happened in May?', ['May 2025']), ('may 2025 attendance', ['May 2025']),
+    ('Hi. May 2025 attendance please', ['May 2025']), ('मई में क्या हुआ', ['May 2025']),
+])
+def test_may_is_a_month_only_in_context(query, months):
+    from backend.llm.insight_policy import InsightPolicy
+
+    rag = RagSystem(str(DATA_PATH), index_dir='')
+    rag.ensure_initialized()
+    assert rag.partitions.route_filters(query).get('month') == months
+    # Not a multi-month question either
+    _, reason = InsightPolicy.coverage('month', [], f'{query} Compare April 2025.')
+    assert (reason == 'several months named') == (months is not None)
+
+
+def test_search_metadata_filters():
+    rag = RagSystem(str(DATA_PATH), index_dir='')
+    rag.ensure_initialized()
+    best = rag.search('workshop on data protection', top_k=1, filters={'type': 'rvsk'})
+    assert best[0]['metadata']['type'] == 'rvsk'
+
+    q3 = rag.search('monthly report', top_k=10, filters={'type': 'month', 'month': 'Q3 2025'})
+    assert sorted(r['metadata']['data']['month'] for r in q3) == ['August 2025', 'July 2025', 'September 2025']
+
+    english = rag.search('director', top_k=5, filters={'language': 'en', 'type': 'rvsk'})
+    assert english and all(r['metadata']['type'] == 'rvsk' for r in english)
+    assert rag.search('growth', top_k=3, filters={'category': 'no-such-category'}) == []
+    with pytest.raises(ValueError):
+        rag.search('growth', filters={'colour': 'blue'})
+
+
+def test_streaming_chunker_windows_and_sections():
+    from backend.rag.ingest import iter_chunks, iter_paragraphs
+
+    rule = '=' * 78
+    lines = [rule, 'FIRST', rule, '', 'a b c d e', '', 'f g', rule, 'SECOND', rule, 'x y']
+    chunks = list(iter_chunks(iter_paragraphs(iter(lines)), max_tokens=4, overlap=1))
+    assert chunks == [('FIRST', 'a b c d'), ('FIRST', 'd e f g'), ('SECOND', 'x y')]
+
+    rag = RagSystem(str(DATA_PATH), index_dir='')
+    rag.ensure_initialized()
+    context = [c for c in rag.chunks if c['metadata']['type'] == 'detailed_context']
+    assert max(len(c['text'].split()) for c in context) <= rag.chunk_tokens[0]
+    assert any(c['metadata'].get('section', '').startswith('APAAR') for c in context)
+    assert rag.chunk_matrix.dtype == np.float32
+    # Sparse: memory follows the non-zero weights, not chunks x vocabulary
+    rows, cols = rag.chunk_matrix.shape
+    assert rag.chunk_matrix.format == 'csr' and rag.chunk_matrix.nnz < rows * cols / 10
+
+
+def test_corpus_directory_ingestion_keeps_provenance(tmp_path):
+    from backend.rag.ingest import ingest_directory
+
+    corpus = tmp_path / 'corpus'
+    (corpus / 'states').mkdir(parents=True)
+    (corpus / 'states' / 'goa.txt').write_text('Goa piloted solar powered smart classrooms in 40 schools.\n')
+    (corpus / 'march.md').write_text('The March bulletin covers hackathon finalists from Nagaland.\n')
+    (corpus / 'notes.csv').write_text('ignored,file\n')
+
+    chunks = list(ingest_directory(corpus, workers=2))
+    assert [c['metadata']['file'] for c in chunks] == ['march.md', 'states/goa.txt']
+
+    rag = RagSystem(str(DATA_PATH), index_dir=str(tmp_path / 'index'), corpus_dir=str(corpus))
+    rag.ensure_initialized()
+    top = rag.search('solar powered smart classrooms', top_k=1)[0]
+    assert top['source'] == 'corpus::states/goa.txt'
+    assert rag.search('hackathon', top_k=3, filters={'file': 'march.md'})[0]['source'] == 'corpus::march.md'
+
+
+def test_hindi_queries_share_the_english_vocabulary(tmp_path):
+    from backend.rag.text_analysis import analyze
+
+    assert analyze('केरल में उपस्थिति क्या है?') == analyze('kerala mein upasthiti kya hai') == ['kerala', 'attendance']
+    assert analyze('शिक्षकों') == ['teachers']
+    assert analyze('ज़िला') == analyze('जिला')
+
+    corpus = tmp_path / 'corpus'
+    corpus.mkdir()
+    (corpus / 'bihar_hi.txt').write_text('बिहार में स्कूल प्रमुखों के लिए डिजिटल उपस्थिति प्रशिक्षण कार्यशाला आयोजित की गई।\n')
+    rag = RagSystem(str(DATA_PATH), index_dir='', corpus_dir=str(corpus))
+    rag.ensure_initialized()
+    assert not any('नेतृत्व' in c['text'] or 'छह स्तंभ' in c['text'] for c in rag.chunks)
+
+    top = rag.search('अप्रैल 2025 में उपस्थिति', top_k=1)[0]
+    assert top['source'] == 'official_newsletter::April 2025'
+    assert rag.search('केरल में उपस्थिति', top_k=1)[0]['text'].startswith('Top performing states: Kerala')
+    hindi = rag.search('Bihar attendance training workshop', top_k=3, filters={'language': 'hi'})
+    assert [r['source'] for r in hindi] == ['corpus::bihar_hi.txt']
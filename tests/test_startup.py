@@ -0,0 +1,36 @@
+from backend.import_profile import heavy_imports, profile_imports
+from backend.rag.rag_system import RagSystem
+from backend.main import DATA_PATH
+
+
+def test_backend_main_import_stays_light():
+    entries = profile_imports('backend.main')
+    assert entries
+    assert heavy_imports(entries) == []
+
+
+def test_rag_system_ensure_initialized_is_idempotent():
+    rag = RagSystem(str(DATA_PATH))
+    assert rag.state == 'cold'
+    assert rag.ready is False
+    rag.ensure_initialized()
+    chunks = len(rag.chunks)
+    rag.ensure_initialized()
+    assert rag.ready is True
+    assert rag.init_seconds is not None
+    assert len(rag.chunks) == chunks > 0
+
+
+def test_lifespan_warms_rag_in_background():
+    import time
+
+    from fastapi.testclient import TestClient
+
+    from backend.main import app
+
+    with TestClient(app) as c:
+        assert c.get('/api/health').status_code == 200
+        deadline = time.time() + 30
+        while c.get('/api/ready').status_code != 200 and time.time() < deadline:
+            time.sleep(0.05)
+        assert c.get('/api/ready').json()['rag_state'] == 'ready'